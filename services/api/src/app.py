@@ -32,6 +32,10 @@ def create_app():
     try:
         app.db_service = DatabaseService(app.config['DATABASE_URL'])
         app.face_client = FaceRecognitionClient()
+        if app.face_client.gallery_enabled and not app.face_client.sync_gallery(
+                app.db_service.get_all_employees()):
+            logger.warning(
+                "Face gallery sync failed; identification falls back to the database.")
         app.notification_service = NotificationService()
         app.mqtt_service = MQTTService(
             app, app.db_service, app.face_client, app.notification_service)
@@ -33,6 +33,45 @@ class Config:
     # Face recognition config
     FACE_RECOGNITION_URL = os.environ.get(
         'FACE_RECOGNITION_URL', 'http://deepface:5000')
+    # 'deepface' -> DeepFace /represent (JSON)
+    # 'native'   -> services/face_recognition /embed/raw (binary float32)
+    FACE_RECOGNITION_BACKEND = os.environ.get(
+        'FACE_RECOGNITION_BACKEND', 'deepface').lower()
+    # Hedged requests across replicas (FACE_RECOGNITION_URL may list several,
+    # comma-separated): a second copy goes out once the first is slower than
+    # the recent p<HEDGE_PERCENTILE> latency
+    FACE_RECOGNITION_HEDGE = os.environ.get(
+        'FACE_RECOGNITION_HEDGE', 'true').lower() in ["true", "1", "t"]
+    FACE_RECOGNITION_HEDGE_PERCENTILE = float(
+        os.environ.get('FACE_RECOGNITION_HEDGE_PERCENTILE', 95))
+    FACE_RECOGNITION_HEDGE_MIN_DELAY_MS = float(
+        os.environ.get('FACE_RECOGNITION_HEDGE_MIN_DELAY_MS', 50))
+    # Replicas failing this many times in a row are ejected for EJECT_SECONDS
+    FACE_RECOGNITION_EJECT_AFTER_FAILURES = int(
+        os.environ.get('FACE_RECOGNITION_EJECT_AFTER_FAILURES', 3))
+    FACE_RECOGNITION_EJECT_SECONDS = float(
+        os.environ.get('FACE_RECOGNITION_EJECT_SECONDS', 30))
+
+    # Face-only sessions are identified against the native face service's
+    # in-memory gallery (POST /identify) instead of a pgvector query; the API
+    # keeps the gallery in sync with the employees table
+    FACE_GALLERY_ENABLED = os.environ.get(
+        'FACE_GALLERY_ENABLED', 'false').lower() in ["true", "1", "t"]
+
+    # RFID -> employee lookups are cached in memory; entries are invalidated
+    # on employee changes (and Postgres NOTIFY from other processes) and
+    # re-read after EMPLOYEE_CACHE_MAX_AGE seconds regardless
+    EMPLOYEE_CACHE_ENABLED = os.environ.get(
+        'EMPLOYEE_CACHE_ENABLED', 'true').lower() in ["true", "1", "t"]
+    EMPLOYEE_CACHE_MAX_AGE = float(
+        os.environ.get('EMPLOYEE_CACHE_MAX_AGE', 300))
+    # Unknown RFID tags are rejected by a bloom filter of the known tags, or
+    # remembered for EMPLOYEE_CACHE_NEGATIVE_TTL seconds after a database miss
+    # (at most EMPLOYEE_CACHE_NEGATIVE_SIZE tags)
+    EMPLOYEE_CACHE_NEGATIVE_TTL = float(
+        os.environ.get('EMPLOYEE_CACHE_NEGATIVE_TTL', 5))
+    EMPLOYEE_CACHE_NEGATIVE_SIZE = int(
+        os.environ.get('EMPLOYEE_CACHE_NEGATIVE_SIZE', 10000))
 
     # Session config
     SESSION_TIMEOUT = int(os.environ.get('SESSION_TIMEOUT', 30))
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, field_validator
 import uuid
 import re
@@ -8,6 +8,9 @@ from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Most extra frames a device may send with one session
+MAX_BURST_FRAMES = 7
+
 
 
 class Session(BaseModel):
@@ -26,6 +29,10 @@ class Session(BaseModel):
     rfid_tag: Optional[str] = Field(
         None, description="The actual RFID tag value if detected (optional)")
     face_detected: bool = Field(..., description="Whether a face was detected")
+    frames: Optional[List[str]] = Field(
+        None, description="Further base64 encoded frames of the same capture; the sharpest face of all frames is used (optional)")
+    face_box: Optional[List[int]] = Field(
+        None, description="Face bounding box [x1, y1, x2, y2] in image pixels, if the device ran detection (optional)")
 
 
     @field_validator('image_size')
@@ -39,6 +46,24 @@ class Session(BaseModel):
         return v
 
 
+    @field_validator('frames')
+    @classmethod
+    def validate_frames(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """Validate that a burst stays short."""
+        if v is not None and len(v) > MAX_BURST_FRAMES:
+            raise ValueError(f"At most {MAX_BURST_FRAMES} extra frames per session")
+        return v
+
+    @field_validator('face_box')
+    @classmethod
+    def validate_face_box(cls, v: Optional[List[int]]) -> Optional[List[int]]:
+        """Validate that the face box is [x1, y1, x2, y2] with x2 > x1 and y2 > y1."""
+        if v is None:
+            return v
+        if len(v) != 4 or min(v) < 0 or v[2] <= v[0] or v[3] <= v[1]:
+            raise ValueError("face_box must be [x1, y1, x2, y2] with x2 > x1 and y2 > y1")
+        return v
+
     @field_validator('image', mode='before')
     @classmethod
     def check_image_data(cls, v, values):
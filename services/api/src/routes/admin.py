@@ -546,6 +546,8 @@ def employees_create():
             # The employee photo_url is the primary reference now.
 
             session.commit()
+            if face_client.gallery_enabled:
+                face_client.update_gallery_employee(employee)
 
             flash(f"Employee '{name}' created successfully!", "success")
             if face_embedding:
@@ -733,6 +735,8 @@ def employees_edit(employee_id: str):
             employee_uuid, update_data)
 
         if updated_employee:
+            if face_client.gallery_enabled:
+                face_client.update_gallery_employee(updated_employee)
             flash(
                 f"Employee '{updated_employee.name}' updated successfully.", "success")
             return redirect(url_for('admin_bp.employees_list'))
@@ -791,6 +795,9 @@ def employees_delete(employee_id: str):
         # -----------------------------------------
 
         if deleted:
+            face_client: FaceRecognitionClient = current_app.face_client
+            if face_client.gallery_enabled:
+                face_client.remove_gallery_employee(employee_uuid)
             flash(
                 f"Employee '{employee_name_for_flash}' deleted successfully from database.", "success")
 
@@ -846,6 +853,18 @@ def get_emergency_status():
     })
 
 
+@admin_bp.route('/api/status/rfid-lookups', methods=['GET'])
+def get_rfid_lookup_status():
+    """API endpoint with the RFID lookup cache counters. A fast-growing
+    unknown_from_memory count means a faulty reader or someone cycling tags."""
+    cache = current_app.db_service.employee_cache
+    return jsonify({
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+
 @admin_bp.route('/api/status/emergency/reset', methods=['POST'])
 def reset_emergency_status():
     """API endpoint to manually reset the emergency status."""
@@ -3,10 +3,12 @@ from typing import Optional, List, Dict, Any, Tuple
 import logging
 import sqlalchemy
 import base64  # Added for image encoding
+import threading
+import time
 from contextlib import contextmanager
 
 # Added select, update, func
-from sqlalchemy import create_engine, select, update, func
+from sqlalchemy import create_engine, select, update, func, event, inspect
 from sqlalchemy.orm import sessionmaker, joinedload
 from sqlalchemy.exc import SQLAlchemyError
 # Use relative imports
@@ -17,6 +19,7 @@ from ..models.employee import Employee
 from ..models.access_log import AccessLog
 from ..models.verification_image import VerificationImage
 from ..models.session_record import SessionRecord
+from .employee_cache import EmployeeCache, EmployeeChangeListener, EmployeeRecord
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -34,8 +37,13 @@ Base = declarative_base()
 class DatabaseService:
     """Service for handling database operations."""
 
-    def __init__(self, connection_string: str):
-        """Initialize database service with connection string."""
+    def __init__(self, connection_string: str, employee_cache: Optional[EmployeeCache] = None):
+        """
+        Initialize database service with connection string.
+
+        employee_cache overrides the RFID lookup cache configured by
+        EMPLOYEE_CACHE_ENABLED / EMPLOYEE_CACHE_MAX_AGE.
+        """
         self.engine = create_engine(
             connection_string,
             poolclass=QueuePool,
@@ -48,8 +56,82 @@ class DatabaseService:
         # Configure sessionmaker with expire_on_commit=False
         self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         Base.metadata.create_all(self.engine)
+
+        # RFID -> employee cache, invalidated whenever a session that changed
+        # an employee commits, and across processes by Postgres notifications
+        self.employee_cache = employee_cache
+        if self.employee_cache is None and Config.EMPLOYEE_CACHE_ENABLED:
+            self.employee_cache = EmployeeCache(
+                max_age=Config.EMPLOYEE_CACHE_MAX_AGE,
+                negative_ttl=Config.EMPLOYEE_CACHE_NEGATIVE_TTL,
+                max_negative=Config.EMPLOYEE_CACHE_NEGATIVE_SIZE)
+        self.employee_listener = None
+        self._known_tags_lock = threading.Lock()
+        if self.employee_cache is not None:
+            event.listen(self.Session, 'after_flush',
+                         self._collect_employee_changes)
+            event.listen(self.Session, 'after_commit',
+                         self._invalidate_employee_changes)
+            event.listen(self.Session, 'after_rollback',
+                         self._discard_employee_changes)
+            if self.engine.dialect.name == 'postgresql':
+                self.employee_listener = EmployeeChangeListener(
+                    self._connect_listener, self.employee_cache)
+                self.employee_listener.start()
         logger.info("Database service initialized successfully.")
 
+    # --- Employee cache invalidation ---
+
+    def _connect_listener(self):
+        """A DBAPI connection outside the pool, held by the change listener."""
+        dialect = self.engine.dialect
+        cargs, cparams = dialect.create_connect_args(self.engine.url)
+        return dialect.connect(*cargs, **cparams)
+
+    @staticmethod
+    def _collect_employee_changes(session, flush_context):
+        """Remember the employees a flush touched, under their old and new tags."""
+        changed = [obj for obj in (*session.new, *session.dirty, *session.deleted)
+                   if isinstance(obj, Employee)]
+        if not changed:
+            return
+        tags, ids = session.info.setdefault(
+            'changed_employees', (set(), set()))
+        for employee in changed:
+            history = inspect(employee).attrs.rfid_tag.history
+            tags.update(tag for tag in (*history.added, *history.unchanged,
+                                        *history.deleted) if tag)
+            if employee.id is not None:
+                ids.add(employee.id)
+
+    def _invalidate_employee_changes(self, session):
+        changed = session.info.pop('changed_employees', None)
+        if changed:
+            tags, ids = changed
+            self.employee_cache.invalidate(rfid_tags=tags, employee_ids=ids)
+
+    @staticmethod
+    def _discard_employee_changes(session):
+        session.info.pop('changed_employees', None)
+
+    def _refresh_known_tags(self):
+        """Rebuild the cache's known-tag bloom filter from the employees table."""
+        # One thread rebuilds; the others keep using the current filter, which
+        # already lets any newly added tag through
+        if not self._known_tags_lock.acquire(blocking=False):
+            return
+        try:
+            loaded_at = time.monotonic()
+            with self.session_scope() as session:
+                tags = session.execute(select(Employee.rfid_tag)).scalars().all()
+            self.employee_cache.set_known_tags(tags, loaded_at)
+            logger.info(f"Rebuilt known RFID tag filter with {len(tags)} tags.")
+        except SQLAlchemyError as e:
+            logger.error(
+                f"Error loading RFID tags for the known-tag filter: {e}", exc_info=True)
+        finally:
+            self._known_tags_lock.release()
+
     @contextmanager
     def session_scope(self):
         """Provide a transactional scope around a series of operations."""
@@ -171,19 +253,43 @@ class DatabaseService:
     # --- Methods using other imported models ---
 
     # Uses imported Employee model
-    def get_employee_by_rfid(self, rfid_tag: str) -> Optional[Employee]:
-        """Retrieves an employee record based on their RFID tag."""
+    def get_employee_by_rfid(self, rfid_tag: str) -> Optional[EmployeeRecord]:
+        """
+        Retrieves the employee with this RFID tag as an immutable
+        EmployeeRecord, from the employee cache when it holds the tag.
+        Unknown tags are mostly answered by the cache as well.
+        """
+        cache = self.employee_cache
+        if cache is not None:
+            record = cache.get(rfid_tag)
+            if record is not None:
+                logger.debug(
+                    f"Found employee {record.id} for RFID tag {rfid_tag} (cached)")
+                return record
+            if cache.known_tags_stale:
+                self._refresh_known_tags()
+            if cache.is_unknown(rfid_tag):
+                logger.debug(f"No employee found for RFID tag {rfid_tag} (cached)")
+                return None
+        loaded_at = time.monotonic()
         session = self.Session()
         try:
-            stmt = sqlalchemy.select(Employee).where(  # Uses imported model
-                Employee.rfid_tag == rfid_tag)
-            employee = session.execute(stmt).scalar_one_or_none()
-            if employee:
-                logger.debug(
-                    f"Found employee {employee.id} for RFID tag {rfid_tag}")
-            else:
+            # Only the columns verification needs, not the full ORM row
+            stmt = sqlalchemy.select(
+                Employee.id, Employee.name, Employee.rfid_tag, Employee.active,
+                Employee.face_embedding).where(Employee.rfid_tag == rfid_tag)
+            row = session.execute(stmt).one_or_none()
+            if row is None:
                 logger.debug(f"No employee found for RFID tag {rfid_tag}")
-            return employee
+                if cache is not None:
+                    cache.put_missing(rfid_tag, loaded_at)
+                return None
+            record = EmployeeRecord.from_employee(row)
+            if cache is not None:
+                cache.put(record, loaded_at)
+            logger.debug(
+                f"Found employee {record.id} for RFID tag {rfid_tag}")
+            return record
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching employee by RFID {rfid_tag}: {e}", exc_info=True)
@@ -0,0 +1,333 @@
+"""Read-through cache of employees by RFID tag.
+
+Every session looks its badge up by RFID tag, while the employees table
+changes a few times a day. The cache keeps a compact immutable record of each
+employee that was looked up (no ORM object, no open session).
+
+Unknown tags (misreads, a faulty reader, someone cycling through tags) are
+answered from memory too, so they cannot flood the database: a bloom filter
+of every known tag rejects most of them outright, and the rest are remembered
+in a short-lived negative cache after one database miss. Counters of both
+are in stats().
+
+Entries are dropped, and changed tags added to the bloom filter, when the
+employee row changes:
+
+- in this process, when a database session that inserted, updated or deleted
+  an Employee commits (see DatabaseService)
+- in every process, on a Postgres NOTIFY on EMPLOYEE_CHANGED_CHANNEL, sent by
+  the employees_changed trigger in services/database/init.sql
+
+The bloom filter never forgets a tag, so it is rebuilt from the table after
+changes to drop deleted tags. Entries and the filter also expire after
+max_age seconds, which bounds staleness should a notification ever be
+missed. When the listener loses its connection everything is cleared, since
+changes may have gone unnoticed meanwhile.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .face_recognition_client import normalize_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Must match the channel of notify_employee_changed() in init.sql
+EMPLOYEE_CHANGED_CHANNEL = 'employee_changed'
+
+
+@dataclass(frozen=True)
+class EmployeeRecord:
+    """The fields of an employee needed to verify a session."""
+    id: uuid.UUID
+    name: str
+    rfid_tag: str
+    active: bool
+    face_embedding: Optional[np.ndarray]  # read-only float32, as stored
+    # Read-only (K, D) float32 unit-length templates, normalized once on load
+    # for FaceRecognitionClient.verify_embeddings(..., normalized=True)
+    reference_embeddings: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_employee(cls, employee) -> 'EmployeeRecord':
+        embedding = references = None
+        if employee.face_embedding is not None:
+            embedding = np.array(employee.face_embedding, dtype=np.float32)
+            embedding.setflags(write=False)
+            references = normalize_embeddings(embedding)
+        return cls(id=employee.id, name=employee.name, rfid_tag=employee.rfid_tag,
+                   active=bool(employee.active), face_embedding=embedding,
+                   reference_embeddings=references)
+
+
+class BloomFilter:
+    """Set of strings with no false negatives and about error_rate false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        # Keyed per filter, so nobody can precompute tags that collide with known ones
+        self._key = os.urandom(16)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16, key=self._key).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+class EmployeeCache:
+    """Thread-safe map of RFID tag -> EmployeeRecord with invalidation."""
+
+    def __init__(self, max_age: float = 300.0, negative_ttl: float = 5.0,
+                 max_negative: int = 10000, bloom_error_rate: float = 0.01):
+        """
+        Initialize the cache.
+
+        Args:
+            max_age: Seconds after which a record or the bloom filter is re-read
+            negative_ttl: Seconds an unknown tag is answered from memory
+                after a database miss
+            max_negative: Most unknown tags remembered (oldest dropped first)
+            bloom_error_rate: False-positive rate of the known-tag filter at
+                its initial size
+        """
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+        self.max_negative = max_negative
+        self.bloom_error_rate = bloom_error_rate
+        self._entries: Dict[str, Tuple[EmployeeRecord, float]] = {}
+        self._negative: Dict[str, float] = {}  # unknown tag -> time of the miss
+        self._known: Optional[BloomFilter] = None
+        self._known_built_at = float('-inf')
+        self._known_stale = True
+        # When each tag (or, for clear(), every tag) was last invalidated
+        self._invalidated_at: Dict[str, float] = {}
+        self._cleared_at = float('-inf')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.bloom_rejections = 0
+        self.negative_hits = 0
+        self.database_misses = 0
+
+    def get(self, rfid_tag: str) -> Optional[EmployeeRecord]:
+        """The cached record, or None if it is absent or older than max_age."""
+        with self._lock:
+            entry = self._entries.get(rfid_tag)
+            if entry is not None and time.monotonic() - entry[1] < self.max_age:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, record: EmployeeRecord, loaded_at: float):
+        """
+        Cache a record read from the database.
+
+        loaded_at is the time.monotonic() taken before the read. The record is
+        not stored if its tag was invalidated since, as the read may then
+        predate the change.
+        """
+        with self._lock:
+            invalidated_at = max(self._cleared_at,
+                                 self._invalidated_at.get(record.rfid_tag, float('-inf')))
+            if loaded_at > invalidated_at:
+                self._entries[record.rfid_tag] = (record, loaded_at)
+
+    # --- Unknown tags ---
+
+    def is_unknown(self, rfid_tag: str) -> bool:
+        """True if the tag is known not to belong to any employee, without the database."""
+        with self._lock:
+            if self._known is not None and rfid_tag not in self._known:
+                self.bloom_rejections += 1
+                return True
+            missed_at = self._negative.get(rfid_tag)
+            if missed_at is not None:
+                if time.monotonic() - missed_at < self.negative_ttl:
+                    self.negative_hits += 1
+                    return True
+                del self._negative[rfid_tag]
+            return False
+
+    def put_missing(self, rfid_tag: str, loaded_at: float):
+        """Remember a tag the database does not know (loaded_at as for put)."""
+        with self._lock:
+            self.database_misses += 1
+            invalidated_at = max(self._cleared_at,
+                                 self._invalidated_at.get(rfid_tag, float('-inf')))
+            if loaded_at <= invalidated_at:
+                return
+            self._negative.pop(rfid_tag, None)
+            while len(self._negative) >= self.max_negative:
+                # Dicts keep insertion order, so the first entry is the oldest
+                del self._negative[next(iter(self._negative))]
+            self._negative[rfid_tag] = loaded_at
+
+    @property
+    def known_tags_stale(self) -> bool:
+        """Whether set_known_tags should be called with a fresh read of all tags."""
+        with self._lock:
+            return (self._known_stale
+                    or time.monotonic() - self._known_built_at >= self.max_age)
+
+    def set_known_tags(self, rfid_tags: Iterable[str], loaded_at: float):
+        """
+        Replace the bloom filter with one of these tags, read from the table
+        at loaded_at (time.monotonic() before the read). Tags invalidated
+        since are added as well, as the read may predate their insertion.
+        """
+        rfid_tags = list(rfid_tags)
+        # Headroom for employees added before the next rebuild
+        known = BloomFilter(2 * len(rfid_tags) + 64, self.bloom_error_rate)
+        for tag in rfid_tags:
+            known.add(tag)
+        with self._lock:
+            if loaded_at <= self._cleared_at:
+                return
+            for tag, invalidated_at in self._invalidated_at.items():
+                if invalidated_at >= loaded_at:
+                    known.add(tag)
+            self._known = known
+            self._known_built_at = loaded_at
+            self._known_stale = False
+
+    # --- Invalidation ---
+
+    def invalidate(self, rfid_tags: Iterable[str] = (),
+                   employee_ids: Iterable[uuid.UUID] = ()):
+        """Drop the entries of these tags, and of these employees whatever their tag."""
+        employee_ids = set(employee_ids)
+        with self._lock:
+            now = time.monotonic()
+            tags = set(rfid_tags)
+            if employee_ids:
+                tags.update(tag for tag, (record, _) in self._entries.items()
+                            if record.id in employee_ids)
+            for tag in tags:
+                if self._entries.pop(tag, None) is not None:
+                    self.invalidations += 1
+                self._negative.pop(tag, None)
+                self._invalidated_at[tag] = now
+                # The tag may be new: let it through the filter at once. A
+                # deleted tag stays in until the rebuild this requests.
+                if self._known is not None:
+                    self._known.add(tag)
+            if tags:
+                self._known_stale = True
+
+    def clear(self):
+        """Drop every entry and the bloom filter."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._negative.clear()
+            self._known = None
+            self._known_stale = True
+            self._invalidated_at.clear()
+            self._cleared_at = time.monotonic()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits,
+                    'misses': self.misses, 'invalidations': self.invalidations,
+                    'negative_size': len(self._negative),
+                    'bloom_rejections': self.bloom_rejections,
+                    'negative_hits': self.negative_hits,
+                    'unknown_from_memory': self.bloom_rejections + self.negative_hits,
+                    'database_misses': self.database_misses}
+
+
+class EmployeeChangeListener:
+    """Background LISTEN on the employee change channel, invalidating the cache."""
+
+    def __init__(self, connect_fn: Callable[[], object], cache: EmployeeCache,
+                 channel: str = EMPLOYEE_CHANGED_CHANNEL,
+                 poll_interval: float = 30.0, retry_seconds: float = 5.0):
+        """
+        Initialize the listener.
+
+        Args:
+            connect_fn: Opens a new psycopg2 connection, used only by the listener
+            cache: Cache to invalidate
+            channel: Postgres notification channel; each payload is an RFID tag
+            poll_interval: Seconds without notifications after which the
+                connection is checked
+            retry_seconds: Delay before reconnecting after an error
+        """
+        self.connect_fn = connect_fn
+        self.cache = cache
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_seconds = retry_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name='employee-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self.connect_fn()
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                # Changes made while nobody was listening went unnoticed
+                self.cache.clear()
+                logger.info(f"Listening for employee changes on '{self.channel}'")
+                self._listen(connection)
+            except Exception as e:
+                logger.warning(
+                    f"Employee change listener failed, clearing the cache and reconnecting: {e}")
+                self.cache.clear()
+                self._stop.wait(self.retry_seconds)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _listen(self, connection):
+        while not self._stop.is_set():
+            if select.select([connection], [], [], self.poll_interval) == ([], [], []):
+                # Quiet for a while: make sure the connection is still alive
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                continue
+            connection.poll()
+            tags = {notify.payload for notify in connection.notifies}
+            connection.notifies.clear()
+            if tags:
+                logger.debug(f"Employee change notification for {len(tags)} tag(s)")
+                self.cache.invalidate(rfid_tags=tags)
@@ -0,0 +1,234 @@
+"""Load balancing across several face recognition service replicas.
+
+Requests go to the replica with the fewest outstanding requests. Replicas that
+fail repeatedly are ejected for a cool-down period. Idempotent requests can be
+hedged: if the first copy has not answered within the recent p95 latency of
+that path, a second copy is sent to another replica and whichever answers
+first wins.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from .unix_socket_adapter import UnixSocketAdapter, UNIX_URL_PREFIX, parse_unix_url
+
+logger = logging.getLogger(__name__)
+
+# Below this many latency samples the hedge delay falls back to the initial value
+MIN_HEDGE_SAMPLES = 20
+
+
+class FaceEndpoint:
+    """One face service replica and its load/health bookkeeping."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = requests.Session()
+        if url.startswith(UNIX_URL_PREFIX):
+            socket_path = parse_unix_url(url)
+            self.base_url = "http+unix://face-service"
+            self.session.mount(self.base_url, UnixSocketAdapter(socket_path))
+        else:
+            self.base_url = url.rstrip("/")
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def __repr__(self):
+        return f"<FaceEndpoint(url='{self.url}', outstanding={self.outstanding})>"
+
+
+class FaceEndpointPool:
+    """Least-outstanding-requests balancer with health ejection and hedging."""
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        min_hedge_delay: float = 0.05,
+        initial_hedge_delay: float = 1.0,
+        eject_after_failures: int = 3,
+        eject_seconds: float = 30.0,
+        latency_window: int = 200,
+    ):
+        self.endpoints: List[FaceEndpoint] = [FaceEndpoint(u) for u in urls]
+        if not self.endpoints:
+            raise ValueError("At least one face service URL is required.")
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.initial_hedge_delay = initial_hedge_delay
+        self.eject_after_failures = eject_after_failures
+        self.eject_seconds = eject_seconds
+        self.latency_window = latency_window
+        # Recent latencies of hedge-eligible requests, per path: a slow bulk
+        # call must not stretch the hedge delay of a fast one, nor the reverse
+        self._latencies: Dict[str, deque] = {}
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=4 * len(self.endpoints),
+            thread_name_prefix="face-endpoint")
+
+    # --- Selection & health ---
+
+    def choose(self, exclude: Iterable[FaceEndpoint] = ()) -> Optional[FaceEndpoint]:
+        """Picks the available replica with the fewest outstanding requests."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            healthy = [e for e in candidates if e.is_available(now)]
+            if not healthy:
+                # Everything is ejected: fail open to the one that comes back first
+                return min(candidates, key=lambda e: e.ejected_until)
+            fewest = min(e.outstanding for e in healthy)
+            return random.choice([e for e in healthy if e.outstanding == fewest])
+
+    def _record_success(self, endpoint: FaceEndpoint):
+        with self._lock:
+            if endpoint.consecutive_failures or endpoint.ejected_until:
+                logger.info(f"Face service replica {endpoint.url} recovered.")
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = 0.0
+
+    def _record_failure(self, endpoint: FaceEndpoint):
+        with self._lock:
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.eject_after_failures:
+                endpoint.ejected_until = time.monotonic() + self.eject_seconds
+                logger.warning(
+                    f"Ejecting face service replica {endpoint.url} for {self.eject_seconds}s "
+                    f"after {endpoint.consecutive_failures} consecutive failures.")
+
+    def _record_latency(self, path: str, latency: float):
+        with self._lock:
+            samples = self._latencies.get(path)
+            if samples is None:
+                samples = self._latencies[path] = deque(maxlen=self.latency_window)
+            samples.append(latency)
+
+    def hedge_delay(self, path: str) -> float:
+        """Delay before sending a hedged copy: recent p95 latency of path across replicas."""
+        with self._lock:
+            samples = sorted(self._latencies.get(path, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return self.initial_hedge_delay
+        index = min(len(samples) - 1,
+                    int(self.hedge_percentile / 100.0 * len(samples)))
+        return max(self.min_hedge_delay, samples[index])
+
+    def check_health(self, path: str = "/", timeout: float = 5) -> bool:
+        """Actively probes every replica; returns True if any is healthy."""
+        any_healthy = False
+        for endpoint in self.endpoints:
+            try:
+                response = endpoint.session.get(
+                    f"{endpoint.base_url}{path}", timeout=timeout)
+                healthy = 200 <= response.status_code < 300
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    f"Health check failed for face service replica {endpoint.url}: {e}")
+                healthy = False
+            if healthy:
+                self._record_success(endpoint)
+                any_healthy = True
+            else:
+                self._record_failure(endpoint)
+        return any_healthy
+
+    def stats(self) -> List[Dict]:
+        """Per-replica load and health snapshot (for logging/diagnostics)."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "url": e.url,
+                "outstanding": e.outstanding,
+                "consecutive_failures": e.consecutive_failures,
+                "ejected": not e.is_available(now),
+            } for e in self.endpoints]
+
+    # --- Requests ---
+
+    def _send(self, endpoint: FaceEndpoint, method: str, path: str,
+              record_latency: bool = False, **kwargs) -> requests.Response:
+        with self._lock:
+            endpoint.outstanding += 1
+        start = time.monotonic()
+        try:
+            response = endpoint.session.request(
+                method, f"{endpoint.base_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self._record_failure(endpoint)
+            raise
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+        if response.status_code >= 500:
+            self._record_failure(endpoint)
+        else:
+            self._record_success(endpoint)
+            if record_latency:
+                self._record_latency(path, time.monotonic() - start)
+        return response
+
+    def request(self, method: str, path: str, hedge: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        Sends a request to the least-loaded replica, hedging to a second
+        replica if the first is slower than the recent p95 of this path.
+
+        Raises the underlying requests exception if every attempt fails.
+        """
+        primary = self.choose()
+        if not (self.hedge if hedge is None else hedge):
+            return self._send(primary, method, path, **kwargs)
+        first = self._executor.submit(
+            self._send, primary, method, path, record_latency=True, **kwargs)
+
+        done, _ = wait([first], timeout=self.hedge_delay(path))
+        if done and self._usable(first):
+            return first.result()
+
+        secondary = self.choose(exclude=[primary])
+        if secondary is None:
+            return first.result()
+        logger.debug(
+            f"Hedging {method} {path}: {primary.url} slow or failed, also trying {secondary.url}")
+        with self._lock:
+            self.hedged_requests += 1
+        second = self._executor.submit(
+            self._send, secondary, method, path, record_latency=True, **kwargs)
+
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if self._usable(future) or not pending:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return first.result()  # pragma: no cover - loop always returns
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    @staticmethod
+    def _usable(future) -> bool:
+        """A finished attempt is usable if it raised nothing and is not a 5xx."""
+        if future.exception() is not None:
+            return False
+        return future.result().status_code < 500
@@ -2,15 +2,36 @@
 
 import requests
 import logging
+import base64
 import numpy as np  # Added for cosine similarity
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable
 import time
 
 # Use relative import for Config
 from ..core.config import Config
+from .face_endpoint_pool import FaceEndpointPool
 
 logger = logging.getLogger(__name__)
 
+# Wire format of the native face service /embed/raw responses
+EMBEDDING_DTYPE = np.dtype('<f4')
+# Least seconds between attempts to re-sync a gallery that is out of sync
+GALLERY_RESYNC_SECONDS = 60.0
+
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """
+    Read-only (K, D) float32 copy of one (D,) embedding or K stacked (K, D)
+    reference templates, each row scaled to unit length (all-zero rows stay
+    zero). Done once per reference, so verification is a single matrix-vector
+    product.
+    """
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    matrix.setflags(write=False)
+    return matrix
+
 
 class FaceRecognitionClientError(Exception):
     """Custom exception for Face Recognition client errors."""
@@ -18,16 +39,41 @@ class FaceRecognitionClientError(Exception):
 
 
 class FaceRecognitionClient:
-    """Handles HTTP communication with the face recognition service (DeepFace)."""
+    """Handles HTTP (TCP or Unix socket) communication with the face recognition service."""
+
+    def __init__(self, service_url: Optional[str] = None, backend: Optional[str] = None):
+        """
+        Initialize the client.
 
-    def __init__(self):
-        """Initialize the client with the service URL from config."""
-        self.service_url = Config.FACE_RECOGNITION_URL
+        Args:
+            service_url: Face service URL(s); defaults to FACE_RECOGNITION_URL.
+            backend: 'deepface' or 'native'; defaults to FACE_RECOGNITION_BACKEND.
+        """
+        self.service_url = service_url or Config.FACE_RECOGNITION_URL
         if not self.service_url:
             raise FaceRecognitionClientError(
                 "FACE_RECOGNITION_URL is not configured.")
+        # A comma-separated URL list runs against several replicas; each URL
+        # may be http(s):// or unix:///path/to/socket
+        service_urls = [url.strip()
+                        for url in self.service_url.split(',') if url.strip()]
+        self.pool = FaceEndpointPool(
+            service_urls,
+            hedge=Config.FACE_RECOGNITION_HEDGE,
+            hedge_percentile=Config.FACE_RECOGNITION_HEDGE_PERCENTILE,
+            min_hedge_delay=Config.FACE_RECOGNITION_HEDGE_MIN_DELAY_MS / 1000.0,
+            eject_after_failures=Config.FACE_RECOGNITION_EJECT_AFTER_FAILURES,
+            eject_seconds=Config.FACE_RECOGNITION_EJECT_SECONDS,
+        )
+        self.backend = (backend or Config.FACE_RECOGNITION_BACKEND).lower()
+        # 1:N search in the face service's in-memory gallery instead of pgvector
+        self.gallery_enabled = Config.FACE_GALLERY_ENABLED and self.backend == 'native'
+        # Only searched after a successful sync; a failed write or an empty
+        # gallery (e.g. a restarted service) puts it out of sync again
+        self._gallery_in_sync = False
+        self._gallery_sync_attempted_at = float('-inf')
         logger.info(
-            f"Face Recognition Client initialized for URL: {self.service_url}")
+            f"Face Recognition Client initialized for {len(service_urls)} replica(s): {self.service_url} (backend: {self.backend})")
         # Store threshold for local verification
         self.verification_threshold = Config.FACE_VERIFICATION_THRESHOLD
         logger.info(
@@ -46,7 +92,16 @@ class FaceRecognitionClient:
             A list of floats representing the embedding, or None if an error occurs.
         """
         logger.info("Getting embedding for image")
-        endpoint = f"{self.service_url}/represent"
+        if self.backend == 'native':
+            # The native service speaks the binary protocol; strip any data URI
+            # prefix and hand the raw bytes over.
+            if image_base64.startswith("data:image"):
+                image_base64 = image_base64.split(",", 1)[1]
+            embedding = self.get_embedding_from_bytes(
+                base64.b64decode(image_base64))
+            return embedding.tolist() if embedding is not None else None
+
+        endpoint = "/represent"
 
         # --- MODIFICATION START: Prepend data URI prefix ---
         # Assume JPEG format based on how test scripts process images
@@ -77,7 +132,7 @@ class FaceRecognitionClient:
             try:
                 logger.debug(
                     f"Attempt {current_retry + 1} of {max_retries} to get embedding")
-                response = requests.post(
+                response = self.pool.post(
                     endpoint,
                     json=payload,
                     timeout=45  # Increased timeout for model loading
@@ -153,65 +208,303 @@ class FaceRecognitionClient:
             # If we get here, we succeeded
             break
 
+    def get_embedding_from_bytes(self, image_bytes: bytes, device_id: Optional[str] = None,
+                                 box: Optional[List[int]] = None, cropped: bool = False) -> Optional[np.ndarray]:
+        """
+        Requests an embedding for raw JPEG bytes from the native face service
+        /embed/raw endpoint (binary protocol).
+
+        The image is sent as application/octet-stream and the response body is
+        a little-endian float32 buffer, decoded straight into a numpy array.
+
+        Args:
+            image_bytes: The raw (already base64-decoded) image bytes.
+            device_id: Camera that took the image; lets the face service search
+                       that camera's configured face region first.
+            box: Face bounding box [x1, y1, x2, y2] already known (e.g. from
+                 on-device detection); the face service skips detection.
+            cropped: The image is already the face crop; skips detection.
+
+        Returns:
+            A float32 numpy array holding the embedding, or None if no face was found.
+        """
+        endpoint = "/embed/raw"
+        params = {}
+        if device_id:
+            params["device_id"] = device_id
+        if box is not None:
+            params["box"] = ",".join(str(int(v)) for v in box)
+        if cropped:
+            params["cropped"] = "true"
+        logger.debug(
+            f"Requesting binary embedding for {len(image_bytes)} image bytes from {endpoint}")
+        try:
+            response = self.pool.post(
+                endpoint,
+                data=image_bytes,
+                params=params or None,
+                headers={"Content-Type": "application/octet-stream"},
+                timeout=45
+            )
+        except requests.exceptions.Timeout:
+            raise FaceRecognitionClientError(
+                f"Timeout connecting to face service at {endpoint}")
+        except requests.exceptions.RequestException as e:
+            raise FaceRecognitionClientError(f"Request failed: {str(e)}")
+
+        if response.status_code == 400:
+            # Undecodable image, unusable frame or no face found: not a service failure
+            try:
+                reason = response.json()
+            except ValueError:
+                reason = {"error": response.text}
+            if reason.get("quality_gate"):
+                logger.warning(
+                    f"Face service rejected frame from {device_id or 'unknown device'} "
+                    f"at quality gate '{reason['quality_gate']}': {reason.get('quality')}")
+            else:
+                logger.warning(
+                    f"Face service could not embed image: {reason.get('error')}")
+            return None
+        if response.status_code != 200:
+            logger.error(
+                f"HTTP error from face service ({endpoint}): {response.status_code} - {response.text}")
+            raise FaceRecognitionClientError(
+                f"Face service returned error: {response.status_code}")
+
+        return self._decode_embedding(response.content,
+                                      response.headers.get('X-Embedding-Dim'))
+
+    def get_best_frame_embedding(self, frames: List[bytes], device_id: Optional[str] = None) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Embeds the best frame of a burst with the native face service
+        /embed/best endpoint, which scores every frame (face sharpness, size,
+        detector confidence) and runs the model on the best one only.
+
+        Args:
+            frames: Raw JPEG bytes of each frame of one capture.
+            device_id: Camera that took the frames.
+
+        Returns:
+            (embedding as a float32 numpy array, index of the embedded frame),
+            or None if no frame held a usable face.
+        """
+        endpoint = "/embed/best"
+        files = [("frames", (f"frame{i}.jpg", frame, "image/jpeg"))
+                 for i, frame in enumerate(frames)]
+        try:
+            response = self.pool.post(
+                endpoint,
+                files=files,
+                data={"device_id": device_id} if device_id else None,
+                timeout=45
+            )
+        except requests.exceptions.Timeout:
+            raise FaceRecognitionClientError(
+                f"Timeout connecting to face service at {endpoint}")
+        except requests.exceptions.RequestException as e:
+            raise FaceRecognitionClientError(f"Request failed: {str(e)}")
+
+        if response.status_code == 400:
+            try:
+                reason = response.json()
+            except ValueError:
+                reason = {"error": response.text}
+            logger.warning(
+                f"Face service found no usable face in a burst of {len(frames)} frames "
+                f"from {device_id or 'unknown device'}: {reason.get('error')}")
+            return None
+        if response.status_code != 200:
+            logger.error(
+                f"HTTP error from face service ({endpoint}): {response.status_code} - {response.text}")
+            raise FaceRecognitionClientError(
+                f"Face service returned error: {response.status_code}")
+
+        # Binary float32 body like /embed/raw; the chosen frame is a header
+        embedding = self._decode_embedding(
+            response.content, response.headers.get('X-Embedding-Dim'))
+        frame = int(response.headers['X-Best-Frame'])
+        logger.debug(
+            f"Burst of {len(frames)} frames: embedded frame {frame} "
+            f"(scores {response.headers.get('X-Frame-Scores')})")
+        return embedding, frame
+
+    @staticmethod
+    def _decode_embedding(payload: bytes, expected_dim: Optional[str] = None) -> np.ndarray:
+        """Decodes a little-endian float32 embedding buffer into a numpy array."""
+        if len(payload) % EMBEDDING_DTYPE.itemsize != 0:
+            raise FaceRecognitionClientError(
+                f"Invalid embedding payload length: {len(payload)} bytes")
+        embedding = np.frombuffer(payload, dtype=EMBEDDING_DTYPE)
+        if expected_dim is not None and embedding.shape[0] != int(expected_dim):
+            raise FaceRecognitionClientError(
+                f"Embedding dimension mismatch: got {embedding.shape[0]}, expected {expected_dim}")
+        logger.debug(
+            f"Decoded binary embedding of dimension {embedding.shape[0]}")
+        return embedding
+
+    # --- 1:N Identification (native service gallery) ---
+    def identify(self, embedding, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Finds the k enrolled employees most similar to the embedding using the
+        face service's in-memory gallery (POST /identify).
+
+        Returns:
+            Matches in the same shape as DatabaseService.find_similar_embeddings:
+            [{"employee_id", "name", "distance", "confidence"}, ...]
+
+        Raises:
+            FaceRecognitionClientError: If the service could not be reached or
+                failed, or its gallery is empty.
+        """
+        payload = {"embedding": np.asarray(embedding, dtype=np.float32).tolist(), "k": k}
+        try:
+            response = self.pool.post("/identify", json=payload, timeout=10)
+        except requests.exceptions.RequestException as e:
+            raise FaceRecognitionClientError(f"Identify request failed: {str(e)}")
+        if response.status_code != 200:
+            raise FaceRecognitionClientError(
+                f"Face service /identify returned error: {response.status_code} - {response.text}")
+        data = response.json()
+        if not data.get('gallery_size'):
+            # A worker or replica that never got the gallery (or lost it)
+            # would answer "no match" for everyone
+            self._gallery_in_sync = False
+            raise FaceRecognitionClientError("Face service gallery is empty.")
+        logger.debug(
+            f"Gallery search over {data.get('gallery_size')} employees took {data.get('search_ms', 0):.3f} ms")
+        return [
+            {
+                "employee_id": match["employee_id"],
+                "name": match.get("name"),
+                "distance": 1.0 - match["similarity"],
+                "confidence": match["similarity"],
+            }
+            for match in data.get("matches", [])
+        ]
+
+    def sync_gallery(self, employees) -> bool:
+        """Replaces the face service gallery with the active employees that have an embedding."""
+        entries = [
+            {
+                "employee_id": str(employee.id),
+                "embedding": np.asarray(employee.face_embedding, dtype=np.float32).tolist(),
+                "name": employee.name,
+            }
+            for employee in employees
+            if employee.active and employee.face_embedding is not None
+        ]
+        self._gallery_sync_attempted_at = time.monotonic()
+        if not self._gallery_request("POST", "/gallery/sync", json={"entries": entries}):
+            return False
+        self._gallery_in_sync = True
+        logger.info(f"Face gallery synced with {len(entries)} employees.")
+        return True
+
+    def ensure_gallery(self, load_employees: Callable[[], Iterable]) -> bool:
+        """
+        Whether identify() can be used: the gallery is enabled and in sync.
+        An out-of-sync gallery is re-synced from load_employees() (at most
+        every GALLERY_RESYNC_SECONDS); until then callers search the database.
+        """
+        if not self.gallery_enabled:
+            return False
+        if (not self._gallery_in_sync and
+                time.monotonic() - self._gallery_sync_attempted_at >= GALLERY_RESYNC_SECONDS):
+            logger.info("Face gallery out of sync, re-syncing it from the database.")
+            self.sync_gallery(load_employees())
+        return self._gallery_in_sync
+
+    def update_gallery_employee(self, employee) -> bool:
+        """Enrolls, re-enrolls or removes one employee after it was created or edited."""
+        if employee.active and employee.face_embedding is not None:
+            return self._gallery_request(
+                "PUT", f"/gallery/{employee.id}",
+                json={"embedding": np.asarray(employee.face_embedding, dtype=np.float32).tolist(),
+                      "name": employee.name})
+        return self.remove_gallery_employee(employee.id)
+
+    def remove_gallery_employee(self, employee_id) -> bool:
+        """Removes one employee from the gallery (a missing entry is fine)."""
+        return self._gallery_request(
+            "DELETE", f"/gallery/{employee_id}", ok_statuses=(200, 404))
+
+    def _gallery_request(self, method: str, path: str, ok_statuses=(200,), **kwargs) -> bool:
+        # The database stays the source of truth: gallery failures are logged,
+        # and identification falls back to pgvector
+        try:
+            response = self.pool.request(method, path, hedge=False, timeout=30, **kwargs)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Face gallery request {method} {path} failed: {e}")
+            self._gallery_in_sync = False
+            return False
+        if response.status_code not in ok_statuses:
+            logger.error(
+                f"Face gallery request {method} {path} returned {response.status_code}: {response.text}")
+            self._gallery_in_sync = False
+            return False
+        return True
+
     # --- Verification Now Done Locally ---
-    def verify_embeddings(self, embedding1: List[float], embedding2: List[float]) -> Optional[Dict[str, Any]]:
+    def verify_embeddings(self, embedding, references, normalized: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Verifies if two embeddings match using cosine similarity and configured threshold.
-        This is now performed locally, not by calling the DeepFace service.
+        Verifies an embedding against one or more reference templates of the
+        same person using cosine similarity and the configured threshold.
+        This is performed locally, not by calling the face service.
 
         Args:
-            embedding1: The first embedding (list of floats).
-            embedding2: The second embedding (list of floats).
+            embedding: The new embedding, (D,) numpy array (used without a
+                copy when float32) or list of floats.
+            references: The reference embedding (D,), or K templates (K, D);
+                the best-matching template decides.
+            normalized: references are unit-length float32 rows already
+                (see normalize_embeddings, EmployeeRecord.reference_embeddings)
+                and are used as they are.
 
         Returns:
-            A dictionary containing 'is_match' (bool) and 'confidence' (float),
-            or None if input is invalid.
+            A dictionary containing 'is_match' (bool), 'confidence' (float,
+            the best cosine similarity) and 'template' (index of the best
+            reference), or None if input is invalid.
         """
         logger.debug("Performing local embedding verification...")
-        if embedding1 is None or embedding2 is None:
+        if embedding is None or references is None:
             logger.warning(
                 "Verification failed: One or both embeddings are missing.")
             return None
 
         try:
-            # Ensure embeddings are numpy arrays
-            emb1 = np.array(embedding1)
-            emb2 = np.array(embedding2)
-
-            if emb1.shape != emb2.shape:
+            query = np.asarray(embedding, dtype=np.float32)
+            if not normalized:
+                references = normalize_embeddings(references)
+            references = np.asarray(references, dtype=np.float32)
+            if references.ndim == 1:
+                references = references[np.newaxis]
+
+            if query.ndim != 1 or references.shape[1:] != query.shape:
                 logger.warning(
-                    f"Verification failed: Embeddings have different shapes: {emb1.shape} vs {emb2.shape}")
+                    f"Verification failed: Embeddings have different shapes: {query.shape} vs {references.shape}")
                 return None
 
-            # Explicitly normalize the vectors --- #
-            norm1 = np.linalg.norm(emb1)
-            norm2 = np.linalg.norm(emb2)
-            if norm1 == 0 or norm2 == 0:
+            query_norm = float(np.dot(query, query)) ** 0.5
+            if query_norm == 0 or (not normalized and not references.any()):
                 logger.warning(
                     "Verification failed: One or both embeddings have zero magnitude.")
                 return None  # Cannot normalize zero vector
 
-            emb1_normalized = emb1 / norm1
-            emb2_normalized = emb2 / norm2
-
-            logger.debug(
-                f"  Normalized emb1 (first 10): {str(list(emb1_normalized[:10]))}...")
-            logger.debug(
-                f"  Normalized emb2 (first 10): {str(list(emb2_normalized[:10]))}...")
-        
-
-            # Calculate cosine similarity using the dot product of NORMALIZED vectors
-            similarity = np.dot(emb1_normalized, emb2_normalized)
+            # Cosine similarity to every template in one product; only the
+            # query is normalized here
+            similarities = references @ query
+            best = int(similarities.argmax())
 
             # Clamp similarity score between -1 and 1 (cosine similarity range)
-            similarity = float(np.clip(similarity, -1.0, 1.0))
+            similarity = max(-1.0, min(1.0, float(similarities[best]) / query_norm))
 
             # Determine if it's a match based on the threshold from config
             is_match = similarity >= self.verification_threshold
 
             logger.debug(
-                f"Local verification result: Similarity={similarity:.4f}, Threshold={self.verification_threshold}, Match={is_match}")
-            return {"is_match": is_match, "confidence": similarity}
+                f"Local verification result: Similarity={similarity:.4f} (template {best} of {len(references)}), Threshold={self.verification_threshold}, Match={is_match}")
+            return {"is_match": is_match, "confidence": similarity, "template": best}
 
         except Exception as e:
             logger.error(
@@ -221,19 +514,12 @@ class FaceRecognitionClient:
             return None
 
     def check_health(self) -> bool:
-        """Check if DeepFace service is responding at its root."""
-        # DeepFace often responds at the root URL
-        endpoint = f"{self.service_url}/"  # Changed endpoint
-        logger.debug(f"Checking health of DeepFace service at {endpoint}")
-        try:
-            # Shorter timeout for health check
-            response = requests.get(endpoint, timeout=5)
-            # Check for 200 OK or potentially other success/redirect codes if needed
-            is_healthy = 200 <= response.status_code < 300
-            logger.debug(
-                f"DeepFace health check status code: {response.status_code}, Healthy: {is_healthy}")
-            return is_healthy
-        except requests.exceptions.RequestException as e:
-            logger.warning(
-                f"Health check failed for DeepFace service at {endpoint}: {str(e)}")
-            return False
+        """Check if at least one face service replica reports itself healthy."""
+        # The native service has a /health route, DeepFace only answers at its
+        # root; unhealthy replicas are ejected from the pool until they recover
+        path = "/health" if self.backend == 'native' else "/"
+        logger.debug(f"Checking health of face service replicas: {self.service_url}{path}")
+        is_healthy = self.pool.check_health(path, timeout=5)
+        logger.debug(
+            f"Face service health: {is_healthy}, replicas: {self.pool.stats()}")
+        return is_healthy
@@ -419,6 +419,19 @@ class MQTTService:
                     logger.debug(
                         f"Decoded image data: {len(image_bytes)} bytes")
 
+                    # --- Burst: embed the best frame, and store that one ---
+                    burst_frames = None
+                    if session_data.frames and self.face_client.backend == 'native':
+                        burst_frames = [image_bytes] + [base64.b64decode(frame)
+                                                        for frame in session_data.frames]
+                        best = self.face_client.get_best_frame_embedding(
+                            burst_frames, device_id=session_data.device_id)
+                        if best is not None:
+                            new_embedding, frame_index = best
+                            image_bytes = burst_frames[frame_index]
+                            logger.info(
+                                f"Using frame {frame_index} of {len(burst_frames)} for session {session_data.session_id}")
+
                     # --- Upload Image to Supabase FIRST ---
                     # Generate a unique filename including the folder path
                     image_filename = f"verification_images/session_{session_data.session_id}.jpg"
@@ -444,9 +457,19 @@ class MQTTService:
                     # if session_data.face_detected:
                     logger.debug(
                         f"face_detected is True. Calling face_client.get_embedding for session {session_data.session_id}")
-                    new_embedding = self.face_client.get_embedding(
-                        session_data.image)
-                    if new_embedding:
+                    # (a burst was already embedded above)
+                    if burst_frames is None:
+                        if self.face_client.backend == 'native':
+                            # Send the already-decoded bytes; the embedding comes
+                            # back as a float32 numpy array. A face box found on
+                            # the device spares the service its detector pass.
+                            new_embedding = self.face_client.get_embedding_from_bytes(
+                                image_bytes, device_id=session_data.device_id,
+                                box=session_data.face_box)
+                        else:
+                            new_embedding = self.face_client.get_embedding(
+                                session_data.image)
+                    if new_embedding is not None:
                         logger.info(
                             f"Successfully obtained new embedding for session {session_data.session_id}")
                         logger.debug(
@@ -554,9 +577,10 @@ class MQTTService:
 
                     # NOTE: This now calls the *local* verify_embeddings in the client,
                     # which calculates cosine similarity based on the configured threshold.
-                    # Pass the raw embedding object retrieved from the database
+                    # The employee record carries its templates pre-normalized
                     verification_result = self.face_client.verify_embeddings(
-                        new_embedding, db_embedding_raw)  # Use db_embedding_raw
+                        new_embedding, employee_record.reference_embeddings,
+                        normalized=True)
 
                     # Handle potential None return from local verification if inputs were bad
                     if verification_result is None:
@@ -661,10 +685,19 @@ class MQTTService:
                         f"Calling db_service.find_similar_embeddings for session {session_data.session_id}")
                     # --- ADD THIS LINE ---
                     logger.debug(
-                        f"  Using new_embedding (first 10 + length): {str(new_embedding[:10])}... (Length: {len(new_embedding) if new_embedding else 'None'})")
+                        f"  Using new_embedding (first 10 + length): {str(new_embedding[:10])}... (Length: {len(new_embedding) if new_embedding is not None else 'None'})")
                     # ---------------------
-                    potential_matches_raw = self.db_service.find_similar_embeddings(
-                        new_embedding, threshold=1, limit=3)
+                    potential_matches_raw = None
+                    if self.face_client.ensure_gallery(self.db_service.get_all_employees):
+                        try:
+                            potential_matches_raw = self.face_client.identify(
+                                new_embedding, k=3)
+                        except FaceRecognitionClientError as gallery_err:
+                            logger.warning(
+                                f"Gallery identify failed, falling back to database search: {gallery_err}")
+                    if potential_matches_raw is None:
+                        potential_matches_raw = self.db_service.find_similar_embeddings(
+                            new_embedding, threshold=1, limit=3)
                     logger.info(
                         f"Potential face matches for review (raw): {potential_matches_raw}")
 
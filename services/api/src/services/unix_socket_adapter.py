@@ -0,0 +1,76 @@
+"""requests transport adapter for HTTP over a Unix domain socket.
+
+Used by the face recognition client when the face service runs on the same
+host and is configured as FACE_RECOGNITION_URL=unix:///path/to/face.sock.
+"""
+
+import socket
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+UNIX_URL_PREFIX = "unix://"
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """urllib3 connection that connects to a Unix socket instead of TCP."""
+
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # urllib3 uses a sentinel object for "no explicit timeout"
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class UnixHTTPConnectionPool(HTTPConnectionPool):
+    """Connection pool whose connections all go to one Unix socket."""
+
+    def __init__(self, socket_path: str, maxsize: int = 10):
+        super().__init__("localhost", maxsize=maxsize)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> UnixHTTPConnection:
+        self.num_connections += 1
+        return UnixHTTPConnection(self.socket_path,
+                                  timeout=self.timeout.connect_timeout)
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """
+    Transport adapter that sends every request mounted on it to a single
+    Unix domain socket. Mount it on a requests.Session under a synthetic
+    http+unix:// prefix.
+    """
+
+    def __init__(self, socket_path: str, pool_maxsize: int = 10):
+        super().__init__()
+        self.socket_path = socket_path
+        self._unix_pool = UnixHTTPConnectionPool(
+            socket_path, maxsize=pool_maxsize)
+
+    # requests < 2.32
+    def get_connection(self, url, proxies=None):
+        return self._unix_pool
+
+    # requests >= 2.32
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._unix_pool
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        self._unix_pool.close()
+        super().close()
+
+
+def parse_unix_url(url: str) -> str:
+    """Returns the socket path from a unix:///path/to/socket URL."""
+    return url[len(UNIX_URL_PREFIX):]
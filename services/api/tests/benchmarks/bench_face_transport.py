@@ -0,0 +1,82 @@
+"""
+Latency comparison of TCP loopback vs Unix domain socket transport between
+the API and a co-located face recognition service.
+
+Start the face service twice (or once per transport), e.g.:
+    PORT=5001 python -m service.app
+    UNIX_SOCKET=/tmp/face.sock python -m service.app
+
+Then, from services/api:
+    python -m tests.benchmarks.bench_face_transport \\
+        --tcp http://localhost:5001 --unix unix:///tmp/face.sock \\
+        --image static/images/employees/EMP002.jpg
+
+Reports per-request latency for GET /health (pure transport + HTTP framing)
+and, when --image is given, POST /embed/raw (end to end).
+"""
+
+import argparse
+import statistics
+import time
+
+from src.services.face_recognition_client import FaceRecognitionClient
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _time_calls(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def _report(label, samples):
+    print(f"  {label:<22} mean={statistics.mean(samples):8.3f} ms  "
+          f"p50={_percentile(samples, 50):8.3f} ms  "
+          f"p95={_percentile(samples, 95):8.3f} ms  "
+          f"p99={_percentile(samples, 99):8.3f} ms")
+
+
+def benchmark(url, image_bytes, iterations, warmup):
+    client = FaceRecognitionClient(service_url=url, backend='native')
+    print(f"{url}")
+    health = _time_calls(client.check_health, iterations, warmup)
+    _report("GET /health", health)
+    if image_bytes is not None:
+        embed = _time_calls(
+            lambda: client.get_embedding_from_bytes(image_bytes), iterations, warmup)
+        _report("POST /embed/raw", embed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare TCP vs Unix socket latency to the face service.")
+    parser.add_argument("--tcp", default="http://localhost:5001",
+                        help="TCP URL of the face service")
+    parser.add_argument("--unix", default="unix:///tmp/face.sock",
+                        help="unix:// URL of the face service")
+    parser.add_argument("--image", help="JPEG used for /embed/raw timing")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+
+    image_bytes = None
+    if args.image:
+        with open(args.image, "rb") as f:
+            image_bytes = f.read()
+
+    for url in (args.tcp, args.unix):
+        benchmark(url, image_bytes, args.iterations, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
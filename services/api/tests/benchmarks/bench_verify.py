@@ -0,0 +1,76 @@
+"""
+Local RFID+face verification: the original verify_embeddings (two Python
+lists converted to float64 arrays and both normalized on every call) against
+the current one (float32 probe used as is, references normalized once when
+the employee is loaded), for one and for several templates per employee.
+
+    cd services/api && python -m tests.benchmarks.bench_verify \
+        [--dim 512] [--templates 1 3 10] [--iterations 20000]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from src.services.face_recognition_client import FaceRecognitionClient, normalize_embeddings
+
+
+def legacy_verify(embedding1, embedding2, threshold):
+    """verify_embeddings as it was before pre-normalized references."""
+    emb1 = np.array(embedding1)
+    emb2 = np.array(embedding2)
+    norm1 = np.linalg.norm(emb1)
+    norm2 = np.linalg.norm(emb2)
+    similarity = float(np.clip(np.dot(emb1 / norm1, emb2 / norm2), -1.0, 1.0))
+    return {"is_match": similarity >= threshold, "confidence": similarity}
+
+
+def time_us(fn, iterations: int) -> float:
+    """Median microseconds per call, over 5 runs of iterations calls."""
+    fn()
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        runs.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--templates", type=int, nargs="+", default=[1, 3, 10])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    client = FaceRecognitionClient()
+    threshold = client.verification_threshold
+    rng = np.random.default_rng(0)
+    probe = rng.normal(size=args.dim).astype(np.float32)
+
+    for count in args.templates:
+        templates = rng.normal(size=(count, args.dim)).astype(np.float32)
+        references = normalize_embeddings(templates)
+        probe_list, template_lists = probe.tolist(), templates.tolist()
+
+        cases = {
+            # One call per template, as the old verifier required
+            "legacy (lists, per call normalize)":
+                lambda: [legacy_verify(probe_list, t, threshold) for t in template_lists],
+            "new (lists, per call normalize)":
+                lambda: client.verify_embeddings(probe_list, template_lists),
+            "new (float32, pre-normalized)":
+                lambda: client.verify_embeddings(probe, references, normalized=True),
+        }
+        print(f"{count} template(s) of dim {args.dim}")
+        results = {name: time_us(fn, args.iterations) for name, fn in cases.items()}
+        legacy = results["legacy (lists, per call normalize)"]
+        for name, us in results.items():
+            print(f"  {name:<38} {us:8.2f} us/verification  ({legacy / us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
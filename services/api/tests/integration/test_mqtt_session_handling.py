@@ -151,7 +151,7 @@ def test_successful_rfid_face_verification(
     # 2. Face Client Checks
     mock_get_embedding.assert_called_once_with(SAMPLE_IMAGE_B64)
     mock_verify_embeddings.assert_called_once_with(
-        mock_embedding, mock_employee.face_embedding)
+        mock_embedding, mock_employee.reference_embeddings, normalized=True)
 
     # 3. Notification Checks
     # Check NotificationService sending methods were NOT called for INFO
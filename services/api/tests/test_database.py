@@ -0,0 +1,210 @@
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from src.models.access_log import AccessLog
+from src.models.employee import Employee
+from src.models.verification_image import VerificationImage
+from src.services.database import DatabaseService
+from src.services.employee_cache import BloomFilter, EmployeeCache, EmployeeRecord
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    """DatabaseService on a file-backed SQLite database with an employees table."""
+    service = DatabaseService(f"sqlite:///{tmp_path / 'cses.db'}",
+                              employee_cache=EmployeeCache())
+    Employee.metadata.create_all(service.engine, tables=[
+        Employee.__table__, AccessLog.__table__, VerificationImage.__table__])
+    return service
+
+
+def _create(db_service, rfid_tag="TAG-1", name="Ada"):
+    embedding = np.linspace(-1, 1, 512).tolist()
+    return db_service.create_employee(name=name, rfid_tag=rfid_tag, role="staff",
+                                      email=f"{rfid_tag}@example.com",
+                                      face_embedding=embedding)
+
+
+def test_get_employee_by_rfid_returns_immutable_record(db_service):
+    employee = _create(db_service)
+
+    record = db_service.get_employee_by_rfid("TAG-1")
+
+    assert isinstance(record, EmployeeRecord)
+    assert (record.id, record.name, record.active) == (employee.id, "Ada", True)
+    assert record.face_embedding.dtype == np.float32
+    assert record.face_embedding.shape == (512,)
+    assert not record.face_embedding.flags.writeable
+    assert record.reference_embeddings.shape == (1, 512)
+    assert np.linalg.norm(record.reference_embeddings[0]) == pytest.approx(1.0, abs=1e-6)
+    with pytest.raises(AttributeError):
+        record.name = "Eve"
+
+
+def test_get_employee_by_rfid_is_served_from_cache(db_service):
+    _create(db_service)
+
+    first = db_service.get_employee_by_rfid("TAG-1")
+    second = db_service.get_employee_by_rfid("TAG-1")
+
+    assert second is first
+    assert db_service.employee_cache.stats()["hits"] == 1
+
+
+def test_unknown_rfid_is_not_cached(db_service):
+    assert db_service.get_employee_by_rfid("NOPE") is None
+    assert db_service.employee_cache.stats()["size"] == 0
+
+
+def test_update_employee_invalidates_old_and_new_tag(db_service):
+    employee = _create(db_service)
+    db_service.get_employee_by_rfid("TAG-1")
+
+    db_service.update_employee(employee.id, {"rfid_tag": "TAG-2", "name": "Ada L."})
+
+    assert db_service.get_employee_by_rfid("TAG-1") is None
+    assert db_service.get_employee_by_rfid("TAG-2").name == "Ada L."
+
+
+def test_delete_employee_invalidates(db_service):
+    employee = _create(db_service)
+    db_service.get_employee_by_rfid("TAG-1")
+
+    assert db_service.delete_employee(employee.id)
+
+    assert db_service.get_employee_by_rfid("TAG-1") is None
+
+
+def test_create_employee_with_session_invalidates_on_commit(db_service):
+    cache = db_service.employee_cache
+    stale = EmployeeRecord(id=None, name="Nobody", rfid_tag="TAG-1",
+                           active=True, face_embedding=None)
+
+    session = db_service.get_session()
+    try:
+        db_service.create_employee_with_session(
+            session, name="Grace", rfid_tag="TAG-1", role="staff",
+            email="grace@example.com")
+        read_before_commit = time.monotonic()
+        session.commit()
+    finally:
+        session.close()
+
+    # A lookup that started before the commit must not be cached
+    cache.put(stale, read_before_commit)
+    assert cache.get("TAG-1") is None
+    assert db_service.get_employee_by_rfid("TAG-1").name == "Grace"
+
+
+def test_rolled_back_change_does_not_invalidate(db_service):
+    employee = _create(db_service)
+    cached = db_service.get_employee_by_rfid("TAG-1")
+
+    session = db_service.get_session()
+    try:
+        session.get(Employee, employee.id).name = "Eve"
+        session.flush()
+        session.rollback()
+    finally:
+        session.close()
+
+    assert db_service.get_employee_by_rfid("TAG-1") is cached
+
+
+def test_cache_rejects_records_read_before_an_invalidation():
+    cache = EmployeeCache()
+    record = EmployeeRecord(id=None, name="Ada", rfid_tag="TAG-1",
+                            active=True, face_embedding=None)
+    loaded_at = 0.0  # read started long ago...
+    cache.invalidate(rfid_tags=["TAG-1"])  # ...and the row changed since
+
+    cache.put(record, loaded_at)
+
+    assert cache.get("TAG-1") is None
+
+
+def test_cache_entries_expire():
+    cache = EmployeeCache(max_age=0.0)
+    record = EmployeeRecord(id=None, name="Ada", rfid_tag="TAG-1",
+                            active=True, face_embedding=None)
+    cache.put(record, time.monotonic())
+
+    assert cache.get("TAG-1") is None
+
+
+def _count_queries(db_service):
+    queries = []
+    event.listen(db_service.engine, 'before_cursor_execute',
+                 lambda *args: queries.append(args[2]))
+    return queries
+
+
+def test_unknown_rfid_is_answered_from_memory(db_service):
+    _create(db_service)
+    queries = _count_queries(db_service)
+
+    for _ in range(50):
+        assert db_service.get_employee_by_rfid("GARBAGE") is None
+
+    # One read of all tags for the bloom filter, nothing per lookup
+    assert len(queries) == 1
+    stats = db_service.employee_cache.stats()
+    assert stats["unknown_from_memory"] == 50
+    assert stats["database_misses"] == 0
+
+
+def test_new_employee_passes_known_tag_filter(db_service):
+    _create(db_service)
+    assert db_service.get_employee_by_rfid("TAG-2") is None  # builds the filter
+
+    _create(db_service, rfid_tag="TAG-2", name="Grace")
+
+    assert db_service.get_employee_by_rfid("TAG-2").name == "Grace"
+
+
+def test_deleted_tag_is_rejected_after_filter_rebuild(db_service):
+    employee = _create(db_service)
+    db_service.get_employee_by_rfid("TAG-1")
+    db_service.delete_employee(employee.id)
+
+    assert db_service.get_employee_by_rfid("TAG-1") is None
+    queries = _count_queries(db_service)
+    assert db_service.get_employee_by_rfid("TAG-1") is None
+    assert queries == []
+
+
+def test_negative_cache_expires_and_is_invalidated():
+    cache = EmployeeCache(negative_ttl=60.0)
+    cache.put_missing("TAG-9", time.monotonic())
+    assert cache.is_unknown("TAG-9")
+
+    cache.invalidate(rfid_tags=["TAG-9"])
+    assert not cache.is_unknown("TAG-9")
+
+    expired = EmployeeCache(negative_ttl=0.0)
+    expired.put_missing("TAG-9", time.monotonic())
+    assert not expired.is_unknown("TAG-9")
+
+
+def test_negative_cache_is_bounded():
+    cache = EmployeeCache(max_negative=3)
+    for i in range(5):
+        cache.put_missing(f"TAG-{i}", time.monotonic())
+
+    assert cache.stats()["negative_size"] == 3
+    assert not cache.is_unknown("TAG-0")
+    assert cache.is_unknown("TAG-4")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    tags = [f"EMP-{i:05d}" for i in range(2000)]
+    bloom = BloomFilter(len(tags), error_rate=0.01)
+    for tag in tags:
+        bloom.add(tag)
+
+    assert all(tag in bloom for tag in tags)
+    false_positives = sum(f"UNKNOWN-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
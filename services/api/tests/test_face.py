@@ -0,0 +1,333 @@
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.services.face_recognition_client import (
+    FaceRecognitionClient,
+    FaceRecognitionClientError,
+    normalize_embeddings,
+)
+
+
+@pytest.fixture
+def face_client():
+    return FaceRecognitionClient()
+
+
+def _binary_response(embedding: np.ndarray, status_code: int = 200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = embedding.astype('<f4').tobytes()
+    response.headers = {'X-Embedding-Dim': str(embedding.shape[0])}
+    return response
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_embedding_from_bytes_decodes_float32(mock_post, face_client):
+    """The binary /embed/raw response is decoded straight into a float32 array."""
+    expected = np.random.rand(512).astype(np.float32)
+    mock_post.return_value = _binary_response(expected)
+
+    embedding = face_client.get_embedding_from_bytes(b'\xff\xd8fake-jpeg')
+
+    assert embedding.dtype == np.float32
+    assert np.array_equal(embedding, expected)
+    _, kwargs = mock_post.call_args
+    assert kwargs['data'] == b'\xff\xd8fake-jpeg'
+    assert kwargs['headers']['Content-Type'] == 'application/octet-stream'
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_embedding_from_bytes_sends_device_id(mock_post, face_client):
+    """The camera id is passed along so the service can use its ROI hint."""
+    mock_post.return_value = _binary_response(np.zeros(512, dtype=np.float32))
+
+    face_client.get_embedding_from_bytes(b'jpeg-bytes', device_id='door-1')
+
+    _, kwargs = mock_post.call_args
+    assert kwargs['params'] == {'device_id': 'door-1'}
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_embedding_from_bytes_sends_known_face_box(mock_post, face_client):
+    """A box from on-device detection lets the service skip its detector."""
+    mock_post.return_value = _binary_response(np.zeros(512, dtype=np.float32))
+
+    face_client.get_embedding_from_bytes(b'jpeg-bytes', device_id='door-1', box=[10, 20, 110, 140])
+
+    _, kwargs = mock_post.call_args
+    assert kwargs['params'] == {'device_id': 'door-1', 'box': '10,20,110,140'}
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_best_frame_embedding_sends_burst(mock_post, face_client):
+    """All frames go in one multipart request; the chosen frame comes back."""
+    response = _binary_response(np.full(512, 0.5, dtype=np.float32))
+    response.headers['X-Best-Frame'] = '2'
+    mock_post.return_value = response
+
+    embedding, frame = face_client.get_best_frame_embedding([b'a', b'b', b'c'], device_id='door-1')
+
+    assert frame == 2
+    assert embedding.dtype == np.float32 and embedding.shape == (512,)
+    args, kwargs = mock_post.call_args
+    assert args[1].endswith('/embed/best')
+    assert [name for name, _ in kwargs['files']] == ['frames'] * 3
+    assert kwargs['files'][1][1][1] == b'b'
+    assert kwargs['data'] == {'device_id': 'door-1'}
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_best_frame_embedding_no_usable_frame(mock_post, face_client):
+    mock_post.return_value = MagicMock(status_code=400, text='{"error": "Face not detected"}')
+
+    assert face_client.get_best_frame_embedding([b'a', b'b']) is None
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_get_embedding_from_bytes_no_face(mock_post, face_client):
+    """A 400 from the service (no face / bad image) yields None, not an error."""
+    response = MagicMock(status_code=400, text='{"error": "Face not detected"}')
+    mock_post.return_value = response
+
+    assert face_client.get_embedding_from_bytes(b'not-an-image') is None
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_identify_returns_database_shaped_matches(mock_request, face_client):
+    """Gallery matches carry the same keys as the pgvector search results."""
+    mock_request.return_value = MagicMock(status_code=200, json=lambda: {
+        "matches": [{"employee_id": "e1", "name": "Ada", "similarity": 0.75}],
+        "gallery_size": 10, "search_ms": 0.1})
+
+    matches = face_client.identify(np.ones(512, dtype=np.float32), k=3)
+
+    assert matches == [{"employee_id": "e1", "name": "Ada",
+                        "distance": pytest.approx(0.25), "confidence": 0.75}]
+    _, kwargs = mock_request.call_args
+    assert kwargs['json']['k'] == 3
+    assert len(kwargs['json']['embedding']) == 512
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_identify_error_raises(mock_request, face_client):
+    mock_request.return_value = MagicMock(status_code=500, text='boom')
+
+    with pytest.raises(FaceRecognitionClientError):
+        face_client.identify(np.ones(512, dtype=np.float32))
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_sync_gallery_skips_inactive_and_unenrolled(mock_request, face_client):
+    """Only active employees with an embedding are sent to the gallery."""
+    mock_request.return_value = MagicMock(status_code=200)
+    employees = [
+        MagicMock(id='a', active=True, face_embedding=[1.0] * 512),
+        MagicMock(id='b', active=False, face_embedding=[1.0] * 512),
+        MagicMock(id='c', active=True, face_embedding=None),
+    ]
+    employees[0].name = 'Ada'
+
+    assert face_client.sync_gallery(employees) is True
+
+    args, kwargs = mock_request.call_args
+    assert args[0] == 'POST' and args[1].endswith('/gallery/sync')
+    assert [e['employee_id'] for e in kwargs['json']['entries']] == ['a']
+    assert kwargs['json']['entries'][0]['name'] == 'Ada'
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_remove_gallery_employee_tolerates_missing(mock_request, face_client):
+    mock_request.return_value = MagicMock(status_code=404, text='not enrolled')
+
+    assert face_client.remove_gallery_employee('gone') is True
+
+
+def test_verify_embeddings_matches_cosine_similarity(face_client):
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=512), rng.normal(size=512)
+    expected = float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+    result = face_client.verify_embeddings(a.tolist(), b.tolist())
+
+    assert result["confidence"] == pytest.approx(expected, abs=1e-5)
+    assert result["is_match"] == (expected >= face_client.verification_threshold)
+    assert result["template"] == 0
+
+
+def test_verify_embeddings_picks_best_of_several_templates(face_client):
+    rng = np.random.default_rng(1)
+    probe = rng.normal(size=512).astype(np.float32)
+    templates = rng.normal(size=(4, 512)).astype(np.float32)
+    templates[2] = probe * 3 + rng.normal(scale=0.1, size=512)
+    references = normalize_embeddings(templates)
+
+    result = face_client.verify_embeddings(probe, references, normalized=True)
+
+    assert result["template"] == 2
+    assert result["is_match"]
+    assert result["confidence"] == pytest.approx(
+        face_client.verify_embeddings(probe, templates[2])["confidence"], abs=1e-6)
+
+
+def test_normalize_embeddings_is_read_only_unit_float32():
+    references = normalize_embeddings([[3.0, 4.0], [0.0, 0.0]])
+
+    assert references.dtype == np.float32 and references.shape == (2, 2)
+    np.testing.assert_allclose(references, [[0.6, 0.8], [0.0, 0.0]])
+    assert not references.flags.writeable
+
+
+def test_verify_embeddings_rejects_invalid_input(face_client):
+    assert face_client.verify_embeddings(np.ones(512), np.ones(128)) is None
+    assert face_client.verify_embeddings(np.zeros(512), np.ones(512)) is None
+    assert face_client.verify_embeddings(np.ones(512), None) is None
+
+
+def test_decode_embedding_rejects_bad_payload():
+    """Truncated buffers and dimension mismatches are reported as client errors."""
+    with pytest.raises(FaceRecognitionClientError):
+        FaceRecognitionClient._decode_embedding(b'\x00\x00\x00')
+    with pytest.raises(FaceRecognitionClientError):
+        FaceRecognitionClient._decode_embedding(
+            np.zeros(4, dtype='<f4').tobytes(), expected_dim='512')
+
+
+def test_unix_socket_transport(tmp_path):
+    """unix:// URLs are served over a Unix domain socket by the client."""
+    import threading
+    from flask import Flask, Response
+    from werkzeug.serving import make_server
+
+    socket_path = str(tmp_path / "face.sock")
+    expected = np.arange(512, dtype='<f4')
+
+    service = Flask(__name__)
+
+    @service.route('/health')
+    def health():
+        return {"status": "healthy"}
+
+    @service.route('/embed/raw', methods=['POST'])
+    def embed_raw():
+        response = Response(expected.tobytes(),
+                            mimetype='application/octet-stream')
+        response.headers['X-Embedding-Dim'] = '512'
+        return response
+
+    server = make_server(f'unix://{socket_path}', 0, service, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = FaceRecognitionClient(service_url=f'unix://{socket_path}', backend='native')
+        assert client.check_health()
+        embedding = client.get_embedding_from_bytes(b'jpeg-bytes')
+        assert np.array_equal(embedding, expected)
+    finally:
+        server.shutdown()
+
+
+def _replica_response(status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+def test_endpoint_pool_prefers_least_outstanding():
+    """The replica with fewer in-flight requests is chosen."""
+    from src.services.face_endpoint_pool import FaceEndpointPool
+
+    pool = FaceEndpointPool(['http://face-a:5001', 'http://face-b:5001'])
+    busy, idle = pool.endpoints
+    busy.outstanding = 3
+    assert all(pool.choose() is idle for _ in range(10))
+
+
+def test_endpoint_pool_ejects_failing_replica():
+    """Consecutive failures eject a replica until it recovers."""
+    import requests
+    from src.services.face_endpoint_pool import FaceEndpointPool
+
+    pool = FaceEndpointPool(['http://face-a:5001', 'http://face-b:5001'],
+                            hedge=False, eject_after_failures=2)
+    bad, good = pool.endpoints
+    bad.session.request = MagicMock(
+        side_effect=requests.exceptions.ConnectionError("down"))
+    good.session.request = MagicMock(return_value=_replica_response())
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            pool._send(bad, 'POST', '/embed/raw')
+
+    assert pool.stats()[0]['ejected']
+    for _ in range(5):
+        assert pool.post('/embed/raw').status_code == 200
+    assert good.session.request.call_count == 5
+
+
+def test_endpoint_pool_hedges_slow_replica():
+    """A request slower than the hedge delay is answered by the second replica."""
+    import time
+    from src.services.face_endpoint_pool import FaceEndpointPool
+
+    pool = FaceEndpointPool(['http://face-a:5001', 'http://face-b:5001'],
+                            initial_hedge_delay=0.05)
+    slow, fast = pool.endpoints
+    slow_response, fast_response = _replica_response(), _replica_response()
+
+    def slow_request(*args, **kwargs):
+        time.sleep(0.5)
+        return slow_response
+    slow.session.request = MagicMock(side_effect=slow_request)
+    fast.session.request = MagicMock(return_value=fast_response)
+    # Make sure the slow replica is picked first
+    fast.outstanding = 1
+
+    start = time.monotonic()
+    response = pool.post('/embed/raw')
+    assert response is fast_response
+    assert time.monotonic() - start < 0.4
+    assert pool.hedged_requests == 1 and pool.hedge_wins == 1
+
+
+def test_endpoint_pool_hedge_delay_is_per_path():
+    """Slow bulk calls do not stretch the hedge delay of the identify path."""
+    from src.services.face_endpoint_pool import FaceEndpointPool, MIN_HEDGE_SAMPLES
+
+    pool = FaceEndpointPool(['http://face-a:5001', 'http://face-b:5001'],
+                            min_hedge_delay=0.001)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        pool._record_latency('/identify', 0.01)
+        pool._record_latency('/embed/best', 2.0)
+    # Gallery writes are never hedged, so they leave no samples
+    for endpoint in pool.endpoints:
+        endpoint.session.request = MagicMock(return_value=_replica_response())
+    pool.request('PUT', '/gallery/42', hedge=False)
+
+    assert pool.hedge_delay('/identify') == pytest.approx(0.01)
+    assert pool.hedge_delay('/embed/best') == pytest.approx(2.0)
+    assert pool.hedge_delay('/gallery/42') == pool.initial_hedge_delay
+
+
+@patch('src.services.face_recognition_client.requests.Session.request')
+def test_empty_gallery_falls_back_and_resyncs(mock_request, face_client):
+    """An empty gallery is not a 'no match': identify raises and the gallery is re-synced."""
+    mock_request.return_value = MagicMock(status_code=200)
+    face_client.gallery_enabled = True
+    load_employees = MagicMock(return_value=[])
+    assert face_client.ensure_gallery(load_employees) is True
+    load_employees.assert_called_once()
+
+    mock_request.return_value = MagicMock(status_code=200, json=lambda: {
+        "matches": [], "gallery_size": 0, "search_ms": 0.0})
+    with pytest.raises(FaceRecognitionClientError):
+        face_client.identify(np.ones(512, dtype=np.float32))
+
+    # Out of sync now; re-synced on the next check once the back-off allows
+    face_client._gallery_sync_attempted_at = float('-inf')
+    mock_request.return_value = MagicMock(status_code=503, text='down')
+    assert face_client.ensure_gallery(load_employees) is False
+    assert load_employees.call_count == 2
+    # ...and not again right away
+    assert face_client.ensure_gallery(load_employees) is False
+    assert load_employees.call_count == 2
@@ -21,6 +21,31 @@ CREATE INDEX IF NOT EXISTS employees_face_embedding_idx
     ON employees USING ivfflat (face_embedding vector_cosine_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS employees_rfid_tag_idx ON employees(rfid_tag);
 
+-- Notify API processes of employee changes so they drop their cached copy
+-- (payload: the affected RFID tag; delivered when the transaction commits)
+CREATE OR REPLACE FUNCTION notify_employee_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF (OLD.rfid_tag, OLD.name, OLD.active, OLD.face_embedding)
+                IS NOT DISTINCT FROM (NEW.rfid_tag, NEW.name, NEW.active, NEW.face_embedding) THEN
+            RETURN NULL; -- e.g. only last_verified / verification_count changed
+        END IF;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify('employee_changed', OLD.rfid_tag);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM pg_notify('employee_changed', NEW.rfid_tag);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS employees_changed ON employees;
+CREATE TRIGGER employees_changed
+    AFTER INSERT OR UPDATE OR DELETE ON employees
+    FOR EACH ROW EXECUTE FUNCTION notify_employee_changed();
+
 -- Create access_logs table (removing verification_image_path)
 CREATE TABLE IF NOT EXISTS access_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -2,6 +2,8 @@
 Configuration settings for the face recognition system.
 """
 
+import os
+
 # Model settings
 MODEL_INPUT_SIZE = (112, 112)
 MODEL_PATH = "face_recognition/core/models/ghostfacenets.h5"
@@ -16,6 +18,63 @@ PREPROCESSING_STEPS = [
     "align"
 ]
 
+# Face detector (core/detector.py)
+# Network input resolution as WIDTHxHEIGHT (or one number for a square input)
+DETECTOR_INPUT_SIZE = tuple(int(v) for v in os.getenv(
+    'DETECTOR_INPUT_SIZE', '300x300').lower().split('x'))
+if len(DETECTOR_INPUT_SIZE) == 1:
+    DETECTOR_INPUT_SIZE = DETECTOR_INPUT_SIZE * 2
+DETECTOR_CONFIDENCE_THRESHOLD = float(
+    os.getenv('DETECTOR_CONFIDENCE_THRESHOLD', 0.3))
+# JSON file mapping device ids to a normalized [x1, y1, x2, y2] region to search first
+DETECTOR_ROI_HINTS_PATH = os.getenv('DETECTOR_ROI_HINTS_PATH') or None
+
+# Decode large JPEGs at 1/2, 1/4 or 1/8 scale for detection (core/decode.py)
+REDUCED_DECODE = os.getenv(
+    'REDUCED_DECODE', 'true').lower() in ('true', '1', 't')
+
+# Most frames accepted in one /embed/best burst (core/frame_selection.py)
+BURST_MAX_FRAMES = int(os.getenv('BURST_MAX_FRAMES', 8))
+
+# Quality gate (core/quality.py): frames failing these checks are rejected
+# before detection / inference, and the response names the failed gate
+QUALITY_GATE_ENABLED = os.getenv(
+    'QUALITY_GATE_ENABLED', 'true').lower() in ('true', '1', 't')
+QUALITY_MIN_BRIGHTNESS = float(os.getenv('QUALITY_MIN_BRIGHTNESS', 40))
+QUALITY_MAX_BRIGHTNESS = float(os.getenv('QUALITY_MAX_BRIGHTNESS', 220))
+QUALITY_MIN_CONTRAST = float(os.getenv('QUALITY_MIN_CONTRAST', 15))
+# Laplacian variance of the frame downsampled to 160 px on its long side
+QUALITY_MIN_SHARPNESS = float(os.getenv('QUALITY_MIN_SHARPNESS', 20))
+# Minimum face box width/height in pixels
+QUALITY_MIN_FACE_SIZE = int(os.getenv('QUALITY_MIN_FACE_SIZE', 40))
+
 # Embedding settings
 EMBEDDING_SIZE = 512
 EMBEDDING_NORMALIZE = True
+# Inference runtime: 'keras', 'tflite' or 'onnx'. Empty means infer it from the
+# MODEL_PATH extension (.h5 -> keras, .tflite -> tflite, .onnx -> onnx)
+MODEL_BACKEND = os.getenv('MODEL_BACKEND') or None
+# Use the tf.function fast path instead of model.predict (see core/embedding.py)
+COMPILED_INFERENCE = os.getenv(
+    'COMPILED_INFERENCE', 'true').lower() in ('true', '1', 't')
+
+# Identification gallery (core/gallery.py): 'flat' for exact search, or 'ivf'
+# for an approximate index once the gallery is large (core/ann_index.py)
+GALLERY_INDEX = os.getenv('GALLERY_INDEX', 'flat').lower()
+GALLERY_IVF_NPROBE = int(os.getenv('GALLERY_IVF_NPROBE', 8))
+
+# Dynamic micro-batching (service/scheduler.py)
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', 16))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', 5))
+
+# Shadow evaluation (service/shadow.py): a candidate model embeds a sample of
+# live requests in the background for comparison with the primary model.
+# Unset SHADOW_MODEL_PATH disables it
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH') or None
+SHADOW_MODEL_BACKEND = os.getenv('SHADOW_MODEL_BACKEND') or None
+SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_QUEUE_SIZE = int(os.getenv('SHADOW_QUEUE_SIZE', 32))
+
+# Batch enrollment (service/enrollment.py): images processed concurrently per
+# request, so their faces can fill an inference batch
+ENROLL_BATCH_WORKERS = int(os.getenv('ENROLL_BATCH_WORKERS', INFERENCE_MAX_BATCH_SIZE))
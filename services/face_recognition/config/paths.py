@@ -13,10 +13,16 @@ ARCHIVE_DIR = BASE_DIR / "archive"
 
 # Model file paths
 MODEL_PATH = MODEL_DIR / "ghostfacenets.h5"
+# Quantized exports written by tools/export_model.py
+TFLITE_MODEL_PATH = MODEL_DIR / "ghostfacenets_int8.tflite"
+ONNX_MODEL_PATH = MODEL_DIR / "ghostfacenets_int8.onnx"
 
 # Data directories
 EMBEDDINGS_DIR = DATA_DIR / "embeddings"
 TEST_IMAGES_DIR = BASE_DIR / "tests" / "test_images"
+# Optional identification gallery snapshot shared by the service workers
+# (core/gallery.py); unset keeps the gallery in memory only
+GALLERY_PATH = Path(os.environ["GALLERY_PATH"]) if os.getenv("GALLERY_PATH") else None
 
 # Create directories if they don't exist
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -0,0 +1,112 @@
+"""
+CPU and thread settings for the face recognition service workers.
+
+TensorFlow (intra-op and inter-op pools), cv2.dnn and cv2.resize each size
+their thread pools to the whole machine by default; with several workers in a
+CPU-limited container they oversubscribe it. Every setting below defaults to
+"an even share of the available CPUs per worker".
+
+- TF_INTRA_OP_THREADS: threads for a single op (0 = CPU share per worker)
+- TF_INTER_OP_THREADS: ops run concurrently (default 1; inference is one graph)
+- OPENCV_THREADS: cv2.setNumThreads for detection/resize (-1 = CPU share per
+  worker; 0 runs OpenCV single-threaded without its pool)
+- CPU_AFFINITY: 'none' (default) or 'auto' to pin each worker to its own
+  disjoint slice of the allowed CPUs
+"""
+
+import logging
+import os
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+TF_INTRA_OP_THREADS = int(os.getenv('TF_INTRA_OP_THREADS', 0))
+TF_INTER_OP_THREADS = int(os.getenv('TF_INTER_OP_THREADS', 1))
+OPENCV_THREADS = int(os.getenv('OPENCV_THREADS', -1))
+CPU_AFFINITY = os.getenv('CPU_AFFINITY', 'none').lower()
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def cpu_share(worker_count: int = 1) -> int:
+    """Threads each of worker_count workers can use without oversubscribing."""
+    return max(1, available_cpus() // max(1, worker_count))
+
+
+def worker_cpus(slot: int, worker_count: int) -> Optional[List[int]]:
+    """
+    CPUs to pin worker number `slot` to under CPU_AFFINITY=auto: the allowed
+    CPUs split into worker_count contiguous slices (round-robin when there are
+    more workers than CPUs). None when affinity is disabled or unsupported.
+    """
+    if CPU_AFFINITY != 'auto' or not hasattr(os, 'sched_getaffinity'):
+        return None
+    allowed = sorted(os.sched_getaffinity(0))
+    slot %= max(1, worker_count)
+    if worker_count >= len(allowed):
+        return [allowed[slot % len(allowed)]]
+    per_worker = len(allowed) // worker_count
+    return allowed[slot * per_worker:(slot + 1) * per_worker]
+
+
+def apply_thread_settings(
+    worker_count: int = 1,
+    cpus: Optional[List[int]] = None,
+    intra_op: Optional[int] = None,
+    inter_op: Optional[int] = None,
+    opencv_threads: Optional[int] = None,
+) -> dict:
+    """
+    Apply thread pool sizes (and optionally CPU affinity) to this process.
+
+    Must run before the first TensorFlow op: TF fixes its pool sizes when the
+    runtime initializes. Arguments left as None take the module settings; the
+    automatic ones resolve to this worker's CPU share (its pinned CPUs, or the
+    available CPUs divided by worker_count).
+
+    Returns:
+        The settings that were applied.
+    """
+    import cv2
+    import tensorflow as tf
+
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    share = len(cpus) if cpus else cpu_share(worker_count)
+    intra_op = intra_op or TF_INTRA_OP_THREADS or share
+    inter_op = inter_op or TF_INTER_OP_THREADS
+    if opencv_threads is None:
+        opencv_threads = OPENCV_THREADS
+    if opencv_threads < 0:
+        opencv_threads = share
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        # The runtime is already initialized in this process; keep its pools
+        logger.warning(f"TensorFlow thread settings not applied: {e}")
+    cv2.setNumThreads(opencv_threads)
+
+    applied = {
+        'tf_intra_op_threads': intra_op,
+        'tf_inter_op_threads': inter_op,
+        'opencv_threads': opencv_threads,
+        'cpu_affinity': cpus,
+    }
+    logger.info(f"Thread settings: {applied}")
+    return applied
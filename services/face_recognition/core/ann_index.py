@@ -0,0 +1,208 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbor index for large galleries.
+
+Vectors (L2-normalized, compared by inner product) are partitioned into
+nlist clusters by spherical k-means. A query scores the nlist centroids,
+then searches only the nprobe closest clusters exactly, so it touches about
+nprobe / nlist of the gallery instead of all of it. Recall is traded for
+latency through nprobe (nprobe = nlist is exact search).
+
+Each cluster keeps its vectors in one contiguous float32 block, so inserts
+append and deletes swap the last row into the hole, as in the gallery itself.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# k-means is trained on at most this many vectors per cluster
+TRAINING_SAMPLES_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+
+
+def default_nlist(size: int) -> int:
+    """sqrt(n) clusters: balances the centroid scan against the cluster scans."""
+    return max(1, int(np.sqrt(size)))
+
+
+class IVFIndex:
+    def __init__(self, dim: int, nlist: Optional[int] = None, nprobe: int = 8, seed: int = 0):
+        """
+        Initialize an empty, untrained index.
+
+        Args:
+            dim: Vector dimension
+            nlist: Number of clusters (None = sqrt of the size passed to build)
+            nprobe: Clusters searched per query
+            seed: Seed for the k-means initialization
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._vectors = []
+        self._labels = []
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._where: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, label: int) -> bool:
+        return label in self._where
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    # --- Building ---
+
+    def build(self, labels, vectors: np.ndarray):
+        """Train the clusters on vectors and index them under integer labels."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = np.asarray(labels, dtype=np.int64)
+        nlist = min(self.nlist or default_nlist(len(vectors)), max(1, len(vectors)))
+        self.centroids = self._train(vectors, nlist)
+        self.trained_size = len(vectors)
+        self._fill(labels, vectors, self._assign(vectors))
+
+    def restore(self, labels, vectors: np.ndarray, centroids: np.ndarray,
+                assignments: np.ndarray, trained_size: int):
+        """
+        Index vectors under clusters trained elsewhere (e.g. by another
+        process), without training: assignments gives each vector's cluster,
+        as returned by assignments().
+        """
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.trained_size = int(trained_size)
+        self._fill(np.asarray(labels, dtype=np.int64),
+                   np.asarray(vectors, dtype=np.float32),
+                   np.asarray(assignments, dtype=np.int64))
+
+    def assignments(self, labels) -> np.ndarray:
+        """Cluster of each of these indexed labels."""
+        return np.array([self._where[int(label)][0] for label in labels], dtype=np.int64)
+
+    def _fill(self, labels: np.ndarray, vectors: np.ndarray, assignments: np.ndarray):
+        nlist = len(self.centroids)
+        # Stable sort keeps each cluster's rows in input order
+        order = np.argsort(assignments, kind='stable')
+        self._sizes = np.bincount(assignments, minlength=nlist).astype(np.int64)
+        bounds = np.concatenate([[0], np.cumsum(self._sizes)])
+        self._vectors, self._labels, self._where = [], [], {}
+        for cluster in range(nlist):
+            rows = order[bounds[cluster]:bounds[cluster + 1]]
+            block = np.empty((max(1, len(rows)), self.dim), dtype=np.float32)
+            block[:len(rows)] = vectors[rows]
+            self._vectors.append(block)
+            self._labels.append(np.resize(labels[rows], max(1, len(rows))))
+            self._where.update(
+                (int(label), (cluster, pos)) for pos, label in enumerate(labels[rows]))
+
+    def _train(self, vectors: np.ndarray, nlist: int) -> np.ndarray:
+        """Spherical k-means: centroids are renormalized means of their members."""
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), nlist * TRAINING_SAMPLES_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=nlist)
+            empty = counts == 0
+            sums = np.zeros_like(centroids)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums[~empty] = np.add.reduceat(sample[order], starts[~empty], axis=0)
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+        return centroids.astype(np.float32)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=-1)
+
+    # --- Incremental updates ---
+
+    def add(self, label: int, vector: np.ndarray):
+        """Insert (or move) one vector into its nearest cluster."""
+        if not self.is_trained:
+            raise RuntimeError("IVF index must be built before adding vectors.")
+        self.remove(label)
+        self._append(int(self._assign(vector)), int(label), vector)
+
+    def remove(self, label: int) -> bool:
+        """Delete one vector; returns False if the label is not indexed."""
+        location = self._where.pop(label, None)
+        if location is None:
+            return False
+        cluster, pos = location
+        last = self._sizes[cluster] - 1
+        if pos != last:
+            moved = int(self._labels[cluster][last])
+            self._vectors[cluster][pos] = self._vectors[cluster][last]
+            self._labels[cluster][pos] = moved
+            self._where[moved] = (cluster, pos)
+        self._sizes[cluster] = last
+        return True
+
+    def relabel(self, old: int, new: int):
+        """Give an indexed vector a new label (the gallery moves rows on delete)."""
+        cluster, pos = self._where.pop(old)
+        self._labels[cluster][pos] = new
+        self._where[new] = (cluster, pos)
+
+    def _append(self, cluster: int, label: int, vector: np.ndarray):
+        pos = int(self._sizes[cluster])
+        if pos == self._vectors[cluster].shape[0]:
+            grown = np.empty((2 * pos, self.dim), dtype=np.float32)
+            grown[:pos] = self._vectors[cluster]
+            self._vectors[cluster] = grown
+            self._labels[cluster] = np.resize(self._labels[cluster], 2 * pos)
+        self._vectors[cluster][pos] = vector
+        self._labels[cluster][pos] = label
+        self._sizes[cluster] = pos + 1
+        self._where[label] = (cluster, pos)
+
+    # --- Search ---
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k labels by inner product with the query.
+
+        Returns:
+            (labels, scores) sorted by descending score; fewer than k if the
+            probed clusters hold fewer vectors.
+        """
+        if not self.is_trained or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        probed = [c for c in probed if self._sizes[c]]
+        if not probed:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.concatenate([self._vectors[c][:self._sizes[c]] @ query for c in probed])
+        labels = np.concatenate([self._labels[c][:self._sizes[c]] for c in probed])
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return labels[top], scores[top]
+
+    def stats(self) -> dict:
+        sizes = self._sizes[self._sizes > 0]
+        return {
+            "type": "ivf",
+            "nlist": 0 if self.centroids is None else len(self.centroids),
+            "nprobe": self.nprobe,
+            "size": len(self),
+            "trained_size": self.trained_size,
+            "largest_list": int(sizes.max()) if len(sizes) else 0,
+        }
@@ -0,0 +1,107 @@
+"""
+Alternative inference runtimes for the embedding model.
+
+The default backend is the Keras model itself (see embedding.py). Exported
+models (tools/export_model.py) can be served instead:
+- 'tflite': TensorFlow Lite interpreter, e.g. an int8 dynamic-range model
+- 'onnx': ONNX Runtime (optional dependency: onnxruntime)
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('keras', 'tflite', 'onnx')
+
+_EXTENSION_BACKENDS = {
+    '.h5': 'keras',
+    '.keras': 'keras',
+    '.tflite': 'tflite',
+    '.onnx': 'onnx',
+}
+
+
+def backend_for_path(model_path: str) -> str:
+    """Infer the backend from the model file extension (defaults to keras)."""
+    extension = os.path.splitext(str(model_path))[1].lower()
+    return _EXTENSION_BACKENDS.get(extension, 'keras')
+
+
+class TFLiteBackend:
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        """
+        Load a TensorFlow Lite model.
+
+        Args:
+            model_path: Path to the .tflite file
+            num_threads: Interpreter threads (None lets TFLite decide)
+        """
+        import tensorflow as tf
+
+        self.interpreter = tf.lite.Interpreter(
+            model_path=str(model_path), num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape: Tuple[int, ...] = tuple(self._input['shape'][1:])
+        self._batch_size = int(self._input['shape'][0])
+        # The interpreter holds mutable tensor state
+        self._lock = threading.Lock()
+        logger.info(f"Loaded TFLite embedding model from {model_path}")
+
+    def __call__(self, faces: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if faces.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(
+                    self._input['index'], faces.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = faces.shape[0]
+            self.interpreter.set_tensor(
+                self._input['index'], faces.astype(np.float32, copy=False))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output['index']).copy()
+
+
+class OnnxBackend:
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        """
+        Load an ONNX model with ONNX Runtime (CPU).
+
+        Args:
+            model_path: Path to the .onnx file
+            num_threads: Intra-op threads (None lets ONNX Runtime decide)
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' backend requires onnxruntime (pip install onnxruntime).") from e
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape: Tuple[int, ...] = tuple(model_input.shape[1:])
+        logger.info(f"Loaded ONNX embedding model from {model_path}")
+
+    def __call__(self, faces: np.ndarray) -> np.ndarray:
+        return self.session.run(
+            None, {self._input_name: faces.astype(np.float32, copy=False)})[0]
+
+
+def load_runtime_backend(backend: str, model_path: str, num_threads: Optional[int] = None):
+    """Create the non-Keras runtime for an exported model."""
+    if backend == 'tflite':
+        return TFLiteBackend(model_path, num_threads=num_threads)
+    if backend == 'onnx':
+        return OnnxBackend(model_path, num_threads=num_threads)
+    raise ValueError(
+        f"Unknown model backend '{backend}'. Expected one of {BACKENDS}.")
@@ -0,0 +1,108 @@
+"""
+Reduced-resolution image decoding.
+
+libjpeg can decode a JPEG directly at 1/2, 1/4 or 1/8 scale by skipping DCT
+coefficients (cv2.IMREAD_REDUCED_COLOR_*), which is several times faster and
+allocates a fraction of the memory of a full decode followed by a resize.
+The detector only needs its input resolution (300x300 by default) and the
+embedding model a 112x112 face, so large frames and enrollment photos are
+decoded at the coarsest scale that still serves each of them.
+
+The scale is chosen from the frame size in the JPEG header (SOF segment),
+read without decoding. Other formats are always decoded at full size.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+FACTORS = (8, 4, 2, 1)
+
+# Start-of-frame markers (baseline, progressive, ...); C4, C8 and CC are not frames
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+_STANDALONE_MARKERS = set(range(0xD0, 0xDA)) | {0x01}
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG's SOF header, or None if data is not a JPEG."""
+    if data[:2] != b'\xff\xd8':
+        return None
+    i, end = 2, len(data)
+    while i + 4 <= end:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker == 0xDA:  # start of scan: no frame header before the image data
+            return None
+        if marker in _SOF_MARKERS:
+            if i + 9 > end:
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], 'big')
+            width = int.from_bytes(data[i + 7:i + 9], 'big')
+            return (width, height) if width and height else None
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
+
+def reduction_for(size: Optional[Tuple[int, int]], min_side: int) -> int:
+    """Largest scale-down factor that keeps the shorter side at least min_side."""
+    if size is None:
+        return 1
+    shorter = min(size)
+    for factor in FACTORS:
+        if shorter // factor >= min_side:
+            return factor
+    return 1
+
+
+def decode_image(data: bytes, factor: int = 1) -> Optional[np.ndarray]:
+    """Decode image bytes to BGR at 1/factor scale (None if undecodable)."""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_FLAGS[factor])
+
+
+def scale_box(box: Box, factor: int, shape: Tuple[int, int]) -> Box:
+    """Map a box from a 1/factor-scale frame to a frame of shape (h, w)."""
+    h, w = shape
+    x1, y1, x2, y2 = (int(v) * factor for v in box)
+    return (x1, y1, min(x2, w - 1), min(y2, h - 1))
+
+
+def face_reduction(box: Box, max_factor: int, face_size: int) -> int:
+    """
+    Largest factor (up to max_factor) at which the face in box (full-scale
+    coordinates) still spans at least face_size pixels on its shorter side.
+    """
+    x1, y1, x2, y2 = box
+    shorter = min(x2 - x1, y2 - y1)
+    for factor in FACTORS:
+        if factor <= max_factor and shorter // factor >= face_size:
+            return factor
+    return 1
+
+
+def full_shape(size: Optional[Tuple[int, int]], reduced: np.ndarray, factor: int) -> Tuple[int, int]:
+    """Full-scale (h, w) of a frame decoded at 1/factor, honouring EXIF rotation."""
+    h, w = reduced.shape[:2]
+    if size is None or factor == 1:
+        return (h * factor, w * factor)
+    width, height = size
+    # cv2 applies the EXIF orientation, which may swap the header's sides
+    if (h > w) != (height > width):
+        width, height = height, width
+    return (height, width)
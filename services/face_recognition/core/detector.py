@@ -0,0 +1,239 @@
+"""
+Face detection engine around the OpenCV DNN res10 SSD detector.
+
+- Frames are detected in batches with cv2.dnn.blobFromImages
+- The best detection per frame is picked with vectorized numpy, not a Python loop
+- The network input resolution is configurable (res10 is fully convolutional)
+- Fixed cameras can register a region-of-interest hint per device; the hinted
+  region is searched first and the full frame only if nothing is found there
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+# A box with its detector confidence
+Detection = Tuple[Box, float]
+# Normalized (x1, y1, x2, y2) in [0, 1], relative to the frame size
+Roi = Tuple[float, float, float, float]
+
+# Mean subtraction values the res10 model was trained with
+DETECTOR_MEAN = (104.0, 177.0, 123.0)
+
+
+def load_roi_hints(path: Optional[str]) -> Dict[str, Roi]:
+    """
+    Load per-device ROI hints from a JSON file of the form
+    {"<device_id>": [x1, y1, x2, y2], ...} with normalized coordinates.
+
+    A missing path or file yields no hints; invalid entries are skipped.
+    """
+    if not path:
+        return {}
+    if not os.path.exists(path):
+        logger.warning(f"Detector ROI hints file not found: {path}")
+        return {}
+    with open(path) as f:
+        raw = json.load(f)
+
+    hints = {}
+    for device_id, roi in raw.items():
+        try:
+            x1, y1, x2, y2 = (float(v) for v in roi)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed ROI hint for {device_id}: {roi}")
+            continue
+        if not (0.0 <= x1 < x2 <= 1.0 and 0.0 <= y1 < y2 <= 1.0):
+            logger.warning(f"Ignoring out-of-range ROI hint for {device_id}: {roi}")
+            continue
+        hints[str(device_id)] = (x1, y1, x2, y2)
+    logger.info(f"Loaded detector ROI hints for {len(hints)} device(s) from {path}")
+    return hints
+
+
+class FaceDetector:
+    def __init__(
+        self,
+        net=None,
+        input_size: Tuple[int, int] = (300, 300),
+        confidence_threshold: float = 0.3,
+        roi_hints: Optional[Dict[str, Roi]] = None,
+        net_loader: Optional[Callable[[], object]] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            net: Loaded cv2.dnn res10 SSD network
+            input_size: Network input (width, height); frames are resized to it
+            confidence_threshold: Minimum confidence to accept a detection
+            roi_hints: Normalized region to search first, keyed by device id
+            net_loader: Loads the network on first use when net is None
+                (detection is disabled if neither yields a network)
+        """
+        self.net = net
+        self.net_loader = net_loader
+        self.input_size = tuple(int(v) for v in input_size)
+        self.confidence_threshold = confidence_threshold
+        self.roi_hints = dict(roi_hints or {})
+        # A cv2.dnn.Net holds its input blob between setInput and forward
+        self._lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._roi_hits = 0
+        self._roi_fallbacks = 0
+
+    def load(self):
+        """The detector network, loading it through net_loader if needed."""
+        if self.net is None and self.net_loader is not None:
+            self.net = self.net_loader()
+        return self.net
+
+    def detect(self, image: np.ndarray, device_id: Optional[str] = None) -> Optional[Box]:
+        """
+        Detect the most prominent face in one BGR frame.
+
+        Returns:
+            Bounding box (startX, startY, endX, endY) or None if no face found.
+        """
+        return self.detect_batch([image], [device_id])[0]
+
+    def detect_batch(
+        self,
+        images: Sequence[np.ndarray],
+        device_ids: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[Optional[Box]]:
+        """
+        Detect the most prominent face in each of several BGR frames with one
+        forward pass (plus one more for frames whose ROI hint came up empty).
+
+        Returns:
+            One bounding box or None per input frame, in input order.
+        """
+        return [None if detection is None else detection[0]
+                for detection in self.detect_batch_scored(images, device_ids)]
+
+    def detect_batch_scored(
+        self,
+        images: Sequence[np.ndarray],
+        device_ids: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[Optional[Detection]]:
+        """
+        Like detect_batch, with the detector confidence of each box.
+
+        Returns:
+            One (bounding box, confidence) or None per input frame, in input order.
+        """
+        if self.load() is None:
+            logger.error("Face detector model not loaded. Cannot perform detection.")
+            return [None] * len(images)
+        device_ids = list(device_ids) if device_ids is not None else [None] * len(images)
+
+        results: List[Optional[Detection]] = [None] * len(images)
+        valid = [i for i, image in enumerate(images)
+                 if isinstance(image, np.ndarray) and image.ndim == 3 and image.size > 0]
+        if len(valid) < len(images):
+            logger.warning("Invalid image provided to face detection.")
+
+        # First pass: the hinted region for frames from devices with an ROI hint,
+        # the full frame for everything else
+        regions = {i: self._roi_pixels(images[i], device_ids[i]) for i in valid}
+        crops = [self._crop(images[i], regions[i]) for i in valid]
+        for i, detection in zip(valid, self._detect_frames(crops)):
+            if detection is not None:
+                box, confidence = detection
+                x, y = regions[i][:2]
+                results[i] = ((box[0] + x, box[1] + y, box[2] + x, box[3] + y), confidence)
+
+        # Second pass: full frame where the hinted region had no face
+        hinted = [i for i in valid if regions[i] != self._full_frame(images[i])]
+        retry = [i for i in hinted if results[i] is None]
+        if retry:
+            for i, detection in zip(retry, self._detect_frames([images[i] for i in retry])):
+                results[i] = detection
+        with self._stats_lock:
+            self._roi_hits += len(hinted) - len(retry)
+            self._roi_fallbacks += len(retry)
+
+        if valid and all(results[i] is None for i in valid):
+            logger.warning("No face detected meeting the confidence threshold.")
+        return results
+
+    def _detect_frames(self, frames: List[np.ndarray]) -> List[Optional[Detection]]:
+        if not frames:
+            return []
+        try:
+            blob = cv2.dnn.blobFromImages(
+                frames, 1.0, self.input_size, DETECTOR_MEAN)
+            with self._lock:
+                self.net.setInput(blob)
+                detections = self.net.forward()
+        except cv2.error as e:
+            logger.error(f"Error during face detection: {e}", exc_info=True)
+            return [None] * len(frames)
+        return self._best_boxes(detections, [frame.shape[:2] for frame in frames])
+
+    def _best_boxes(self, detections: np.ndarray, shapes: List[Tuple[int, int]]) -> List[Optional[Detection]]:
+        """Highest-confidence box (and its confidence) per frame from an SSD (1, 1, N, 7) output."""
+        rows = detections.reshape(-1, 7)
+        rows = rows[rows[:, 2] > self.confidence_threshold]
+        image_ids = rows[:, 0].astype(np.int64)
+        rows = rows[(image_ids >= 0) & (image_ids < len(shapes))]
+        image_ids = rows[:, 0].astype(np.int64)
+
+        # Sort by frame, then by descending confidence: the first row of each
+        # frame is its best detection
+        order = np.lexsort((-rows[:, 2], image_ids))
+        frame_ids, first = np.unique(image_ids[order], return_index=True)
+        best = rows[order[first]]
+
+        sizes = np.array(shapes, dtype=np.float32)[frame_ids]  # (h, w)
+        scale = np.stack([sizes[:, 1], sizes[:, 0], sizes[:, 1], sizes[:, 0]], axis=1)
+        boxes = (best[:, 3:7] * scale).astype(np.int64)
+        boxes[:, 0:2] = np.maximum(boxes[:, 0:2], 0)
+        boxes[:, 2] = np.minimum(boxes[:, 2], sizes[:, 1].astype(np.int64) - 1)
+        boxes[:, 3] = np.minimum(boxes[:, 3], sizes[:, 0].astype(np.int64) - 1)
+
+        results: List[Optional[Detection]] = [None] * len(shapes)
+        for frame_id, box, confidence in zip(frame_ids, boxes, best[:, 2]):
+            results[frame_id] = (tuple(int(v) for v in box), float(confidence))
+            logger.debug(
+                f"Face detected with confidence {confidence:.2f} at box: {results[frame_id][0]}")
+        return results
+
+    @staticmethod
+    def _full_frame(image: np.ndarray) -> Box:
+        h, w = image.shape[:2]
+        return (0, 0, w, h)
+
+    def _roi_pixels(self, image: np.ndarray, device_id: Optional[str]) -> Box:
+        roi = self.roi_hints.get(device_id) if device_id is not None else None
+        if roi is None:
+            return self._full_frame(image)
+        h, w = image.shape[:2]
+        x1, y1, x2, y2 = roi
+        return (int(x1 * w), int(y1 * h), max(int(x2 * w), int(x1 * w) + 1),
+                max(int(y2 * h), int(y1 * h) + 1))
+
+    @staticmethod
+    def _crop(image: np.ndarray, region: Box) -> np.ndarray:
+        x1, y1, x2, y2 = region
+        return image[y1:y2, x1:x2]
+
+    def stats(self) -> dict:
+        """Input size and how often ROI hints found the face without a full-frame pass."""
+        with self._stats_lock:
+            return {
+                "input_size": list(self.input_size),
+                "roi_hint_devices": len(self.roi_hints),
+                "roi_hits": self._roi_hits,
+                "roi_fallbacks": self._roi_fallbacks,
+            }
@@ -8,22 +8,123 @@ import numpy as np
 from typing import Optional
 # Updated import to include new functions
 from .preprocessing import detect_face, align_face_simple, preprocess_image
+from .backends import backend_for_path, load_runtime_backend
 import logging
 
 logger = logging.getLogger(__name__)  # Add logger
 
 
 class FaceEmbedding:
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, compiled: bool = True, warmup: bool = True,
+                 backend: Optional[str] = None, num_threads: Optional[int] = None):
         """
         Initialize the face embedding generator.
 
         Args:
-            model_path: Path to the GhostFaceNets model
+            model_path: Path to the GhostFaceNets model (.h5, or an exported
+                .tflite / .onnx file)
+            compiled: Run Keras inference through a tf.function with a fixed
+                input signature instead of model.predict
+            warmup: Run one inference at load time so the first request does
+                not pay for graph tracing
+            backend: 'keras', 'tflite' or 'onnx'; inferred from the file
+                extension when None
+            num_threads: Interpreter threads for the tflite/onnx backends
         """
-        # TODO: Add error handling for model loading?
-        self.model = tf.keras.models.load_model(model_path)
-        logger.info(f"Loaded face embedding model from {model_path}")
+        self.backend = backend or backend_for_path(model_path)
+        self.compiled = compiled
+        self._runtime = None
+
+        if self.backend == 'keras':
+            # TODO: Add error handling for model loading?
+            self.model = tf.keras.models.load_model(model_path)
+            logger.info(f"Loaded face embedding model from {model_path}")
+            self.input_shape = tuple(self.model.input_shape[1:])
+            if compiled:
+                # model.predict carries per-call Keras overhead (callbacks, data
+                # adapter, retracing) that dominates for single samples. A
+                # tf.function with a fixed signature is traced once per process.
+                self._infer = tf.function(
+                    lambda x: self.model(x, training=False),
+                    input_signature=[tf.TensorSpec(
+                        shape=(None,) + self.input_shape, dtype=tf.float32)])
+        else:
+            self.model = None
+            self._runtime = load_runtime_backend(
+                self.backend, model_path, num_threads=num_threads)
+            self.input_shape = self._runtime.input_shape
+
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """Run a dummy inference to trigger tracing and kernel initialization."""
+        dummy = np.zeros((1,) + self.input_shape, dtype=np.float32)
+        self.embed_batch(dummy)
+        logger.info("Face embedding model warmed up.")
+
+    def extract_face(self, raw_image: np.ndarray, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Detect, crop and preprocess the face in a raw input image, producing
+        a single model input (H, W, C) without the batch dimension.
+
+        Args:
+            raw_image: Raw input image (BGR format from OpenCV decode).
+            out: Optional float32 (H, W, C) array to write the face into
+
+        Returns:
+            Preprocessed face (numpy array) or None if any step failed.
+        """
+        # 1. Detect Face
+        logger.debug("Step 1: Detecting face...")
+        bounding_box = detect_face(raw_image)
+        if bounding_box is None:
+            logger.warning(
+                "Face detection failed. Cannot generate embedding.")
+            return None
+        logger.debug(f"Face detected with box: {bounding_box}")
+
+        # 2. Align Face (Simple Crop)
+        logger.debug("Step 2: Aligning face (simple crop)...")
+        aligned_face = align_face_simple(raw_image, bounding_box)
+        if aligned_face is None:
+            logger.warning(
+                "Face alignment (cropping) failed. Cannot generate embedding.")
+            return None
+        logger.debug(
+            f"Face cropped successfully. Shape: {aligned_face.shape}")
+
+        # 3. Preprocess Aligned Face (BGR->RGB, Resize, Normalize)
+        logger.debug("Step 3: Preprocessing cropped face...")
+        preprocessed_face = preprocess_image(aligned_face, out=out)
+        if preprocessed_face is None:
+            logger.warning(
+                "Final face preprocessing failed. Cannot generate embedding.")
+            return None
+        logger.debug(
+            f"Face preprocessed successfully. Shape: {preprocessed_face.shape}")
+        return preprocessed_face
+
+    def embed_batch(self, faces: np.ndarray) -> np.ndarray:
+        """
+        Run the model on a batch of preprocessed faces.
+
+        Args:
+            faces: Batch of preprocessed faces, shape (N, H, W, C).
+
+        Returns:
+            Embeddings, shape (N, D).
+        """
+        if self._runtime is not None:
+            logger.debug(
+                f"Generating embeddings via {self.backend} backend for batch {faces.shape}")
+            return self._runtime(faces)
+        if self.compiled:
+            logger.debug(
+                f"Generating embeddings via compiled model call for batch {faces.shape}")
+            return self._infer(tf.convert_to_tensor(faces, dtype=tf.float32)).numpy()
+        logger.debug(f"Generating embeddings via model.predict for batch {faces.shape}")
+        return self.model.predict(faces, verbose=0)
 
     def generate_embedding(self, raw_image: np.ndarray) -> Optional[np.ndarray]:
         """
@@ -38,43 +139,15 @@ class FaceEmbedding:
         """
         logger.debug("Starting embedding generation process...")
         try:
-            # 1. Detect Face
-            logger.debug("Step 1: Detecting face...")
-            bounding_box = detect_face(raw_image)
-            if bounding_box is None:
-                logger.warning(
-                    "Face detection failed. Cannot generate embedding.")
+            # 4. Preprocess straight into row 0 of the model's batch input
+            batch_input = np.empty((1,) + self.input_shape, dtype=np.float32)
+            if self.extract_face(raw_image, out=batch_input[0]) is None:
                 return None
-            logger.debug(f"Face detected with box: {bounding_box}")
-
-            # 2. Align Face (Simple Crop)
-            logger.debug("Step 2: Aligning face (simple crop)...")
-            aligned_face = align_face_simple(raw_image, bounding_box)
-            if aligned_face is None:
-                logger.warning(
-                    "Face alignment (cropping) failed. Cannot generate embedding.")
-                return None
-            logger.debug(
-                f"Face cropped successfully. Shape: {aligned_face.shape}")
-
-            # 3. Preprocess Aligned Face (BGR->RGB, Resize, Normalize)
-            logger.debug("Step 3: Preprocessing cropped face...")
-            preprocessed_face = preprocess_image(aligned_face)
-            if preprocessed_face is None:
-                logger.warning(
-                    "Final face preprocessing failed. Cannot generate embedding.")
-                return None
-            logger.debug(
-                f"Face preprocessed successfully. Shape: {preprocessed_face.shape}")
-
-            # 4. Add Batch Dimension
-            logger.debug("Step 4: Adding batch dimension...")
-            batch_input = np.expand_dims(preprocessed_face, axis=0)
             logger.debug(f"Final input shape for model: {batch_input.shape}")
 
             # 5. Generate Embedding using the Model
-            logger.debug("Step 5: Generating embedding via model.predict...")
-            embedding = self.model.predict(batch_input)
+            logger.debug("Step 5: Generating embedding via the model...")
+            embedding = self.embed_batch(batch_input)
             logger.debug(f"Raw embedding generated. Shape: {embedding.shape}")
 
             # 6. Remove Batch Dimension & Return
@@ -0,0 +1,78 @@
+"""
+Best-frame selection for multi-frame (burst) captures.
+
+A door unit can send a short burst of frames instead of one, since a single
+frame is often motion-blurred. Every frame with a detected face is scored in
+one vectorized pass, and only the best one is embedded:
+
+- sharpness: variance of the Laplacian of the face, resampled to a fixed
+  PATCH_SIZE grayscale patch so faces of any size are compared alike
+- face_size: shorter side of the face box in full-resolution pixels
+- confidence: detector confidence
+
+Sharpness and face size are scaled by their maximum over the burst, so each
+feature lies in [0, 1] and the score is their weighted sum.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+PATCH_SIZE = 64
+DEFAULT_WEIGHTS = {"sharpness": 0.5, "face_size": 0.25, "confidence": 0.25}
+
+
+def face_patches(images: Sequence[np.ndarray], boxes: Sequence[Box],
+                 size: int = PATCH_SIZE) -> np.ndarray:
+    """(N, size, size) float32 grayscale patches of each image's face box."""
+    patches = np.empty((len(images), size, size), dtype=np.float32)
+    for patch, image, (x1, y1, x2, y2) in zip(patches, images, boxes):
+        face = image[y1:y2, x1:x2]
+        if face.ndim == 3:
+            face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        patch[...] = cv2.resize(face, (size, size), interpolation=cv2.INTER_AREA)
+    return patches
+
+
+def sharpness(patches: np.ndarray) -> np.ndarray:
+    """Laplacian variance of each patch in an (N, H, W) stack."""
+    p = patches
+    laplacian = (4 * p[:, 1:-1, 1:-1] - p[:, :-2, 1:-1] - p[:, 2:, 1:-1]
+                 - p[:, 1:-1, :-2] - p[:, 1:-1, 2:])
+    return laplacian.reshape(len(p), -1).var(axis=1)
+
+
+def score_frames(
+    patches: np.ndarray,
+    face_sizes: Sequence[float],
+    confidences: Sequence[float],
+    weights: Optional[Dict[str, float]] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Score candidate frames.
+
+    Args:
+        patches: (N, H, W) face patches (see face_patches)
+        face_sizes: Face size of each frame in pixels
+        confidences: Detector confidence of each frame (0-1)
+        weights: Weight of each feature (defaults to DEFAULT_WEIGHTS)
+
+    Returns:
+        (scores, features): (N,) scores, higher is better, and the raw
+        per-frame feature values by name
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    features = {
+        "sharpness": sharpness(patches),
+        "face_size": np.asarray(face_sizes, dtype=np.float32),
+        "confidence": np.asarray(confidences, dtype=np.float32),
+    }
+    scores = np.zeros(len(patches), dtype=np.float32)
+    for name, values in features.items():
+        scale = values.max() if name != "confidence" and len(values) else 1.0
+        if scale > 0:
+            scores += weights[name] * values / scale
+    return scores, features
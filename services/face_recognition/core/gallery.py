@@ -0,0 +1,312 @@
+"""
+In-memory gallery of enrolled face embeddings for 1:N identification.
+
+Embeddings are stored L2-normalized in one contiguous float32 matrix, so
+identifying a probe is a single matrix-vector product (cosine similarity)
+followed by a partial sort for the top k.
+
+With a snapshot path (opt-in), the gallery is also kept on disk and shared between
+processes (e.g. gunicorn workers): mutations take an exclusive file lock,
+reload any newer snapshot, apply the change and write the snapshot back
+atomically; reads reload the snapshot when it has been replaced. The IVF
+clusters and each row's cluster are saved with it, so a reloading process
+refills its index without retraining.
+
+With index='ivf', galleries of at least ivf_min_size identities are searched
+through an approximate IVF index (core/ann_index.py) kept in step with every
+add and remove, and rebuilt when the gallery has doubled or halved since the
+clusters were trained.
+"""
+
+import fcntl
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .ann_index import IVFIndex
+from .verification import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 256
+# Below this size exact search is already sub-millisecond
+IVF_MIN_SIZE = 4096
+INDEX_TYPES = ('flat', 'ivf')
+
+
+class FaceGallery:
+    def __init__(
+        self,
+        dim: int = 512,
+        path: Optional[str] = None,
+        index: str = 'flat',
+        nprobe: int = 8,
+        ivf_min_size: int = IVF_MIN_SIZE,
+    ):
+        """
+        Initialize an empty gallery (loading the snapshot at path, if any).
+
+        Args:
+            dim: Embedding dimension
+            path: Optional .npz snapshot shared between processes
+            index: 'flat' (exact search) or 'ivf' (approximate, for large galleries)
+            nprobe: IVF clusters searched per query
+            ivf_min_size: Gallery size from which the IVF index is used
+        """
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Unknown gallery index '{index}', expected one of {INDEX_TYPES}")
+        self.dim = dim
+        self.path = str(path) if path else None
+        self.ivf_min_size = ivf_min_size
+        self._ann = IVFIndex(dim, nprobe=nprobe) if index == 'ivf' else None
+        self._lock = threading.RLock()
+        self._matrix = np.empty((INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._snapshot_version: Optional[Tuple[int, int]] = None
+        if self.path:
+            with self._lock:
+                self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    def __contains__(self, identity: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return identity in self._rows
+
+    def get(self, identity: str) -> Optional[np.ndarray]:
+        """Copy of an enrolled identity's normalized embedding, or None."""
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(str(identity))
+            return None if row is None else self._matrix[row].copy()
+
+    # --- Mutations ---
+
+    def add(self, identity: str, embedding, name: Optional[str] = None):
+        """Add an identity, or replace its embedding if it is already enrolled."""
+        vector = self._check(embedding)
+        with self._mutation():
+            self._put(str(identity), vector, name)
+
+    def remove(self, identity: str) -> bool:
+        """Remove an identity; returns False if it was not enrolled."""
+        with self._mutation():
+            return self._delete(str(identity))
+
+    def replace_all(self, entries: Iterable[Tuple[str, object, Optional[str]]]):
+        """Replace the whole gallery with (identity, embedding, name) entries."""
+        entries = [(str(identity), self._check(embedding), name)
+                   for identity, embedding, name in entries]
+        with self._mutation(reload=False):
+            self._ids, self._names, self._rows = [], [], {}
+            self._reset_index()
+            for identity, vector, name in entries:
+                self._put(identity, vector, name)
+
+    def _put(self, identity: str, vector: np.ndarray, name: Optional[str]):
+        row = self._rows.get(identity)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1)
+            self._ids.append(identity)
+            self._names.append(name)
+            self._rows[identity] = row
+        else:
+            self._names[row] = name
+        self._matrix[row] = vector
+        if self._index_active:
+            self._ann.add(row, vector)
+
+    def _delete(self, identity: str) -> bool:
+        row = self._rows.pop(identity, None)
+        if row is None:
+            return False
+        # Keep the matrix dense: move the last row into the hole
+        last = len(self._ids) - 1
+        if self._index_active:
+            self._ann.remove(row)
+            if row != last:
+                self._ann.relabel(last, row)
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = self._ids[last]
+            self._names[row] = self._names[last]
+            self._rows[self._ids[row]] = row
+        self._ids.pop()
+        self._names.pop()
+        return True
+
+    def _reserve(self, size: int):
+        if size <= self._matrix.shape[0]:
+            return
+        capacity = max(size, 2 * self._matrix.shape[0])
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+        self._matrix = grown
+
+    def _check(self, embedding) -> np.ndarray:
+        # Normalized like the verification references, so scores agree
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(
+                f"Expected an embedding of shape ({self.dim},), got {vector.shape}")
+        if not vector.any():
+            raise ValueError("Cannot normalize a zero embedding.")
+        return normalize_rows(vector)[0]
+
+    # --- ANN index maintenance ---
+
+    @property
+    def _index_active(self) -> bool:
+        return self._ann is not None and self._ann.is_trained
+
+    def _reset_index(self):
+        if self._ann is not None:
+            self._ann.centroids = None
+            self._ann.trained_size = 0
+
+    def _maintain_index(self):
+        """(Re)build the IVF index once the gallery is large enough, or has
+        doubled or halved since the clusters were trained."""
+        if self._ann is None:
+            return
+        count = len(self._ids)
+        if count < self.ivf_min_size:
+            self._reset_index()
+            return
+        trained = self._ann.trained_size
+        if self._ann.is_trained and trained // 2 <= count <= 2 * trained:
+            return
+        start = time.perf_counter()
+        self._ann.build(np.arange(count), self._matrix[:count])
+        logger.info(f"Built IVF gallery index over {count} identities "
+                    f"({len(self._ann.centroids)} lists) in {time.perf_counter() - start:.2f}s")
+
+    # --- Search ---
+
+    def identify(self, embedding, k: int = 5, threshold: Optional[float] = None) -> List[Dict]:
+        """
+        Top-k enrolled identities by cosine similarity to the probe.
+
+        Args:
+            embedding: Probe embedding (normalized here)
+            k: Maximum number of matches
+            threshold: Drop matches with a lower similarity
+
+        Returns:
+            Matches sorted by descending similarity:
+            [{"employee_id": ..., "name": ..., "similarity": ...}, ...]
+        """
+        probe = self._check(embedding)
+        with self._lock:
+            self._refresh()
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            if self._index_active:
+                rows, scores = self._ann.search(probe, k)
+            else:
+                similarities = self._matrix[:count] @ probe
+                k = min(k, count)
+                rows = np.argpartition(-similarities, k - 1)[:k]
+                rows = rows[np.argsort(-similarities[rows])]
+                scores = similarities[rows]
+            return [{
+                "employee_id": self._ids[row],
+                "name": self._names[row],
+                "similarity": float(score),
+            } for row, score in zip(rows, scores) if threshold is None or score >= threshold]
+
+    # --- Snapshot sharing ---
+
+    @contextmanager
+    def _mutation(self, reload: bool = True):
+        with self._lock:
+            if not self.path:
+                yield
+                self._maintain_index()
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if reload:
+                    self._refresh()
+                yield
+                self._maintain_index()
+                self._save()
+
+    def _refresh(self):
+        """Reload the snapshot if another process wrote a newer one."""
+        if not self.path:
+            return
+        try:
+            version = self._version(os.stat(self.path))
+        except FileNotFoundError:
+            return
+        if version == self._snapshot_version:
+            return
+        with np.load(self.path, allow_pickle=False) as snapshot:
+            embeddings = snapshot['embeddings'].astype(np.float32, copy=False)
+            ids = [str(i) for i in snapshot['ids']]
+            names = [str(n) if n else None for n in snapshot['names']]
+            ivf = None
+            if 'ivf_centroids' in snapshot.files:
+                ivf = (snapshot['ivf_centroids'], snapshot['ivf_assignments'],
+                       int(snapshot['ivf_trained_size']))
+        self._matrix = np.empty((max(INITIAL_CAPACITY, len(ids)), self.dim), dtype=np.float32)
+        self._matrix[:len(ids)] = embeddings
+        self._ids, self._names = ids, names
+        self._rows = {identity: row for row, identity in enumerate(ids)}
+        self._reset_index()
+        if self._ann is not None and ivf is not None:
+            centroids, assignments, trained_size = ivf
+            if centroids.shape[1:] == (self.dim,) and len(assignments) == len(ids):
+                self._ann.restore(np.arange(len(ids)), self._matrix[:len(ids)],
+                                  centroids, assignments, trained_size)
+        self._maintain_index()
+        self._snapshot_version = version
+        logger.info(f"Loaded gallery snapshot with {len(ids)} identities from {self.path}")
+
+    def _save(self):
+        count = len(self._ids)
+        tmp_path = self.path + '.tmp.npz'
+        ivf = {}
+        if self._index_active:
+            ivf = {"ivf_centroids": self._ann.centroids,
+                   "ivf_assignments": self._ann.assignments(range(count)),
+                   "ivf_trained_size": np.int64(self._ann.trained_size)}
+        np.savez(tmp_path,
+                 embeddings=self._matrix[:count],
+                 ids=np.array(self._ids, dtype=str),
+                 names=np.array([n or '' for n in self._names], dtype=str),
+                 **ivf)
+        os.replace(tmp_path, self.path)
+        self._snapshot_version = self._version(os.stat(self.path))
+
+    @staticmethod
+    def _version(stat) -> Tuple[int, int]:
+        # Every save replaces the file, so the inode changes even when two
+        # writes land within the filesystem's timestamp granularity
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "size": len(self._ids),
+                "capacity": int(self._matrix.shape[0]),
+                "dim": self.dim,
+                "shared_snapshot": self.path,
+                "index": self._ann.stats() if self._index_active else {"type": "flat"},
+            }
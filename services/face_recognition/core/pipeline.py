@@ -0,0 +1,357 @@
+"""
+Single-pass face embedding pipeline.
+
+decode -> quality -> detect (on the original frame) -> crop -> preprocess (once) -> infer
+
+With reduced decoding enabled, JPEGs are decoded for detection at the
+coarsest libjpeg scale that still covers the detector input, and the face is
+cropped from a decode just fine enough for the embedding size (the same one
+when the face is large enough, see core/decode.py).
+
+For a burst of frames from one capture, every frame is decoded, gated and
+detected (in one batched detector pass), the faces are scored by sharpness,
+size and detector confidence (core/frame_selection.py), and only the best
+frame is cropped, preprocessed and embedded.
+
+Callers that already know where the face is skip detection: with a box the
+face is cropped from it directly, and a pre-cropped face image goes straight
+to preprocessing. Only the resolution the face needs is decoded in both cases.
+
+Every stage is timed so callers can report a per-stage breakdown, overall and
+per input mode. The optional quality gate rejects dark, blank and blurred
+frames before the detector runs, and faces too small to embed before the
+model runs.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .decode import (FACTORS, decode_image, face_reduction, full_shape,
+                     jpeg_dimensions, reduction_for, scale_box)
+from .detector import FaceDetector
+from .frame_selection import face_patches, score_frames
+from .preprocessing import detect_face, align_face_simple, face_buffer, preprocess_image
+from .quality import GATES, QualityGate
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('decode', 'quality', 'detect', 'crop', 'preprocess', 'infer')
+# A burst also spends time choosing its best frame
+BURST_STAGES = ('decode', 'quality', 'detect', 'select', 'crop', 'preprocess', 'infer')
+# detect: find the face; box: caller gave the face box; crop: image is the face;
+# burst: best of several frames
+MODES = ('detect', 'box', 'crop', 'burst')
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one pipeline run. embedding is None when a stage failed."""
+    embedding: Optional[np.ndarray] = None
+    error: Optional[str] = None
+    status: int = 200
+    box: Optional[Tuple[int, int, int, int]] = None
+    mode: str = 'detect'
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Name of the quality gate that rejected the frame, and its measurements
+    rejected_by: Optional[str] = None
+    quality: Dict[str, float] = field(default_factory=dict)
+    # Burst runs: index of the embedded frame, and each frame's score
+    # features (None for frames that failed decoding, the gate or detection)
+    frame: Optional[int] = None
+    frame_scores: List[Optional[Dict[str, float]]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.embedding is not None
+
+    def server_timing(self) -> str:
+        """Timings formatted for an HTTP Server-Timing header."""
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.timings.items())
+
+    def error_body(self) -> dict:
+        """JSON body for a failed run; says which quality gate rejected the frame."""
+        body = {"error": self.error, "timings_ms": self.timings}
+        if self.rejected_by is not None:
+            body["quality_gate"] = self.rejected_by
+            body["quality"] = self.quality
+        return body
+
+
+class FacePipeline:
+    def __init__(self, infer_fn: Callable[[np.ndarray], np.ndarray],
+                 detector: Optional[FaceDetector] = None,
+                 quality_gate: Optional[QualityGate] = None,
+                 detect_min_side: Optional[int] = None,
+                 face_size: int = 112):
+        """
+        Initialize the pipeline.
+
+        Args:
+            infer_fn: Turns one preprocessed face (H, W, C) into its embedding,
+                e.g. InferenceScheduler.embed; the face is a per-thread buffer
+                that must not be kept after infer_fn returns
+            detector: Face detector to use (defaults to preprocessing.detect_face)
+            quality_gate: Rejects unusable frames before detection and
+                inference (None disables the checks)
+            detect_min_side: Decode JPEGs for detection at reduced scale, as
+                long as the shorter side stays at least this many pixels
+                (None always decodes at full resolution)
+            face_size: Face resolution the model needs, for the crop decode
+        """
+        self.infer_fn = infer_fn
+        self.detector = detector
+        self.quality_gate = quality_gate
+        self.detect_min_side = detect_min_side
+        self.face_size = face_size
+        self._stats_lock = threading.Lock()
+        self._runs = {mode: 0 for mode in MODES}
+        self._stage_totals = {mode: {stage: 0.0 for stage in BURST_STAGES} for mode in MODES}
+        self._rejections = {gate: 0 for gate in GATES}
+
+    @contextmanager
+    def _timed(self, result: PipelineResult, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            result.timings[stage] = (time.perf_counter() - start) * 1000.0
+
+    def _fail(self, result: PipelineResult, error: str, status: int = 400) -> PipelineResult:
+        logger.warning(f"Face pipeline failed: {error}")
+        result.error = error
+        result.status = status
+        return result
+
+    def run(self, image_data: bytes, device_id: Optional[str] = None,
+            box: Optional[Sequence[int]] = None, cropped: bool = False) -> PipelineResult:
+        """
+        Run the full pipeline on encoded image bytes (JPEG/PNG).
+
+        device_id selects the detector's ROI hint for the camera, if any.
+        box (x1, y1, x2, y2 in full-resolution pixels) gives the face's
+        position, and cropped=True says the image is already the face crop;
+        either skips detection.
+        """
+        result = PipelineResult(mode='crop' if cropped else 'box' if box is not None else 'detect')
+        if result.mode == 'box':
+            box = self._parse_box(box)
+            if box is None:
+                return self._fail(result, "Invalid face box")
+
+        with self._timed(result, 'decode'):
+            size, factor = None, 1
+            if self.detect_min_side:
+                size = jpeg_dimensions(image_data)
+                factor = self._decode_factor(result.mode, size, box)
+            image = decode_image(image_data, factor)
+        if image is None:
+            return self._fail(result, "Failed to decode image data")
+        logger.debug(f"Decoded image at 1/{factor} scale. Shape: {image.shape}")
+        shape = full_shape(size, image, factor)
+
+        report = None
+        if self.quality_gate is not None:
+            with self._timed(result, 'quality'):
+                report = self.quality_gate.check_frame(image)
+            if not report.passed:
+                return self._reject(result, report)
+
+        if result.mode == 'detect':
+            with self._timed(result, 'detect'):
+                if self.detector is not None:
+                    box = self.detector.detect(image, device_id)
+                else:
+                    box = detect_face(image, device_id)
+            if box is None:
+                return self._fail(result, "Face not detected")
+            box = tuple(int(v) for v in box)
+            # Reported box and face-size gate are in full-resolution pixels
+            result.box = scale_box(box, factor, shape)
+        elif result.mode == 'box':
+            x1, y1, x2, y2 = box
+            h, w = shape
+            if x1 >= w or y1 >= h:
+                return self._fail(result, "Face box lies outside the image")
+            result.box = (x1, y1, min(x2, w), min(y2, h))
+        else:
+            result.box = (0, 0, shape[1], shape[0])
+        if report is not None:
+            report = self.quality_gate.check_face(result.box, report)
+            if not report.passed:
+                return self._reject(result, report)
+
+        return self._embed(result, image_data, image, factor, box)
+
+    def run_best(self, frames: Sequence[bytes], device_id: Optional[str] = None) -> PipelineResult:
+        """
+        Embed the best frame of a burst (encoded image bytes of one capture).
+
+        All frames are decoded, checked by the quality gate and detected in
+        one batch; the faces are scored and only the best frame is cropped,
+        preprocessed and embedded. result.frame is its index. The run fails
+        only when no frame is usable, with the first frame's failure.
+        """
+        result = PipelineResult(mode='burst', frame_scores=[None] * len(frames))
+        if not frames:
+            return self._fail(result, "No frames provided")
+
+        with self._timed(result, 'decode'):
+            decoded = []
+            for data in frames:
+                size, factor = None, 1
+                if self.detect_min_side:
+                    size = jpeg_dimensions(data)
+                    factor = reduction_for(size, self.detect_min_side)
+                decoded.append((decode_image(data, factor), size, factor))
+        candidates = [i for i, (image, _, _) in enumerate(decoded) if image is not None]
+        if not candidates:
+            return self._fail(result, "Failed to decode image data")
+
+        reports = {}
+        if self.quality_gate is not None:
+            with self._timed(result, 'quality'):
+                reports = {i: self.quality_gate.check_frame(decoded[i][0]) for i in candidates}
+            passed = [i for i in candidates if reports[i].passed]
+            if not passed:
+                return self._reject(result, reports[candidates[0]])
+            candidates = passed
+
+        with self._timed(result, 'detect'):
+            images = [decoded[i][0] for i in candidates]
+            if self.detector is not None:
+                detections = self.detector.detect_batch_scored(images, [device_id] * len(images))
+            else:
+                # Module-level detector: no confidence, every face counts as certain
+                detections = [None if box is None else (box, 1.0)
+                              for box in (detect_face(image, device_id) for image in images)]
+        found = {i: detection for i, detection in zip(candidates, detections) if detection is not None}
+        if not found:
+            return self._fail(result, "Face not detected")
+
+        faces = {}  # frame -> (reduced box, full-resolution box, confidence)
+        for i, (box, confidence) in found.items():
+            image, size, factor = decoded[i]
+            box = tuple(int(v) for v in box)
+            faces[i] = (box, scale_box(box, factor, full_shape(size, image, factor)), confidence)
+        if self.quality_gate is not None:
+            for i in list(faces):
+                reports[i] = self.quality_gate.check_face(faces[i][1], reports[i])
+            usable = [i for i in faces if reports[i].passed]
+            if not usable:
+                return self._reject(result, reports[next(iter(faces))])
+            faces = {i: faces[i] for i in usable}
+
+        with self._timed(result, 'select'):
+            indices = list(faces)
+            patches = face_patches([decoded[i][0] for i in indices],
+                                   [faces[i][0] for i in indices])
+            scores, features = score_frames(
+                patches,
+                [min(x2 - x1, y2 - y1) for x1, y1, x2, y2 in (faces[i][1] for i in indices)],
+                [faces[i][2] for i in indices])
+            best = indices[int(scores.argmax())]
+        for n, i in enumerate(indices):
+            result.frame_scores[i] = {"score": float(scores[n]),
+                                      **{name: float(values[n]) for name, values in features.items()}}
+        result.frame = best
+        logger.debug(f"Burst of {len(frames)} frames: embedding frame {best} (scores {scores})")
+
+        image, _, factor = decoded[best]
+        result.box = faces[best][1]
+        return self._embed(result, frames[best], image, factor, faces[best][0])
+
+    def _embed(self, result: PipelineResult, image_data: bytes, image: np.ndarray,
+               factor: int, box) -> PipelineResult:
+        """Crop (unless the image is the face), preprocess and infer; result.box is set."""
+        if result.mode == 'crop':
+            face = image
+        else:
+            with self._timed(result, 'crop'):
+                face_factor = face_reduction(result.box, factor, self.face_size)
+                if face_factor != factor:
+                    # Small face in a large frame: decode finer for the crop
+                    image = decode_image(image_data, face_factor)
+                if face_factor != factor or result.mode == 'box':
+                    box = tuple(v // face_factor for v in result.box)
+                face = align_face_simple(image, box)
+            if face is None:
+                return self._fail(result, "Face cropping failed")
+
+        with self._timed(result, 'preprocess'):
+            # infer_fn is synchronous, so this thread's buffer is free again
+            # by the next run
+            preprocessed = preprocess_image(face, out=face_buffer())
+        if preprocessed is None:
+            return self._fail(result, "Image preprocessing failed")
+
+        try:
+            with self._timed(result, 'infer'):
+                result.embedding = self.infer_fn(preprocessed)
+        except Exception as e:
+            logger.error(f"Inference failed: {e}", exc_info=True)
+            return self._fail(result, "Failed to generate embedding", 500)
+
+        self._record(result)
+        logger.debug(f"Face pipeline timings (ms): {result.timings}")
+        return result
+
+    @staticmethod
+    def _parse_box(box) -> Optional[Tuple[int, int, int, int]]:
+        try:
+            box = tuple(int(v) for v in box)
+        except (TypeError, ValueError):
+            return None
+        if len(box) != 4 or min(box) < 0 or box[2] <= box[0] or box[3] <= box[1]:
+            return None
+        return box
+
+    def _decode_factor(self, mode: str, size: Optional[Tuple[int, int]], box) -> int:
+        if mode == 'detect':
+            return reduction_for(size, self.detect_min_side)
+        if size is None:
+            return 1
+        # No detector to feed: the coarsest scale that still serves the face
+        face = box if mode == 'box' else (0, 0) + size
+        return face_reduction(face, max(FACTORS), self.face_size)
+
+    def _reject(self, result: PipelineResult, report) -> PipelineResult:
+        result.rejected_by = report.gate
+        result.quality = report.metrics
+        with self._stats_lock:
+            self._rejections[report.gate] += 1
+        return self._fail(result, report.message)
+
+    def _record(self, result: PipelineResult):
+        with self._stats_lock:
+            self._runs[result.mode] += 1
+            totals = self._stage_totals[result.mode]
+            for stage, ms in result.timings.items():
+                if stage in totals:
+                    totals[stage] += ms
+
+    def stats(self) -> dict:
+        """
+        Mean per-stage latency over successful runs, overall and per input
+        mode, and quality rejections per gate.
+        """
+        def means(totals, runs):
+            return {stage: (total / runs if runs else 0.0) for stage, total in totals.items()}
+
+        with self._stats_lock:
+            runs = sum(self._runs.values())
+            overall = {stage: sum(totals[stage] for totals in self._stage_totals.values())
+                       for stage in BURST_STAGES}
+            return {
+                "runs": runs,
+                "mean_stage_ms": means(overall, runs),
+                "modes": {mode: {"runs": self._runs[mode],
+                                 "mean_stage_ms": means(self._stage_totals[mode], self._runs[mode])}
+                          for mode in MODES},
+                "quality_rejections": dict(self._rejections),
+            }
@@ -6,6 +6,10 @@ import cv2
 import numpy as np
 from typing import Union, Tuple, Optional
 import logging
+import threading
+
+from .detector import FaceDetector
+from .quality import QualityGate
 
 logger = logging.getLogger(__name__)  # Add logger
 
@@ -16,84 +20,56 @@ PROTOTXT_PATH = "core/models/detector/deploy.prototxt"
 MODEL_PATH = "core/models/detector/res10_300x300_ssd_iter_140000.caffemodel"
 CONFIDENCE_THRESHOLD = 0.3  # Minimum confidence to consider a detection
 
-# Load the network
-try:
-    face_detector_net = cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, MODEL_PATH)
-    logger.info("Successfully loaded OpenCV DNN face detector model.")
-except cv2.error as e:
-    logger.error(
-        f"Failed to load OpenCV DNN face detector model from {PROTOTXT_PATH} / {MODEL_PATH}: {e}", exc_info=True)
-    logger.error(
-        "Please ensure the model files are downloaded and paths are correct.")
-    face_detector_net = None  # Indicate model loading failed
+# The network is loaded on first use (see load_face_detector_net), so importing
+# this module stays cheap for tests and tooling
+face_detector_net = None
+_detector_net_lock = threading.Lock()
+_detector_net_failed = False
+
+
+def load_face_detector_net():
+    """
+    Load the res10 SSD face detector once (thread-safe).
+
+    Returns:
+        The cv2.dnn network, or None if the model files could not be loaded.
+    """
+    global face_detector_net, _detector_net_failed
+    if face_detector_net is not None or _detector_net_failed:
+        return face_detector_net
+    with _detector_net_lock:
+        if face_detector_net is None and not _detector_net_failed:
+            try:
+                face_detector_net = cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, MODEL_PATH)
+                logger.info("Successfully loaded OpenCV DNN face detector model.")
+            except cv2.error as e:
+                logger.error(
+                    f"Failed to load OpenCV DNN face detector model from {PROTOTXT_PATH} / {MODEL_PATH}: {e}", exc_info=True)
+                logger.error(
+                    "Please ensure the model files are downloaded and paths are correct.")
+                _detector_net_failed = True  # Indicate model loading failed
+    return face_detector_net
+
+
+# Default detector (300x300 input, no ROI hints); the service builds its own
+# from config/model_config.py
+face_detector = FaceDetector(
+    net_loader=load_face_detector_net, confidence_threshold=CONFIDENCE_THRESHOLD)
 # ------------------------------------
 
 
-def detect_face(image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+def detect_face(image: np.ndarray, device_id: Optional[str] = None) -> Optional[Tuple[int, int, int, int]]:
     """
     Detects the most prominent face using OpenCV DNN.
 
     Args:
         image: Input image (BGR format from OpenCV).
+        device_id: Camera the frame came from, used for its ROI hint (optional).
 
     Returns:
         Tuple containing bounding box (startX, startY, endX, endY) or None if no face found.
     """
-    if face_detector_net is None:
-        logger.error(
-            "Face detector model not loaded. Cannot perform detection.")
-        return None
-    if not isinstance(image, np.ndarray) or image.size == 0:
-        logger.warning("Invalid image provided to detect_face.")
-        return None
-
-    try:
-        (h, w) = image.shape[:2]
-        # Create blob (resized 300x300, mean subtraction values from training)
-        blob = cv2.dnn.blobFromImage(cv2.resize(image, (300, 300)), 1.0,
-                                     (300, 300), (104.0, 177.0, 123.0))
-
-        face_detector_net.setInput(blob)
-        detections = face_detector_net.forward()
-
-        best_detection_idx = -1
-        highest_confidence = CONFIDENCE_THRESHOLD  # Start with threshold
-
-        # Iterate over detections
-        for i in range(0, detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            # --- Add temporary debug log for ALL detection confidences ---
-            logger.debug(
-                f"  Potential detection {i} confidence: {confidence:.4f}")
-            # -----------------------------------------------------------
-
-            if confidence > highest_confidence:
-                highest_confidence = confidence
-                best_detection_idx = i
-
-        if best_detection_idx != -1:
-            # Compute bounding box coordinates
-            box = detections[0, 0, best_detection_idx,
-                             3:7] * np.array([w, h, w, h])
-            (startX, startY, endX, endY) = box.astype("int")
-
-            # Ensure coordinates are within image bounds
-            startX = max(0, startX)
-            startY = max(0, startY)
-            endX = min(w - 1, endX)
-            endY = min(h - 1, endY)
-
-            logger.debug(
-                f"Face detected with confidence {highest_confidence:.2f} at box: ({startX}, {startY}, {endX}, {endY})")
-            return (startX, startY, endX, endY)
-        else:
-            logger.warning(
-                "No face detected meeting the confidence threshold.")
-            return None
-
-    except Exception as e:
-        logger.error(f"Error during face detection: {e}", exc_info=True)
-        return None
+    return face_detector.detect(image, device_id)
 
 
 def align_face_simple(image: np.ndarray, bounding_box: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
@@ -159,44 +135,86 @@ def validate_image(image: np.ndarray) -> bool:
     return True
 
 
+# Per-thread scratch space for preprocess_image, so the intermediate resized
+# and RGB faces are not reallocated for every image
+_scratch = threading.local()
+
+
+def _scratch_buffer(name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    buffers = getattr(_scratch, 'buffers', None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    buffer = buffers.get(name)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = buffers[name] = np.empty(shape, dtype=dtype)
+    return buffer
+
+
+def face_buffer(target_size: Tuple[int, int] = (112, 112)) -> np.ndarray:
+    """
+    This thread's reusable float32 model-input buffer, shape (H, W, 3).
+
+    For callers that consume the preprocessed face before preprocessing the
+    next one (e.g. a synchronous inference call); pass it as
+    preprocess_image(..., out=face_buffer()).
+    """
+    width, height = target_size
+    return _scratch_buffer('face', (height, width, 3), np.float32)
+
+
 def preprocess_image(
     image: np.ndarray,
     target_size: Tuple[int, int] = (112, 112),
-    normalize: bool = True
+    normalize: bool = True,
+    out: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
     Preprocess a *cropped and aligned* face image for GhostFaceNets.
     NOW INCLUDES BGR->RGB CONVERSION.
 
+    The face is resized first (so the color conversion only touches the
+    small image), and the float conversion and normalization are one fused
+    pass written straight into out, e.g. a row of a batch tensor.
+
     Args:
         image: Input **cropped/aligned** face image as numpy array (BGR or RGB).
         target_size: Target size for resizing (default: 112x112 for GhostFaceNets)
         normalize: Whether to normalize pixel values (default: True)
+        out: Optional float32 (H, W, 3) array to write the normalized face into
 
     Returns:
-        Preprocessed image as numpy array (RGB, normalized)
+        Preprocessed image as numpy array (RGB, normalized); out when given
     """
     if not isinstance(image, np.ndarray) or image.size == 0:
         logger.warning("Invalid image passed to preprocess_image.")
         return None
 
     try:
-        # Convert BGR to RGB (Models typically trained on RGB)
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        logger.debug("Converted image BGR -> RGB")
-
-        # Resize image
-        resized = cv2.resize(rgb_image, target_size)
+        width, height = target_size
+        # Resize image (into scratch space when the result is consumed below)
+        resized = cv2.resize(image, target_size,
+                             dst=_scratch_buffer('resized', (height, width) + image.shape[2:]))
         logger.debug(f"Resized image to {target_size}")
 
-        # Convert to float32 and normalize for GhostFaceNets
-        # GhostFaceNets expects pixel values in range [-1, 1]
-        if normalize:
-            resized = resized.astype(np.float32)
-            resized = (resized - 127.5) / 128.0
-            logger.debug("Normalized pixel values to [-1, 1]")
+        # Convert BGR to RGB (Models typically trained on RGB)
+        if not normalize:
+            return cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        rgb_image = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB,
+                                 dst=_scratch_buffer('rgb', (height, width, 3)))
+        logger.debug("Converted image BGR -> RGB")
 
-        return resized
+        # GhostFaceNets expects pixel values in range [-1, 1]:
+        # (x - 127.5) / 128 as one uint8 -> float32 pass
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.float32)
+        normalized = cv2.addWeighted(rgb_image, 1.0 / 128.0, rgb_image, 0.0, -127.5 / 128.0,
+                                     dst=out, dtype=cv2.CV_32F)
+        if not np.shares_memory(normalized, out):
+            # cv2 reallocates a dst it cannot write (wrong shape or dtype)
+            raise ValueError(
+                f"Output buffer {out.shape} {out.dtype} does not fit a {(height, width, 3)} float32 face")
+        logger.debug("Normalized pixel values to [-1, 1]")
+        return out
     except Exception as e:
         logger.error(
             f"Error during final preprocessing (resize/normalize): {e}", exc_info=True)
@@ -205,7 +223,7 @@ def preprocess_image(
 
 def check_image_quality(image: np.ndarray) -> bool:
     """
-    Perform basic quality checks on the image.
+    Perform basic quality checks on the image (see core/quality.py).
 
     Args:
         image: Input image to check
@@ -214,14 +232,6 @@ def check_image_quality(image: np.ndarray) -> bool:
         bool: True if image passes quality checks
     """
     try:
-        # Check for completely black or white images
-        if np.mean(image) < 10 or np.mean(image) > 245:
-            return False
-
-        # Check for sufficient contrast
-        if np.std(image) < 20:
-            return False
-
-        return True
-    except:
+        return QualityGate().check_frame(image).passed
+    except cv2.error:
         return False
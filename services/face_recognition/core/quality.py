@@ -0,0 +1,126 @@
+"""
+Cheap image quality gate run before the detector and the model.
+
+The frame checks work on one downsampled grayscale copy of the frame (at most
+ANALYSIS_SIZE pixels on the long side), so they cost about a millisecond
+or less even for full-resolution camera frames:
+
+- too_dark / too_bright: mean intensity
+- low_contrast: intensity standard deviation (blank or washed-out frames)
+- blurry: variance of the Laplacian (little high-frequency detail)
+
+The face check runs after detection and rejects faces too small to embed
+reliably (face_too_small).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Long side of the grayscale frame the statistics are computed on
+ANALYSIS_SIZE = 160
+
+TOO_DARK = 'too_dark'
+TOO_BRIGHT = 'too_bright'
+LOW_CONTRAST = 'low_contrast'
+BLURRY = 'blurry'
+FACE_TOO_SMALL = 'face_too_small'
+GATES = (TOO_DARK, TOO_BRIGHT, LOW_CONTRAST, BLURRY, FACE_TOO_SMALL)
+
+GATE_MESSAGES = {
+    TOO_DARK: "Image too dark",
+    TOO_BRIGHT: "Image overexposed",
+    LOW_CONTRAST: "Image has too little contrast",
+    BLURRY: "Image too blurry",
+    FACE_TOO_SMALL: "Face too small",
+}
+
+
+@dataclass
+class QualityReport:
+    """Result of a quality check. gate names the first check that failed."""
+    gate: Optional[str] = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return self.gate is None
+
+    @property
+    def message(self) -> Optional[str]:
+        return GATE_MESSAGES.get(self.gate)
+
+
+class QualityGate:
+    def __init__(
+        self,
+        min_brightness: float = 40.0,
+        max_brightness: float = 220.0,
+        min_contrast: float = 15.0,
+        min_sharpness: float = 20.0,
+        min_face_size: int = 40,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            min_brightness: Minimum mean gray level (0-255)
+            max_brightness: Maximum mean gray level (0-255)
+            min_contrast: Minimum gray-level standard deviation
+            min_sharpness: Minimum Laplacian variance of the analysis frame
+            min_face_size: Minimum width and height of the face box in pixels
+        """
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.min_contrast = min_contrast
+        self.min_sharpness = min_sharpness
+        self.min_face_size = min_face_size
+
+    def check_frame(self, image: np.ndarray) -> QualityReport:
+        """Brightness, contrast and blur checks on a BGR (or grayscale) frame."""
+        gray = self._analysis_frame(image)
+        mean, std = cv2.meanStdDev(gray)
+        _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+        report = QualityReport(metrics={
+            "brightness": float(mean[0, 0]),
+            "contrast": float(std[0, 0]),
+            "sharpness": float(laplacian_std[0, 0]) ** 2,
+        })
+
+        if report.metrics["brightness"] < self.min_brightness:
+            report.gate = TOO_DARK
+        elif report.metrics["brightness"] > self.max_brightness:
+            report.gate = TOO_BRIGHT
+        elif report.metrics["contrast"] < self.min_contrast:
+            report.gate = LOW_CONTRAST
+        elif report.metrics["sharpness"] < self.min_sharpness:
+            report.gate = BLURRY
+        return report
+
+    def check_face(self, box: Tuple[int, int, int, int], report: Optional[QualityReport] = None) -> QualityReport:
+        """Face box size check; adds to report when given."""
+        report = report or QualityReport()
+        x1, y1, x2, y2 = box
+        report.metrics["face_size"] = float(min(x2 - x1, y2 - y1))
+        if report.passed and report.metrics["face_size"] < self.min_face_size:
+            report.gate = FACE_TOO_SMALL
+        return report
+
+    @staticmethod
+    def _analysis_frame(image: np.ndarray) -> np.ndarray:
+        # Skip rows and columns down to about twice the analysis size first:
+        # an area resize of a full-resolution frame costs more than the checks
+        step = max(image.shape[:2]) // (2 * ANALYSIS_SIZE)
+        if step > 1:
+            image = image[::step, ::step]
+        h, w = image.shape[:2]
+        scale = ANALYSIS_SIZE / max(h, w)
+        if scale < 1.0:
+            # INTER_AREA averages the dropped pixels instead of aliasing them
+            image = cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
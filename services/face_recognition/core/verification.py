@@ -3,9 +3,22 @@ Face verification utilities.
 Handles face matching and verification logic.
 """
 
+from typing import Optional
+
 import numpy as np
 
 
+def normalize_rows(embeddings) -> np.ndarray:
+    """
+    L2-normalize one embedding or the rows of a matrix, returned as a 2-D
+    float32 array. Zero rows stay zero (similarity 0 to everything).
+    """
+    matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
 class FaceVerifier:
     def __init__(self, threshold=0.6):
         """
@@ -28,13 +41,58 @@ class FaceVerifier:
             tuple: (is_match, similarity_score)
         """
         # Calculate cosine similarity
-        similarity = np.dot(embedding1, embedding2)
+        similarity = float(self.similarity_matrix(embedding1, embedding2)[0, 0])
 
         # Determine if it's a match
         is_match = similarity >= self.threshold
 
         return is_match, similarity
 
+    def similarity_matrix(self, queries, references, normalized: bool = False) -> np.ndarray:
+        """
+        Cosine similarity of every query against every reference.
+
+        Args:
+            queries: (Q, D) embeddings (or one (D,) embedding)
+            references: (R, D) embeddings (or one (D,) embedding)
+            normalized: Inputs are already L2-normalized float32 rows (e.g.
+                from normalize_rows), so they are used as they are
+
+        Returns:
+            (Q, R) float32 similarity matrix
+        """
+        if not normalized:
+            queries = normalize_rows(queries)
+            references = normalize_rows(references)
+        if queries.shape[1] != references.shape[1]:
+            raise ValueError(
+                f"Embedding sizes differ: {queries.shape[1]} vs {references.shape[1]}")
+        return queries @ references.T
+
+    def verify_batch(self, queries, references, threshold: Optional[float] = None) -> dict:
+        """
+        Match every query against every reference in one matrix product
+        (evaluation runs, multi-template matching).
+
+        Returns:
+            {"similarities": (Q, R) matrix,
+             "best_index": (Q,) index of each query's most similar reference,
+             "best_similarity": (Q,) that similarity,
+             "is_match": (Q,) best_similarity >= threshold}
+        """
+        threshold = self.threshold if threshold is None else threshold
+        similarities = self.similarity_matrix(queries, references)
+        if similarities.shape[1] == 0:
+            raise ValueError("No reference embeddings given.")
+        best_index = np.argmax(similarities, axis=1)
+        best_similarity = similarities[np.arange(len(similarities)), best_index]
+        return {
+            "similarities": similarities,
+            "best_index": best_index,
+            "best_similarity": best_similarity,
+            "is_match": best_similarity >= threshold,
+        }
+
     def verify(self, embedding1, embedding2):
         """
         Backward compatible method for verification.
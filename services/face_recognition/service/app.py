@@ -4,12 +4,23 @@ Face recognition service main application.
 
 import os
 from flask import Flask
-from service.routes import face_recognition_routes
+from config.threading_config import apply_thread_settings
+from service.routes import face_recognition_routes, init_models
 
 
-def create_app():
-    """Create and configure the Flask application."""
+def create_app(load_models: bool = True):
+    """
+    Create and configure the Flask application.
+
+    Args:
+        load_models: Start loading the models in the background now (see
+            GET /ready). The gunicorn config passes False and starts the load
+            in each worker after fork instead.
+    """
     app = Flask(__name__)
+    if load_models:
+        settings = apply_thread_settings()
+        init_models(num_threads=settings['tf_intra_op_threads'])
 
     # Register blueprints
     app.register_blueprint(face_recognition_routes)
@@ -19,5 +30,11 @@ def create_app():
 
 if __name__ == '__main__':
     app = create_app()
-    port = int(os.getenv('PORT', 5001))
-    app.run(host='0.0.0.0', port=port)
+    # UNIX_SOCKET=/run/face/face.sock serves on a Unix domain socket instead
+    # of TCP, for an API running on the same host
+    unix_socket = os.getenv('UNIX_SOCKET')
+    if unix_socket:
+        app.run(host=f'unix://{unix_socket}')
+    else:
+        port = int(os.getenv('PORT', 5001))
+        app.run(host='0.0.0.0', port=port)
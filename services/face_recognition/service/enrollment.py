@@ -0,0 +1,113 @@
+"""
+Batch enrollment: many images in one request, results streamed as NDJSON.
+
+Images go through the face pipeline on a pool of threads, so the decoding
+and detection of several images overlap and their faces reach the inference
+scheduler together, which runs them as model batches. Each image's result is
+yielded as soon as it is ready (completion order, not upload order: every
+line carries the image's index and id). At most max_in_flight images are held
+at a time, so a tar stream of any length is processed in bounded memory.
+"""
+
+import logging
+import os
+import tarfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def image_id(filename: str) -> str:
+    """Identity of an uploaded image: its file name without directory or extension."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def iter_tar(fileobj: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """(name, bytes) of each image in a (possibly compressed) tar stream, read sequentially."""
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield member.name, archive.extractfile(member).read()
+
+
+class BatchEnroller:
+    def __init__(self, run_fn: Callable[[bytes], object], workers: int = 16,
+                 max_in_flight: Optional[int] = None):
+        """
+        Initialize the enroller.
+
+        Args:
+            run_fn: Runs the face pipeline on encoded image bytes and returns
+                its core.pipeline.PipelineResult (e.g. FacePipeline.run)
+            workers: Images processed concurrently; also the largest model
+                batch the concurrent images can form
+            max_in_flight: Images read ahead of the results (default 2 * workers)
+        """
+        self.run_fn = run_fn
+        self.workers = workers
+        self.max_in_flight = max_in_flight or 2 * workers
+
+    def process(self, items: Iterable[Tuple[str, bytes]]) -> Iterator[dict]:
+        """
+        Embed every (filename, bytes) item, yielding one result dict per image
+        and then {"summary": {...}}. Reading items is interleaved with the
+        processing, so a failure part-way through a stream still reports the
+        images already read, and the summary carries the error.
+        """
+        started = time.perf_counter()
+        counts = {"images": 0, "enrolled": 0, "failed": 0}
+        source_error = None
+        executor = ThreadPoolExecutor(self.workers, thread_name_prefix='enroll')
+        pending = set()
+
+        def finished(futures):
+            for future in futures:
+                line = future.result()
+                counts["enrolled" if "embedding" in line else "failed"] += 1
+                yield line
+
+        try:
+            try:
+                for index, (filename, data) in enumerate(items):
+                    counts["images"] += 1
+                    pending.add(executor.submit(self._run_one, index, filename, data))
+                    if len(pending) >= self.max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from finished(done)
+            except (tarfile.TarError, OSError, EOFError) as e:
+                logger.warning(f"Batch enrollment input ended with an error: {e}")
+                source_error = f"Could not read the upload: {e}"
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+        finally:
+            # Also reached when the client disconnects mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        summary = {**counts, "elapsed_ms": elapsed * 1000.0,
+                   "images_per_second": counts["images"] / elapsed if elapsed else 0.0}
+        if source_error:
+            summary["error"] = source_error
+        yield {"summary": summary}
+
+    def _run_one(self, index: int, filename: str, data: bytes) -> dict:
+        line = {"index": index, "id": image_id(filename), "filename": filename}
+        try:
+            result = self.run_fn(data)
+        except Exception as e:
+            logger.error(f"Batch enrollment failed for {filename}: {e}", exc_info=True)
+            line.update({"error": str(e), "status": 500})
+            return line
+        if result.ok:
+            line.update({"embedding": result.embedding.tolist(),
+                         "box": list(result.box),
+                         "timings_ms": result.timings})
+        else:
+            line.update(result.error_body())
+            line["status"] = result.status
+        return line
@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for the face recognition service (production mode).
+
+    gunicorn -c service/gunicorn.conf.py
+
+Runs GUNICORN_WORKERS prefork worker processes (default: one per available
+CPU), each with GUNICORN_THREADS request threads feeding its own inference
+scheduler. The CPUs are divided between the workers: each worker sizes its
+TensorFlow pools, TFLite/ONNX interpreter and OpenCV pool to its share (and,
+with CPU_AFFINITY=auto, is pinned to its own CPUs), so N workers do not each
+spin up pools sized to the whole machine. See config/threading_config.py.
+
+Model sharing across workers:
+- The app code, TensorFlow/OpenCV libraries and the res10 detector weights are
+  loaded once in the master (preload_app, when_ready) and shared copy-on-write.
+- The embedding model is loaded in each worker after fork, in the background
+  (GET /ready turns 200 when it is warm): TensorFlow's thread pools and the
+  scheduler thread cannot be inherited across fork().
+  .tflite models are memory-mapped read-only, so with MODEL_BACKEND=tflite all
+  workers share one copy of the weights through the page cache; Keras .h5
+  weights are copied into each worker's heap.
+"""
+
+import logging
+import os
+
+from config.threading_config import apply_thread_settings, available_cpus, worker_cpus
+
+logger = logging.getLogger("gunicorn.error")
+
+CPUS = available_cpus()
+
+bind = os.getenv("FACE_SERVICE_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("GUNICORN_WORKERS", 0)) or CPUS
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+wsgi_app = "service.app:create_app(load_models=False)"
+preload_app = True
+
+
+def when_ready(server):
+    # Load the detector weights in the master, before the first fork, so the
+    # workers share them copy-on-write (cv2.dnn starts no threads until the
+    # first forward pass)
+    from core.preprocessing import load_face_detector_net
+    load_face_detector_net()
+    if server.cfg.workers > 1 and not os.getenv("GALLERY_PATH"):
+        logger.warning(
+            f"{server.cfg.workers} workers without GALLERY_PATH: each keeps its own "
+            "gallery and /identify only sees the changes its worker received")
+
+
+def pre_fork(server, worker):
+    # Give each worker a stable slot (reused when a worker is replaced) so
+    # CPU_AFFINITY=auto pins it to its own slice of the CPUs
+    taken = {getattr(w, "cpu_slot", None) for w in server.WORKERS.values()}
+    worker.cpu_slot = min(set(range(server.num_workers + len(taken))) - taken)
+
+
+def post_fork(server, worker):
+    # Before the first TensorFlow op in this process: the pool sizes are fixed
+    # once the runtime initializes (see config/threading_config.py)
+    worker_count = worker.cfg.workers
+    cpus = worker_cpus(worker.cpu_slot, worker_count)
+    worker.thread_settings = apply_thread_settings(worker_count, cpus=cpus)
+
+
+def post_worker_init(worker):
+    from service.routes import init_models
+    settings = worker.thread_settings
+    # Loads in the background: the worker serves /health and /ready (503)
+    # until the model is warm
+    init_models(num_threads=settings["tf_intra_op_threads"])
+    logger.info(
+        f"Worker {worker.pid} (slot {worker.cpu_slot}): loading models "
+        f"({worker.cfg.workers} workers on {CPUS} CPUs, {settings})")
@@ -0,0 +1,110 @@
+"""
+Lazy, thread-safe model initialization.
+
+The model is loaded exactly once: in a background thread started at boot (so
+the process answers /health and /ready while it loads) or, failing that, by
+the first request that needs it. Concurrent callers wait for the same load.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+NOT_LOADED = 'not_loaded'
+LOADING = 'loading'
+WARMING_UP = 'warming_up'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ModelLoader:
+    def __init__(
+        self,
+        load_fn: Callable[[], Any],
+        warmup_fn: Optional[Callable[[Any], None]] = None,
+        name: str = 'model',
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            load_fn: Loads and returns the model
+            warmup_fn: Runs a first inference on the loaded model (optional)
+            name: Used in log messages
+        """
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.name = name
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._state = NOT_LOADED
+        self._model = None
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._warmup_seconds: Optional[float] = None
+
+    def start(self, background: bool = True):
+        """Begin loading (no-op if already started); blocks unless background."""
+        with self._lock:
+            if self._state != NOT_LOADED:
+                return
+            self._state = LOADING
+        if background:
+            threading.Thread(target=self._load, name=f'{self.name}-loader',
+                             daemon=True).start()
+        else:
+            self._load()
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        The loaded model, loading it in this thread if nobody has started yet
+        and otherwise waiting for the load in progress.
+
+        Raises:
+            RuntimeError: If loading failed or did not finish within timeout
+        """
+        self.start(background=False)
+        if not self._done.wait(timeout):
+            raise RuntimeError(f"Timed out waiting for the {self.name} to load.")
+        if self._state == FAILED:
+            raise RuntimeError(f"The {self.name} failed to load: {self._error}")
+        return self._model
+
+    @property
+    def ready(self) -> bool:
+        return self._state == READY
+
+    def _load(self):
+        started = time.monotonic()
+        try:
+            logger.info(f"Loading {self.name}...")
+            model = self.load_fn()
+            self._load_seconds = time.monotonic() - started
+            if self.warmup_fn is not None:
+                self._state = WARMING_UP
+                warmup_started = time.monotonic()
+                self.warmup_fn(model)
+                self._warmup_seconds = time.monotonic() - warmup_started
+            self._model = model
+            self._state = READY
+            logger.info(
+                f"{self.name.capitalize()} ready in {time.monotonic() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Failed to load {self.name}: {e}", exc_info=True)
+            self._error = str(e)
+            self._state = FAILED
+        finally:
+            self._done.set()
+
+    def status(self) -> dict:
+        """Load state and timings for the /ready endpoint."""
+        return {
+            "state": self._state,
+            "ready": self.ready,
+            "load_seconds": self._load_seconds,
+            "warmup_seconds": self._warmup_seconds,
+            "error": self._error,
+        }
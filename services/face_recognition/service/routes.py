@@ -3,15 +3,52 @@ Face recognition service API endpoints.
 """
 
 import os
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, g, has_request_context, request, jsonify, stream_with_context
 import numpy as np
 import base64
-import cv2
+import json
+import time
 import logging
 
 from core.embedding import FaceEmbedding
 from core.verification import FaceVerifier
-from core.preprocessing import preprocess_image
+from core.pipeline import FacePipeline
+from core.gallery import FaceGallery
+from core.quality import QualityGate
+from core.detector import FaceDetector, load_roi_hints
+from core.preprocessing import load_face_detector_net
+from config.paths import GALLERY_PATH
+from config.model_config import (
+    BURST_MAX_FRAMES,
+    COMPILED_INFERENCE,
+    EMBEDDING_SIZE,
+    GALLERY_INDEX,
+    GALLERY_IVF_NPROBE,
+    QUALITY_GATE_ENABLED,
+    REDUCED_DECODE,
+    MODEL_INPUT_SIZE,
+    QUALITY_MIN_BRIGHTNESS,
+    QUALITY_MAX_BRIGHTNESS,
+    QUALITY_MIN_CONTRAST,
+    QUALITY_MIN_SHARPNESS,
+    QUALITY_MIN_FACE_SIZE,
+    DETECTOR_INPUT_SIZE,
+    DETECTOR_CONFIDENCE_THRESHOLD,
+    DETECTOR_ROI_HINTS_PATH,
+    ENROLL_BATCH_WORKERS,
+    MODEL_BACKEND,
+    SHADOW_MODEL_BACKEND,
+    SHADOW_MODEL_PATH,
+    SHADOW_QUEUE_SIZE,
+    SHADOW_SAMPLE_RATE,
+    VERIFICATION_THRESHOLD,
+    INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_MAX_WAIT_MS
+)
+from service.model_loader import ModelLoader
+from service.enrollment import BatchEnroller, iter_tar
+from service.scheduler import InferenceScheduler
+from service.shadow import ShadowEvaluator
 
 # Initialize blueprint
 face_recognition_routes = Blueprint('face_recognition', __name__)
@@ -24,9 +61,156 @@ logger = logging.getLogger(__name__)
 # TODO: pull this from the config file in the config/paths.py
 model_path = os.getenv(
     'MODEL_PATH', 'face_recognition/core/models/ghostfacenets.h5')
-face_embedding = FaceEmbedding(model_path=model_path)
 face_verifier = FaceVerifier()
 
+# Models are loaded lazily (see init_models): importing this module does not
+# pay for TensorFlow model loading or the Caffe detector
+face_detector = FaceDetector(
+    net_loader=load_face_detector_net,
+    input_size=DETECTOR_INPUT_SIZE,
+    confidence_threshold=DETECTOR_CONFIDENCE_THRESHOLD,
+    roi_hints=load_roi_hints(DETECTOR_ROI_HINTS_PATH))
+
+face_embedding = None
+# Interpreter threads for the tflite/onnx backends, set by init_models()
+_runtime_threads = None
+
+
+def _infer_batch(faces):
+    return face_embedding.embed_batch(faces)
+
+
+# All model calls go through one scheduler thread that groups concurrent
+# requests into dynamic batches. The thread is started once the model is
+# loaded, i.e. after fork under gunicorn: threads do not survive fork()
+inference_scheduler = InferenceScheduler(
+    _infer_batch,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS)
+
+
+def _load_models():
+    global face_embedding
+    if face_detector.load() is None:
+        raise RuntimeError("Face detector model could not be loaded.")
+    face_embedding = FaceEmbedding(
+        model_path=model_path, compiled=COMPILED_INFERENCE, backend=MODEL_BACKEND,
+        num_threads=_runtime_threads, warmup=False)
+    return face_embedding
+
+
+def _warm_up_models(embedding):
+    embedding.warmup()
+    inference_scheduler.start()
+
+
+model_loader = ModelLoader(_load_models, _warm_up_models, name='face models')
+
+
+def init_models(num_threads=None, background=True):
+    """
+    Start loading the detector and embedding model (idempotent).
+
+    Args:
+        num_threads: Interpreter threads for the tflite/onnx backends (the
+            Keras backend follows tf.config.threading)
+        background: Load in a background thread so the process can answer
+            /health and /ready meanwhile; requests that need the model wait
+    """
+    global _runtime_threads
+    _runtime_threads = num_threads
+    model_loader.start(background=background)
+
+
+def _load_shadow_model():
+    return FaceEmbedding(
+        model_path=SHADOW_MODEL_PATH, compiled=COMPILED_INFERENCE,
+        backend=SHADOW_MODEL_BACKEND, num_threads=_runtime_threads)
+
+
+def _shadow_reference(employee_id, primary_embedding):
+    # The claimed employee when the caller names one, else the gallery's
+    # best match for the primary embedding
+    if employee_id:
+        return face_gallery.get(employee_id)
+    matches = face_gallery.identify(primary_embedding, k=1)
+    return face_gallery.get(matches[0]['employee_id']) if matches else None
+
+
+# Candidate model evaluated in the background on a sample of requests
+shadow_evaluator = ShadowEvaluator(
+    _load_shadow_model,
+    sample_rate=SHADOW_SAMPLE_RATE,
+    threshold=VERIFICATION_THRESHOLD,
+    max_queue=SHADOW_QUEUE_SIZE,
+    reference_fn=_shadow_reference,
+) if SHADOW_MODEL_PATH else None
+
+
+def _embed_face(face):
+    # Loads the models on first use if init_models() was never called
+    model_loader.get()
+    start = time.perf_counter()
+    embedding = inference_scheduler.embed(face)
+    if shadow_evaluator is not None:
+        # Copies the face and returns at once; never waits for the shadow model
+        employee_id = g.get('employee_id') if has_request_context() else None
+        shadow_evaluator.submit(face, embedding, (time.perf_counter() - start) * 1000.0,
+                                employee_id=employee_id)
+    return embedding
+
+
+# decode -> detect -> crop -> preprocess -> infer, one pass per image
+quality_gate = QualityGate(
+    min_brightness=QUALITY_MIN_BRIGHTNESS,
+    max_brightness=QUALITY_MAX_BRIGHTNESS,
+    min_contrast=QUALITY_MIN_CONTRAST,
+    min_sharpness=QUALITY_MIN_SHARPNESS,
+    min_face_size=QUALITY_MIN_FACE_SIZE,
+) if QUALITY_GATE_ENABLED else None
+face_pipeline = FacePipeline(
+    _embed_face, detector=face_detector, quality_gate=quality_gate,
+    detect_min_side=min(DETECTOR_INPUT_SIZE) if REDUCED_DECODE else None,
+    face_size=min(MODEL_INPUT_SIZE))
+
+# Many images per request; their faces reach the scheduler together
+batch_enroller = BatchEnroller(face_pipeline.run, workers=ENROLL_BATCH_WORKERS)
+TAR_MIMETYPES = ('application/x-tar', 'application/tar', 'application/gzip',
+                 'application/x-gzip', 'application/x-gtar')
+
+# Enrolled employees for 1:N identification; the snapshot file keeps the
+# workers' copies in sync
+face_gallery = FaceGallery(dim=EMBEDDING_SIZE, path=GALLERY_PATH,
+                           index=GALLERY_INDEX, nprobe=GALLERY_IVF_NPROBE)
+
+# Wire format of /embed/raw and /embed/best responses: little-endian float32
+EMBEDDING_DTYPE = np.dtype('<f4')
+
+
+def _embedding_response(result) -> Response:
+    """A pipeline result's embedding as a little-endian float32 response body."""
+    payload = np.ascontiguousarray(result.embedding, dtype=EMBEDDING_DTYPE)
+    response = Response(payload.tobytes(), mimetype='application/octet-stream')
+    response.headers['X-Embedding-Dim'] = str(payload.shape[-1])
+    response.headers['X-Embedding-Dtype'] = 'float32-le'
+    response.headers['Server-Timing'] = result.server_timing()
+    return response
+
+
+def _face_location(values):
+    """
+    Known face position from request fields, as face_pipeline.run kwargs:
+    "box" ([x1, y1, x2, y2], or "x1,y1,x2,y2" in a query string) and
+    "cropped" (the image is already the face crop).
+    """
+    box = values.get('box')
+    if isinstance(box, str):
+        box = box.split(',')
+    cropped = values.get('cropped', False)
+    if isinstance(cropped, str):
+        cropped = cropped.lower() in ('true', '1', 't')
+    return {"box": box or None, "cropped": bool(cropped)}
+
 
 @face_recognition_routes.route('/health', methods=['GET'])
 def health_check():
@@ -34,9 +218,41 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@face_recognition_routes.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint: 200 once the models are loaded and warmed up, 503
+    while loading (or if loading failed). /health only reports liveness.
+    """
+    status = model_loader.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@face_recognition_routes.route('/metrics', methods=['GET'])
+def metrics():
+    """Inference batching, per-stage pipeline latency and detector ROI statistics."""
+    return jsonify({
+        "batching": inference_scheduler.stats(),
+        "pipeline": face_pipeline.stats(),
+        "detector": face_detector.stats()
+    }), 200
+
+
+@face_recognition_routes.route('/shadow/summary', methods=['GET'])
+def shadow_summary():
+    """Latency and decision agreement of the shadow model against the primary one."""
+    if shadow_evaluator is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **shadow_evaluator.summary()}), 200
+
+
 @face_recognition_routes.route('/embed', methods=['POST'])
 def generate_embedding():
-    """Generate face embedding from an image."""
+    """
+    Generate face embedding from an image.
+
+    Optional "box" ([x1, y1, x2, y2]) or "cropped": true skip detection.
+    """
     logger.info("Received request for /embed")
     try:
         data = request.json
@@ -49,40 +265,27 @@ def generate_embedding():
 
         # Decode base64 image
         logger.debug("Attempting Base64 decode...")
+        b64_start = time.perf_counter()
         image_data = base64.b64decode(data['image'])
+        b64_ms = (time.perf_counter() - b64_start) * 1000.0
         logger.info(f"Base64 decoded successfully, {len(image_data)} bytes.")
 
-        logger.debug("Attempting cv2.imdecode...")
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if image is None:
-            logger.error(
-                "cv2.imdecode failed. Input data might not be a valid image format.")
-            return jsonify({"error": "Failed to decode image data"}), 400
-        logger.info(f"cv2.imdecode successful. Image shape: {image.shape}")
-
-        # Preprocess image
-        logger.debug("Attempting preprocess_image...")
-        preprocessed = preprocess_image(image)
-        if preprocessed is None:
-            logger.warning(
-                "preprocess_image returned None. Face not detected or preprocessing failed.")
-            return jsonify({"error": "Face not detected or image preprocessing failed"}), 400
-        logger.info(
-            f"preprocess_image successful. Preprocessed shape: {preprocessed.shape}")
-
-        # Generate embedding
-        logger.debug("Attempting generate_embedding...")
-        embedding = face_embedding.generate_embedding(preprocessed)
-        if embedding is None:
-            logger.error("generate_embedding returned None.")
-            return jsonify({"error": "Failed to generate embedding"}), 500
+        # Optional claimed identity, for shadow decision agreement
+        g.employee_id = data.get('employee_id')
+        result = face_pipeline.run(image_data, device_id=data.get('device_id'),
+                                   **_face_location(data))
+        result.timings = {"base64_decode": b64_ms, **result.timings}
+        if not result.ok:
+            return jsonify(result.error_body()), result.status
         logger.info(
-            f"generate_embedding successful. Embedding dimensions: {embedding.shape}")
+            f"Embedding generated successfully. Embedding dimensions: {result.embedding.shape}")
 
-        return jsonify({
-            "embedding": embedding.tolist()
-        }), 200
+        response = jsonify({
+            "embedding": result.embedding.tolist(),
+            "timings_ms": result.timings
+        })
+        response.headers['Server-Timing'] = result.server_timing()
+        return response, 200
 
     except base64.binascii.Error as b64_error:
         logger.error(f"Base64 decoding error: {b64_error}", exc_info=True)
@@ -92,6 +295,119 @@ def generate_embedding():
         return jsonify({"error": str(e)}), 500
 
 
+@face_recognition_routes.route('/embed/best', methods=['POST'])
+def generate_embedding_best_frame():
+    """
+    Embed the best frame of a burst from one capture.
+
+    Accepts {"frames": ["<base64 JPEG>", ...]} or a multipart upload with
+    one file per frame, plus an optional device_id. Frames are scored by
+    face sharpness, size and detector confidence and only the best one is
+    embedded. The response is the embedding as a little-endian float32
+    buffer, as from /embed/raw, with the chosen frame's index in the
+    X-Best-Frame header, every frame's scores as a JSON list in
+    X-Frame-Scores (null for frames without a usable face) and the face box
+    in X-Face-Box.
+    """
+    logger.info("Received request for /embed/best")
+    try:
+        if request.mimetype == 'multipart/form-data':
+            frames = [storage.read() for _, storage in request.files.items(multi=True)]
+            data = request.form
+        else:
+            data = request.json or {}
+            frames = [base64.b64decode(frame) for frame in data.get('frames') or []]
+        if not frames:
+            return jsonify({"error": "No frames provided"}), 400
+        if len(frames) > BURST_MAX_FRAMES:
+            return jsonify({"error": f"At most {BURST_MAX_FRAMES} frames per burst"}), 400
+        g.employee_id = data.get('employee_id')
+
+        result = face_pipeline.run_best(frames, device_id=data.get('device_id'))
+        if not result.ok:
+            return jsonify({**result.error_body(), "frame_scores": result.frame_scores}), result.status
+
+        response = _embedding_response(result)
+        response.headers['X-Best-Frame'] = str(result.frame)
+        response.headers['X-Frame-Scores'] = json.dumps(result.frame_scores, separators=(',', ':'))
+        response.headers['X-Face-Box'] = ','.join(str(v) for v in result.box)
+        return response
+
+    except base64.binascii.Error as b64_error:
+        return jsonify({"error": f"Invalid Base64 data: {b64_error}"}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in /embed/best: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/embed/raw', methods=['POST'])
+def generate_embedding_raw():
+    """
+    Binary variant of /embed.
+
+    Accepts the raw JPEG bytes either as the request body
+    (application/octet-stream / image/jpeg) or as the 'image' file of a
+    multipart upload, and answers with the embedding as a little-endian
+    float32 buffer instead of a JSON array of decimal floats. An optional
+    device_id query parameter (or form field) selects the camera's ROI hint,
+    and an optional employee_id names the claimed identity for shadow
+    evaluation. Callers that know where the face is skip detection with
+    box=x1,y1,x2,y2 or cropped=true.
+    """
+    logger.info("Received request for /embed/raw")
+    try:
+        if 'image' in request.files:
+            image_data = request.files['image'].read()
+        else:
+            image_data = request.get_data(cache=False)
+        if not image_data:
+            logger.warning("Request rejected: empty request body.")
+            return jsonify({"error": "No image provided"}), 400
+        logger.info(f"Received {len(image_data)} raw image bytes.")
+
+        device_id = request.args.get('device_id') or request.form.get('device_id')
+        g.employee_id = request.args.get('employee_id') or request.form.get('employee_id')
+        result = face_pipeline.run(image_data, device_id=device_id,
+                                   **_face_location(request.values))
+        if not result.ok:
+            return jsonify(result.error_body()), result.status
+
+        return _embedding_response(result)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in /embed/raw: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/enroll/batch', methods=['POST'])
+def enroll_batch():
+    """
+    Embed many images in one request.
+
+    Accepts a multipart upload with one file per image, or a tar stream
+    (optionally gzipped) as the request body. Streams back NDJSON: one line
+    per image as it completes ({"index", "id", "filename", "embedding",
+    "box", "timings_ms"}, or "error" and "status"; id is the file name
+    without extension), then a final {"summary": {...}} line.
+    """
+    logger.info("Received request for /enroll/batch")
+    if request.mimetype != 'multipart/form-data' and request.mimetype not in TAR_MIMETYPES:
+        return jsonify({"error": "Send a multipart upload or a tar stream"}), 415
+
+    def ndjson():
+        # The body is read here, inside the streamed response: uploaded files
+        # are closed once the view function has returned
+        if request.mimetype == 'multipart/form-data':
+            items = ((storage.filename or field, storage.read())
+                     for field, storage in request.files.items(multi=True))
+        else:
+            items = iter_tar(request.stream)
+        for line in batch_enroller.process(items):
+            yield json.dumps(line) + "\n"
+
+    return Response(stream_with_context(ndjson()), mimetype='application/x-ndjson')
+
+
 @face_recognition_routes.route('/verify', methods=['POST'])
 def verify_face():
     """Verify if two face embeddings belong to the same person."""
@@ -114,3 +430,140 @@ def verify_face():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/verify/batch', methods=['POST'])
+def verify_batch():
+    """
+    Match N query embeddings against M reference embeddings in one call.
+
+    Body: {"queries": [[...], ...], "references": [[...], ...]}, plus optional
+    "reference_ids" (one per reference, echoed back in matches), "threshold"
+    and "return_matrix" (default true).
+    """
+    try:
+        data = request.json
+        if not data or 'queries' not in data or 'references' not in data:
+            return jsonify({"error": "Missing queries or references"}), 400
+        reference_ids = data.get('reference_ids')
+        if reference_ids is not None and len(reference_ids) != len(data['references']):
+            return jsonify({"error": "reference_ids must have one entry per reference"}), 400
+
+        start = time.perf_counter()
+        result = face_verifier.verify_batch(
+            data['queries'], data['references'],
+            threshold=data.get('threshold'))
+        compute_ms = (time.perf_counter() - start) * 1000.0
+
+        matches = []
+        for best, similarity, is_match in zip(result['best_index'].tolist(),
+                                              result['best_similarity'].tolist(),
+                                              result['is_match'].tolist()):
+            match = {"best_index": best, "similarity": similarity, "is_match": is_match}
+            if reference_ids is not None:
+                match["reference_id"] = reference_ids[best]
+            matches.append(match)
+
+        body = {"matches": matches, "compute_ms": compute_ms}
+        if data.get('return_matrix', True):
+            body["similarities"] = result['similarities'].tolist()
+        return jsonify(body), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in /verify/batch: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/identify', methods=['POST'])
+def identify_face():
+    """
+    1:N identification against the gallery.
+
+    Body: {"embedding": [...]} or {"image": "<base64 JPEG>"} (optionally
+    with "box" or "cropped", as for /embed), plus optional "k" (default 5)
+    and "threshold" (minimum cosine similarity).
+    """
+    try:
+        data = request.json
+        if not data or ('embedding' not in data and 'image' not in data):
+            return jsonify({"error": "Missing embedding or image"}), 400
+
+        if 'embedding' in data:
+            embedding = np.asarray(data['embedding'], dtype=np.float32)
+        else:
+            result = face_pipeline.run(base64.b64decode(data['image']),
+                                       device_id=data.get('device_id'),
+                                       **_face_location(data))
+            if not result.ok:
+                return jsonify(result.error_body()), result.status
+            embedding = result.embedding
+
+        start = time.perf_counter()
+        matches = face_gallery.identify(
+            embedding, k=int(data.get('k', 5)), threshold=data.get('threshold'))
+        search_ms = (time.perf_counter() - start) * 1000.0
+
+        return jsonify({
+            "matches": matches,
+            "gallery_size": len(face_gallery),
+            "search_ms": search_ms
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in /identify: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/gallery', methods=['GET'])
+def gallery_stats():
+    """Gallery size and capacity."""
+    return jsonify(face_gallery.stats()), 200
+
+
+@face_recognition_routes.route('/gallery/<employee_id>', methods=['PUT'])
+def gallery_add(employee_id):
+    """Enroll (or re-enroll) one employee: {"embedding": [...], "name": "..."}."""
+    try:
+        data = request.json
+        if not data or 'embedding' not in data:
+            return jsonify({"error": "Missing embedding"}), 400
+        face_gallery.add(employee_id, data['embedding'], name=data.get('name'))
+        return jsonify({"employee_id": employee_id, "gallery_size": len(face_gallery)}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error enrolling {employee_id}: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@face_recognition_routes.route('/gallery/<employee_id>', methods=['DELETE'])
+def gallery_remove(employee_id):
+    """Remove one employee from the gallery."""
+    if not face_gallery.remove(employee_id):
+        return jsonify({"error": f"{employee_id} is not enrolled"}), 404
+    return jsonify({"employee_id": employee_id, "gallery_size": len(face_gallery)}), 200
+
+
+@face_recognition_routes.route('/gallery/sync', methods=['POST'])
+def gallery_sync():
+    """
+    Replace the whole gallery:
+    {"entries": [{"employee_id": ..., "embedding": [...], "name": ...}, ...]}
+    """
+    try:
+        data = request.json
+        if not data or not isinstance(data.get('entries'), list):
+            return jsonify({"error": "Missing entries"}), 400
+        face_gallery.replace_all(
+            (entry['employee_id'], entry['embedding'], entry.get('name'))
+            for entry in data['entries'])
+        return jsonify({"gallery_size": len(face_gallery)}), 200
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid entry: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in /gallery/sync: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,164 @@
+"""
+Dynamic micro-batching for model inference.
+
+Request handlers submit preprocessed faces; a single worker thread collects
+them into batches (up to max_batch_size, waiting at most max_wait_ms after
+the first face arrives) and runs the model once per batch. Batches are
+assembled in one preallocated (max_batch_size, H, W, C) tensor.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ('face', 'future', 'enqueued_at')
+
+    def __init__(self, face: np.ndarray):
+        self.face = face
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class InferenceScheduler:
+    def __init__(
+        self,
+        infer_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            infer_fn: Runs the model on a (N, H, W, C) batch, returns (N, D) embeddings
+            max_batch_size: Largest batch handed to infer_fn
+            max_wait_ms: How long to hold the first face waiting for more to arrive
+        """
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Batch input tensor, allocated for the first face's shape and reused
+        self._batch: Optional[np.ndarray] = None
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._queue_wait_total = 0.0
+        self._inference_time_total = 0.0
+
+    def start(self):
+        """Start the inference worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name='inference-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Inference scheduler started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:.1f})")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker thread after the queued requests are served."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, face: np.ndarray) -> Future:
+        """Queue one preprocessed face (H, W, C); the future resolves to its embedding."""
+        request = _Request(face)
+        self._queue.put(request)
+        return request.future
+
+    def embed(self, face: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking helper: submit a face and wait for its embedding."""
+        return self.submit(face).result(timeout)
+
+    def _collect_batch(self, first: _Request) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Take whatever is already queued even when the deadline passed
+                item = self._queue.get(timeout=remaining) if remaining > 0 \
+                    else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Serve what we have, then shut down
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _assemble(self, batch: list) -> np.ndarray:
+        """Copy the batch's faces into the reusable input tensor."""
+        shape = batch[0].face.shape
+        if self._batch is None or self._batch.shape[1:] != shape:
+            self._batch = np.empty((self.max_batch_size,) + shape, dtype=np.float32)
+        faces = self._batch[:len(batch)]
+        for row, request in zip(faces, batch):
+            row[...] = request.face
+        return faces
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = self._collect_batch(first)
+            started = time.monotonic()
+            try:
+                faces = self._assemble(batch)
+                embeddings = self.infer_fn(faces)
+                for request, embedding in zip(batch, embeddings):
+                    request.future.set_result(embedding)
+            except Exception as e:
+                logger.error(
+                    f"Batched inference failed for {len(batch)} faces: {e}", exc_info=True)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+            finished = time.monotonic()
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._requests += len(batch)
+                self._queue_wait_total += sum(started - request.enqueued_at
+                                              for request in batch)
+                self._inference_time_total += finished - started
+        logger.info("Inference scheduler stopped.")
+
+    def stats(self) -> dict:
+        """Batch-size histogram and timing totals for the /metrics endpoint."""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "requests": self._requests,
+                "batches": batches,
+                "mean_batch_size": self._requests / batches if batches else 0.0,
+                "batch_size_histogram": {str(size): count for size, count
+                                         in sorted(self._batch_sizes.items())},
+                "mean_queue_wait_ms": (self._queue_wait_total / self._requests * 1000
+                                       if self._requests else 0.0),
+                "mean_batch_inference_ms": (self._inference_time_total / batches * 1000
+                                            if batches else 0.0),
+                "queue_depth": self._queue.qsize(),
+            }
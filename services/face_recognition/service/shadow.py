@@ -0,0 +1,193 @@
+"""
+Shadow evaluation of a candidate embedding model on live traffic.
+
+For a sample of requests the preprocessed face is handed to a background
+worker that embeds it with the candidate (shadow) model after the primary
+response has been computed. The request thread only copies the face and
+enqueues it (never blocking: when the queue is full the sample is dropped),
+so shadow inference adds no latency to the primary response. It does share
+the CPU, which is what the sample rate and queue size bound.
+
+Each completed sample records:
+- latency: the primary inference time as served (scheduler queue wait
+  included) and the shadow model's own single-face inference time. These
+  measure different spans, so they are reported side by side and never
+  subtracted from each other
+- embedding agreement: cosine similarity of the two embeddings
+- decision agreement: when a stored employee embedding is available, whether
+  both models make the same match / no-match decision against it at the
+  verification threshold. Stored embeddings come from the primary model, so
+  this is meaningful for candidates sharing its embedding space (quantized
+  or distilled versions of it)
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+from .model_loader import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+# Latency and similarity samples kept for the summary percentiles
+WINDOW = 1000
+
+
+class _Sample:
+    __slots__ = ('face', 'primary_embedding', 'primary_ms', 'employee_id')
+
+    def __init__(self, face, primary_embedding, primary_ms, employee_id):
+        self.face = face
+        self.primary_embedding = primary_embedding
+        self.primary_ms = primary_ms
+        self.employee_id = employee_id
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    denominator = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / denominator if denominator else 0.0
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "mean": None}
+    array = np.asarray(values)
+    return {"p50": float(np.percentile(array, 50)),
+            "p95": float(np.percentile(array, 95)),
+            "mean": float(array.mean())}
+
+
+class ShadowEvaluator:
+    def __init__(
+        self,
+        load_fn: Callable[[], object],
+        sample_rate: float = 0.1,
+        threshold: float = 0.6,
+        max_queue: int = 32,
+        reference_fn: Optional[Callable[[Optional[str], np.ndarray], Optional[np.ndarray]]] = None,
+    ):
+        """
+        Initialize the evaluator (the shadow model is loaded by the worker).
+
+        Args:
+            load_fn: Loads the shadow model, an object with embed_batch()
+                like core.embedding.FaceEmbedding
+            sample_rate: Fraction of requests evaluated in shadow (0-1)
+            threshold: Verification threshold for the match decisions
+            max_queue: Samples waiting for the worker before new ones are dropped
+            reference_fn: (employee_id or None, primary embedding) -> stored
+                employee embedding to decide against, or None to skip the
+                decision comparison
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.reference_fn = reference_fn
+        self._loader = ModelLoader(load_fn, name='shadow model')
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._counts = {"sampled": 0, "completed": 0, "dropped": 0, "errors": 0}
+        self._decisions = {"both_match": 0, "both_reject": 0,
+                           "primary_only": 0, "shadow_only": 0}
+        self._primary_ms = deque(maxlen=WINDOW)
+        self._shadow_ms = deque(maxlen=WINDOW)
+        self._similarity = deque(maxlen=WINDOW)
+
+    def submit(self, face: np.ndarray, primary_embedding: np.ndarray, primary_ms: float,
+               employee_id: Optional[str] = None) -> bool:
+        """
+        Maybe evaluate this request in shadow; returns whether it was queued.
+
+        face may be a reused buffer: it is copied before this returns.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        self._ensure_worker()
+        sample = _Sample(np.array(face, dtype=np.float32), np.asarray(primary_embedding),
+                         primary_ms, employee_id)
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            with self._stats_lock:
+                self._counts["dropped"] += 1
+            return False
+        with self._stats_lock:
+            self._counts["sampled"] += 1
+        return True
+
+    def _ensure_worker(self):
+        # Started on first use, i.e. in the serving process after any fork
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='shadow-evaluator', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            sample = self._queue.get()
+            try:
+                self._evaluate(sample)
+            except Exception as e:
+                logger.error(f"Shadow evaluation failed: {e}", exc_info=True)
+                with self._stats_lock:
+                    self._counts["errors"] += 1
+
+    def _evaluate(self, sample: _Sample):
+        model = self._loader.get()
+        started = time.perf_counter()
+        shadow_embedding = model.embed_batch(sample.face[np.newaxis])[0]
+        shadow_ms = (time.perf_counter() - started) * 1000.0
+        similarity = _cosine(sample.primary_embedding, shadow_embedding)
+
+        decision = None
+        if self.reference_fn is not None:
+            reference = self.reference_fn(sample.employee_id, sample.primary_embedding)
+            if reference is not None:
+                primary_match = _cosine(sample.primary_embedding, reference) >= self.threshold
+                shadow_match = _cosine(shadow_embedding, reference) >= self.threshold
+                decision = ("both_match" if primary_match and shadow_match else
+                            "both_reject" if not (primary_match or shadow_match) else
+                            "primary_only" if primary_match else "shadow_only")
+
+        with self._stats_lock:
+            self._counts["completed"] += 1
+            self._primary_ms.append(sample.primary_ms)
+            self._shadow_ms.append(shadow_ms)
+            self._similarity.append(similarity)
+            if decision is not None:
+                self._decisions[decision] += 1
+
+    def summary(self) -> dict:
+        """Counters, latency percentiles and agreement for the /shadow/summary endpoint."""
+        with self._stats_lock:
+            compared = sum(self._decisions.values())
+            agreed = self._decisions["both_match"] + self._decisions["both_reject"]
+            return {
+                "sample_rate": self.sample_rate,
+                "model": self._loader.status(),
+                "queue_depth": self._queue.qsize(),
+                **self._counts,
+                "latency_ms": {
+                    "primary": _percentiles(self._primary_ms),
+                    "shadow": _percentiles(self._shadow_ms),
+                },
+                "embedding_similarity": {
+                    **_percentiles(self._similarity),
+                    "min": min(self._similarity) if self._similarity else None,
+                },
+                "decisions": {
+                    "threshold": self.threshold,
+                    "compared": compared,
+                    "agreement": agreed / compared if compared else None,
+                    **self._decisions,
+                },
+            }
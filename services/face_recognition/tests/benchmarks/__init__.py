@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the face recognition pipeline.
+
+These are standalone scripts, not pytest tests. Run them from the repository
+root, e.g.:
+    python -m services.face_recognition.tests.benchmarks.bench_inference
+"""
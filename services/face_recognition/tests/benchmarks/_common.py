@@ -0,0 +1,93 @@
+"""
+Shared timing helpers for the benchmark scripts.
+"""
+
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 3) -> List[float]:
+    """Call fn warmup + iterations times; return per-call latencies in ms."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean/p50/p95/p99 (ms) of a list of latency samples."""
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def print_row(label: str, stats: Dict[str, float]):
+    print(f"  {label:<32} mean={stats['mean_ms']:9.3f} ms  p50={stats['p50_ms']:9.3f} ms  "
+          f"p95={stats['p95_ms']:9.3f} ms  p99={stats['p99_ms']:9.3f} ms")
+
+
+def write_json(path: str, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+
+
+class WholeFrameDetector:
+    """Detector stand-in for --no-detect runs: the face fills the frame."""
+
+    def detect(self, image, device_id=None):
+        h, w = image.shape[:2]
+        return (0, 0, w, h)
+
+
+def flatten(results, prefix: str = "") -> Dict[str, dict]:
+    """{"a": {"b": stats}} -> {"a/b": stats} for every dict holding a p50_ms."""
+    flat = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        name = f"{prefix}/{key}" if prefix else str(key)
+        if "p50_ms" in value:
+            flat[name] = value
+        else:
+            flat.update(flatten(value, name))
+    return flat
+
+
+def compare_to_baseline(results, baseline, tolerance: float = 0.2,
+                        min_delta_ms: float = 0.05, metric: str = "p50_ms") -> List[str]:
+    """
+    Print current vs baseline for every measurement both runs have, and
+    return the names whose metric grew by more than tolerance (and by more
+    than min_delta_ms, so sub-noise stages do not flap).
+    """
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    print(f"\n{'measurement':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(current.keys() & previous.keys()):
+        before, after = previous[name][metric], current[name][metric]
+        change = (after - before) / before if before else 0.0
+        regressed = change > tolerance and after - before > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<48} {before:>10.3f} {after:>10.3f} {change:>+7.0%}"
+              + ("  REGRESSION" if regressed else ""))
+    for name in sorted(previous.keys() - current.keys()):
+        print(f"{name:<48} (not measured in this run)")
+    return regressions
@@ -0,0 +1,95 @@
+"""
+Decode benchmark: time and memory of a full JPEG decode against libjpeg
+reduced-scale decoding (IMREAD_REDUCED_COLOR_2/4/8), on large photos like
+those uploaded at enrollment.
+
+    python -m services.face_recognition.tests.benchmarks.bench_decode \
+        [--images a.jpg b.jpg] [--upscale 4000x3000] [--detect-min-side 300] \
+        [--iterations 20] [--json out.json]
+
+Memory is the tracemalloc peak during one decode (the decoded array; libjpeg's
+own working buffers are not counted). The "pipeline" row is what the face
+pipeline does: the reduced decode picked for the detector input, plus a
+second, finer decode only when the face (assumed to span a third of the
+shorter side) would be smaller than 112 px at that scale.
+"""
+
+import argparse
+import os
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from ...config.paths import TEST_IMAGES_DIR
+from ...core.decode import (decode_image, face_reduction, jpeg_dimensions,
+                            reduction_for)
+from ._common import print_row, summarize, time_calls, write_json
+
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def pipeline_decode(data, args):
+    size = jpeg_dimensions(data)
+    factor = reduction_for(size, args.detect_min_side)
+    image = decode_image(data, factor)
+    side = min(size) if size else min(image.shape[:2])
+    face_factor = face_reduction((0, 0, side // 3, side // 3), factor, 112)
+    if face_factor != factor:
+        image = decode_image(data, face_factor)
+    return image
+
+
+def bench_image(label, data, args):
+    size = jpeg_dimensions(data)
+    print(f"\n{label}: {size[0]}x{size[1]}, {len(data) / 1e6:.2f} MB JPEG")
+    results = {}
+    cases = [(f"full decode + resize to {args.detect_min_side}",
+              lambda: cv2.resize(decode_image(data), (args.detect_min_side,) * 2))]
+    cases += [(f"reduced 1/{f}", lambda f=f: decode_image(data, f)) for f in (1, 2, 4, 8)]
+    cases.append((f"pipeline (1/{reduction_for(size, args.detect_min_side)})",
+                  lambda: pipeline_decode(data, args)))
+    for name, fn in cases:
+        stats = summarize(time_calls(fn, args.iterations))
+        stats["peak_mb"] = peak_mb(fn)
+        print_row(name, stats)
+        print(f"  {'':<32} peak memory {stats['peak_mb']:.1f} MB")
+        results[name] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", nargs="+",
+                        default=[os.path.join(TEST_IMAGES_DIR, "thomas.jpg")])
+    parser.add_argument("--upscale", default="4000x3000",
+                        help="Also benchmark the first image re-encoded at this size ('' to skip)")
+    parser.add_argument("--detect-min-side", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    inputs = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            inputs.append((os.path.basename(path), f.read()))
+    if args.upscale and inputs:
+        width, height = (int(v) for v in args.upscale.lower().split("x"))
+        image = cv2.resize(decode_image(inputs[0][1]), (width, height))
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        inputs.append((f"{inputs[0][0]} @ {args.upscale}", buffer.tobytes()))
+
+    results = {label: bench_image(label, data, args) for label, data in inputs
+               if jpeg_dimensions(data)}
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
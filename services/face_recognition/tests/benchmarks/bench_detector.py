@@ -0,0 +1,70 @@
+"""
+Face detection throughput: one frame at a time vs batched blobFromImages,
+across detector input resolutions, and with an ROI hint.
+
+    python -m services.face_recognition.tests.benchmarks.bench_detector \
+        [--images DIR] [--batch-size 8] [--input-sizes 300x300 400x300 200x150] \
+        [--iterations 20] [--json out.json]
+
+Without --images, frames from tests/test_images are used.
+"""
+
+import argparse
+import os
+
+import cv2
+
+from ...core.detector import FaceDetector
+from ...core import preprocessing
+from ...config.paths import BASE_DIR, TEST_IMAGES_DIR
+from ._common import time_calls, summarize, print_row, write_json
+
+
+def load_frames(directory, count):
+    names = sorted(n for n in os.listdir(directory)
+                   if n.lower().endswith(('.jpg', '.jpeg', '.png')))
+    frames = [cv2.imread(os.path.join(directory, n)) for n in names]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        raise SystemExit(f"No images found in {directory}")
+    return [frames[i % len(frames)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=str(TEST_IMAGES_DIR))
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--input-sizes", nargs="+", default=["300x300", "400x300", "200x150"])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    # preprocessing resolves the weights relative to the service directory
+    net = cv2.dnn.readNetFromCaffe(str(BASE_DIR / preprocessing.PROTOTXT_PATH),
+                                   str(BASE_DIR / preprocessing.MODEL_PATH))
+    frames = load_frames(args.images, args.batch_size)
+
+    results = {}
+    for size in args.input_sizes:
+        input_size = tuple(int(v) for v in size.lower().split("x"))
+        detector = FaceDetector(net, input_size=input_size,
+                                roi_hints={"door": (0.2, 0.0, 0.8, 1.0)})
+        print(f"input {size} ({len(frames)} frames per call):")
+        runs = {
+            "sequential": lambda: [detector.detect(f) for f in frames],
+            "batched": lambda: detector.detect_batch(frames),
+            "batched+roi": lambda: detector.detect_batch(frames, ["door"] * len(frames)),
+        }
+        for label, fn in runs.items():
+            stats = summarize(time_calls(fn, args.iterations))
+            stats["per_frame_ms"] = stats["mean_ms"] / len(frames)
+            results[f"{size}/{label}"] = stats
+            print_row(f"{label:<12} ({stats['per_frame_ms']:.3f} ms/frame)", stats)
+        print(f"  roi: {detector.stats()}")
+
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
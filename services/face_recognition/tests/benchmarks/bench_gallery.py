@@ -0,0 +1,102 @@
+"""
+Gallery search benchmark: recall@k and latency of the IVF index against exact
+(flat) search on synthetic 512-d embeddings.
+
+    python -m services.face_recognition.tests.benchmarks.bench_gallery \
+        [--sizes 1000 10000 100000] [--nprobe 1 4 8 16 32] [--k 5] \
+        [--queries 200] [--json out.json]
+
+Gallery embeddings are drawn around a set of shared centers (face embeddings
+are not uniform on the sphere), and each query is a noisy re-capture of a
+random enrolled identity, like a new camera frame of an employee.
+Recall@k is the fraction of the exact top-k that the index also returns.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ...core.ann_index import IVFIndex
+from ...core.gallery import normalize
+from ._common import print_row, summarize, time_calls, write_json
+
+DIM = 512
+
+
+def synthetic_gallery(size: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.normal(size=(max(1, size // 100), DIM))
+    members = centers[rng.integers(len(centers), size=size)]
+    return normalize(members + rng.normal(scale=1.0, size=(size, DIM)))
+
+
+def noisy_queries(gallery: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    identities = gallery[rng.integers(len(gallery), size=count)]
+    return normalize(identities + rng.normal(scale=0.04, size=identities.shape))
+
+
+def exact_top_k(gallery: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = gallery @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def bench_size(size, args, rng):
+    print(f"\n{size} identities")
+    gallery = synthetic_gallery(size, rng)
+    queries = noisy_queries(gallery, args.queries, rng)
+    truth = [set(exact_top_k(gallery, q, args.k)) for q in queries]
+    top1 = [exact_top_k(gallery, q, 1)[0] for q in queries]
+
+    cycle = iter(range(10 ** 9))
+    exact = summarize(time_calls(
+        lambda: exact_top_k(gallery, queries[next(cycle) % len(queries)], args.k),
+        args.queries))
+    print_row("exact", exact)
+    results = {"exact": exact}
+
+    index = IVFIndex(DIM)
+    start = time.perf_counter()
+    index.build(np.arange(size), gallery)
+    build_seconds = time.perf_counter() - start
+    print(f"  IVF build: {len(index.centroids)} lists in {build_seconds:.2f}s")
+    results["ivf_build_seconds"] = build_seconds
+    results["ivf_nlist"] = len(index.centroids)
+
+    for nprobe in args.nprobe:
+        if nprobe > len(index.centroids):
+            continue
+        found = [index.search(q, args.k, nprobe=nprobe)[0] for q in queries]
+        recall_k = float(np.mean([len(truth[i] & set(f)) / args.k for i, f in enumerate(found)]))
+        recall_1 = float(np.mean([len(f) > 0 and f[0] == top1[i] for i, f in enumerate(found)]))
+        cycle = iter(range(10 ** 9))
+        stats = summarize(time_calls(
+            lambda: index.search(queries[next(cycle) % len(queries)], args.k, nprobe=nprobe),
+            args.queries))
+        stats.update(recall_at_1=recall_1, recall_at_k=recall_k,
+                     speedup=exact["p50_ms"] / stats["p50_ms"])
+        print_row(f"ivf nprobe={nprobe}", stats)
+        print(f"  {'':<32} recall@1={recall_1:.3f}  recall@{args.k}={recall_k:.3f}  "
+              f"speedup={stats['speedup']:.1f}x")
+        results[f"ivf_nprobe{nprobe}"] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = {str(size): bench_size(size, args, rng) for size in args.sizes}
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
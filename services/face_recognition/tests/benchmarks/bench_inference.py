@@ -0,0 +1,49 @@
+"""
+Per-image inference latency: model.predict vs the compiled tf.function path.
+
+    python -m services.face_recognition.tests.benchmarks.bench_inference \
+        [--model PATH] [--iterations 200] [--batch-sizes 1 4 16] [--json out.json]
+"""
+
+import argparse
+
+import numpy as np
+
+from ...core.embedding import FaceEmbedding
+from ...config.paths import MODEL_PATH
+from ._common import time_calls, summarize, print_row, write_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    results = {}
+    for compiled in (False, True):
+        label = "compiled" if compiled else "predict"
+        embedder = FaceEmbedding(args.model, compiled=compiled, warmup=True)
+        print(f"{label}:")
+        for batch_size in args.batch_sizes:
+            batch = np.random.uniform(
+                -1, 1, (batch_size,) + embedder.input_shape).astype(np.float32)
+            stats = summarize(time_calls(
+                lambda: embedder.embed_batch(batch), args.iterations))
+            stats["per_image_ms"] = stats["mean_ms"] / batch_size
+            results[f"{label}/batch{batch_size}"] = stats
+            print_row(f"batch={batch_size:<3} ({stats['per_image_ms']:.3f} ms/img)", stats)
+
+    for batch_size in args.batch_sizes:
+        speedup = (results[f"predict/batch{batch_size}"]["mean_ms"]
+                   / results[f"compiled/batch{batch_size}"]["mean_ms"])
+        print(f"batch={batch_size}: compiled path is {speedup:.2f}x faster")
+
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Per-stage benchmark of the face pipeline: base64 decode, image decode,
+quality gate, detect, crop, preprocess, inference and response serialization
+are each timed on their own, for every image in TEST_IMAGES_DIR and for one
+source photo re-encoded at several sizes, plus inference at several batch
+sizes and the end-to-end FacePipeline.run.
+
+    python -m services.face_recognition.tests.benchmarks.bench_pipeline \
+        [--model PATH] [--images DIR] [--source thomas.jpg] \
+        [--sizes 320x240 640x480 1280x720 1920x1080] [--batch-sizes 1 4 16] \
+        [--iterations 30] [--no-detect] [--full-decode] [--json out.json] \
+        [--save-baseline] [--baseline PATH] [--tolerance 0.2] [--fail-on-regression]
+
+--save-baseline stores the results as the baseline; later runs print each
+p50 against it and flag stages that got slower by more than --tolerance
+(exit status 1 with --fail-on-regression, e.g. in CI on a fixed runner).
+Baselines are only comparable on the same host and model.
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from ...config.model_config import DETECTOR_INPUT_SIZE, MODEL_INPUT_SIZE
+from ...config.paths import BASE_DIR, MODEL_PATH, TEST_IMAGES_DIR
+from ...core import preprocessing
+from ...core.decode import decode_image, jpeg_dimensions, reduction_for
+from ...core.detector import FaceDetector
+from ...core.embedding import FaceEmbedding
+from ...core.pipeline import FacePipeline
+from ...core.quality import QualityGate
+from ._common import (WholeFrameDetector, compare_to_baseline, print_row,
+                      summarize, time_calls, write_json)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+
+
+def load_inputs(args):
+    """(label, encoded bytes) for each test image and each re-encoded size."""
+    inputs = []
+    for name in sorted(os.listdir(args.images)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(args.images, name), "rb") as f:
+                data = f.read()
+            image = decode_image(data)
+            if image is not None:
+                inputs.append((f"{name}@{image.shape[1]}x{image.shape[0]}", data))
+
+    source = decode_image(open(os.path.join(args.images, args.source), "rb").read())
+    for size in args.sizes:
+        width, height = (int(v) for v in size.lower().split("x"))
+        ok, buffer = cv2.imencode(".jpg", cv2.resize(source, (width, height)),
+                                  [cv2.IMWRITE_JPEG_QUALITY, 90])
+        inputs.append((f"{args.source}@{size}", buffer.tobytes()))
+    return inputs
+
+
+def bench_image(data, detector, embedder, gate, args):
+    """Time each stage in isolation, feeding it the previous stage's output."""
+    detect_min_side = None if args.full_decode else min(DETECTOR_INPUT_SIZE)
+    encoded = base64.b64encode(data)
+    factor = reduction_for(jpeg_dimensions(data), detect_min_side) if detect_min_side else 1
+    image = decode_image(data, factor)
+    box = detector.detect(image)
+
+    stages = {
+        "base64_decode": lambda: base64.b64decode(encoded),
+        "decode": lambda: decode_image(data, factor),
+        "quality": lambda: gate.check_frame(image),
+        "detect": lambda: detector.detect(image),
+    }
+    if box is not None:
+        face = preprocessing.align_face_simple(image, box)
+        preprocessed = preprocessing.preprocess_image(face)
+        embedding = embedder.embed_batch(preprocessed[np.newaxis])[0]
+        stages.update({
+            "crop": lambda: preprocessing.align_face_simple(image, box),
+            "preprocess": lambda: preprocessing.preprocess_image(face),
+            "infer": lambda: embedder.embed_batch(preprocessed[np.newaxis]),
+            "serialize_json": lambda: json.dumps({"embedding": embedding.tolist()}),
+            "serialize_binary": lambda: np.ascontiguousarray(embedding, dtype="<f4").tobytes(),
+        })
+        pipeline = FacePipeline(lambda f: embedder.embed_batch(f[np.newaxis])[0],
+                                detector=detector, quality_gate=gate,
+                                detect_min_side=detect_min_side,
+                                face_size=min(MODEL_INPUT_SIZE))
+        stages["end_to_end"] = lambda: pipeline.run(data)
+
+    results = {"decode_factor": factor, "face_found": box is not None}
+    for stage, fn in stages.items():
+        results[stage] = summarize(time_calls(fn, args.iterations))
+        print_row(stage, results[stage])
+    if box is None:
+        print("  (no face detected: later stages skipped)")
+    return results
+
+
+def bench_batches(embedder, args):
+    results = {}
+    for batch_size in args.batch_sizes:
+        batch = np.random.uniform(
+            -1, 1, (batch_size,) + embedder.input_shape).astype(np.float32)
+        stats = summarize(time_calls(lambda: embedder.embed_batch(batch), args.iterations))
+        stats["per_image_ms"] = stats["mean_ms"] / batch_size
+        results[f"batch{batch_size}"] = stats
+        print_row(f"batch={batch_size:<3} ({stats['per_image_ms']:.3f} ms/img)", stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--images", default=str(TEST_IMAGES_DIR))
+    parser.add_argument("--source", default="thomas.jpg",
+                        help="Image in --images re-encoded at each of --sizes")
+    parser.add_argument("--sizes", nargs="*", default=["320x240", "640x480", "1280x720", "1920x1080"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--no-detect", action="store_true",
+                        help="Skip the res10 detector (whole frame is the face)")
+    parser.add_argument("--full-decode", action="store_true",
+                        help="Decode at full resolution instead of libjpeg reduced scale")
+    parser.add_argument("--json", help="Write machine-readable results here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p50 slowdown before a stage is flagged (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    embedder = FaceEmbedding(args.model)
+    if args.no_detect:
+        detector = WholeFrameDetector()
+    else:
+        detector = FaceDetector(cv2.dnn.readNetFromCaffe(
+            str(BASE_DIR / preprocessing.PROTOTXT_PATH),
+            str(BASE_DIR / preprocessing.MODEL_PATH)), input_size=DETECTOR_INPUT_SIZE)
+    gate = QualityGate()
+
+    results = {"images": {}, "inference": {}}
+    for label, data in load_inputs(args):
+        print(f"\n{label}")
+        results["images"][label] = bench_image(data, detector, embedder, gate, args)
+    print("\ninference")
+    results["inference"] = bench_batches(embedder, args)
+    if args.json:
+        write_json(args.json, results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        write_json(args.baseline, results)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the baseline by more "
+                  f"than {args.tolerance:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("\nNo regressions against the baseline.")
+    else:
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline.")
+
+
+if __name__ == "__main__":
+    main()
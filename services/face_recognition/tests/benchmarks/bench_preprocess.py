@@ -0,0 +1,90 @@
+"""
+Face preprocessing allocations and latency: the original preprocess_image
+(RGB copy, resize, float32 copy, normalized copy, expand_dims + np.stack into
+a batch) against the buffered path (per-thread scratch, fused normalize
+written straight into a preallocated batch tensor).
+
+    python -m services.face_recognition.tests.benchmarks.bench_preprocess \
+        [--crop 240x240] [--batch-size 16] [--iterations 500] [--json out.json]
+
+Allocation is the tracemalloc peak (bytes) above the starting point while
+preprocessing one face, or one whole batch divided by its size.
+"""
+
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from ...core.preprocessing import face_buffer, preprocess_image
+from ._common import print_row, summarize, time_calls, write_json
+
+
+def legacy_preprocess(image, target_size=(112, 112)):
+    """preprocess_image as it was before the buffer pool."""
+    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    resized = cv2.resize(rgb_image, target_size)
+    resized = resized.astype(np.float32)
+    return (resized - 127.5) / 128.0
+
+
+def allocated_bytes(fn) -> int:
+    fn()  # warm scratch buffers and caches
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--crop", default="240x240", help="Face crop size WxH")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.crop.lower().split("x"))
+    crops = [np.random.default_rng(i).integers(0, 255, (height, width, 3), dtype=np.uint8)
+             for i in range(args.batch_size)]
+    batch = np.empty((args.batch_size, 112, 112, 3), dtype=np.float32)
+
+    def legacy_batch():
+        return np.concatenate([np.expand_dims(legacy_preprocess(c), 0) for c in crops])
+
+    def buffered_batch():
+        for row, crop in zip(batch, crops):
+            preprocess_image(crop, out=row)
+        return batch
+
+    cases = {
+        "legacy (one face)": (lambda: legacy_preprocess(crops[0]), 1),
+        "new, fresh output (one face)": (lambda: preprocess_image(crops[0]), 1),
+        "new, thread buffer (one face)": (lambda: preprocess_image(crops[0], out=face_buffer()), 1),
+        f"legacy batch of {args.batch_size}": (legacy_batch, args.batch_size),
+        f"new, into batch of {args.batch_size}": (buffered_batch, args.batch_size),
+    }
+    results = {}
+    print(f"{args.crop} face crops -> 112x112 float32")
+    for name, (fn, count) in cases.items():
+        stats = summarize(time_calls(fn, args.iterations))
+        stats["allocated_bytes_per_image"] = allocated_bytes(fn) / count
+        stats["per_image_ms"] = stats["mean_ms"] / count
+        results[name] = stats
+        print_row(name, stats)
+        print(f"  {'':<32} {stats['allocated_bytes_per_image'] / 1024:.1f} KiB allocated per image, "
+              f"{stats['per_image_ms']:.3f} ms per image")
+
+    legacy = results["legacy (one face)"]["allocated_bytes_per_image"]
+    buffered = results["new, thread buffer (one face)"]["allocated_bytes_per_image"]
+    print(f"Allocation per image: {legacy / 1024:.1f} KiB -> {buffered / 1024:.1f} KiB")
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
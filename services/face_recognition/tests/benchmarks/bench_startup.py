@@ -0,0 +1,81 @@
+"""
+Cold start of the face service: how long after launch the process answers
+/health (liveness) and /ready (model loaded and warm), plus the cost of
+importing the service modules alone.
+
+    python -m services.face_recognition.tests.benchmarks.bench_startup \
+        [--runs 5] [--workers 1] [--json out.json]
+
+MODEL_PATH / MODEL_BACKEND are passed through, e.g. to compare a Keras .h5
+cold start against a memory-mapped .tflite one.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from ...config.paths import BASE_DIR
+from ._common import summarize, print_row, write_json
+from .bench_workers import start_service
+
+
+def time_import(module):
+    """Seconds for a fresh interpreter to import module (no model load)."""
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=BASE_DIR,
+                   env=env, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def time_until(url, started, timeout=300):
+    while time.perf_counter() - started < timeout:
+        try:
+            response = requests.get(url, timeout=1)
+        except requests.exceptions.RequestException:
+            response = None
+        if response is not None:
+            if response.status_code == 200:
+                return time.perf_counter() - started
+            if response.headers.get("Content-Type") == "application/json" \
+                    and response.json().get("state") == "failed":
+                raise RuntimeError(f"Model load failed: {response.json().get('error')}")
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} did not answer 200 within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=5092)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    samples = {"import service.routes": [], "/health": [], "/ready": []}
+    for _ in range(args.runs):
+        samples["import service.routes"].append(time_import("service.routes") * 1000.0)
+        started = time.perf_counter()
+        process = start_service(args.workers, args.port)
+        try:
+            samples["/health"].append(time_until(f"{url}/health", started) * 1000.0)
+            samples["/ready"].append(time_until(f"{url}/ready", started) * 1000.0)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    results = {label: summarize(values) for label, values in samples.items()}
+    print(f"cold start, {args.workers} worker(s), {args.runs} runs:")
+    for label, stats in results.items():
+        print_row(label, stats)
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Thread-setting matrix: images/sec and p99 of the full face pipeline
+(decode -> detect -> crop -> preprocess -> batched infer) for every
+combination of TF intra-op / inter-op threads, OpenCV threads and client
+concurrency.
+
+    python -m services.face_recognition.tests.benchmarks.bench_threading \
+        [--model PATH] [--intra-op 1 2 4] [--inter-op 1 2] [--opencv 0 1 2] \
+        [--concurrency 1 4 8] [--duration 10] [--no-detect] [--json out.json]
+
+TensorFlow fixes its pool sizes once per process, so each setting runs in a
+fresh subprocess. --no-detect skips the res10 detector (whole frame is the
+face), e.g. when its weights are not available.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from ...config.paths import BASE_DIR, MODEL_PATH, TEST_IMAGES_DIR
+from ._common import WholeFrameDetector, summarize, write_json
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def run_setting(args):
+    """Child process: apply one thread setting and drive the pipeline."""
+    from ...config.threading_config import apply_thread_settings
+    settings = apply_thread_settings(
+        intra_op=args.child_intra_op, inter_op=args.child_inter_op,
+        opencv_threads=args.child_opencv)
+
+    import cv2
+    from ...core import preprocessing
+    from ...core.detector import FaceDetector
+    from ...core.embedding import FaceEmbedding
+    from ...core.pipeline import FacePipeline
+    from ...service.scheduler import InferenceScheduler
+
+    embedder = FaceEmbedding(args.model, num_threads=settings["tf_intra_op_threads"])
+    scheduler = InferenceScheduler(embedder.embed_batch)
+    scheduler.start()
+    if args.no_detect:
+        detector = WholeFrameDetector()
+    else:
+        detector = FaceDetector(cv2.dnn.readNetFromCaffe(
+            str(BASE_DIR / preprocessing.PROTOTXT_PATH),
+            str(BASE_DIR / preprocessing.MODEL_PATH)))
+    pipeline = FacePipeline(scheduler.embed, detector=detector)
+
+    images = []
+    for name in sorted(os.listdir(args.images)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(args.images, name), "rb") as f:
+                images.append(f.read())
+    images = [data for data in images if pipeline.run(data).ok]  # also warms up
+    if not images:
+        raise SystemExit("No image produced an embedding")
+
+    latencies, lock = [], threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            pipeline.run(images[i % len(images)])
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            i += 1
+
+    started = time.monotonic()
+    clients = [threading.Thread(target=client, args=(n,))
+               for n in range(args.child_concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.monotonic() - started
+    scheduler.stop()
+
+    stats = summarize(latencies)
+    stats.update(settings, concurrency=args.child_concurrency,
+                 images_per_sec=len(latencies) / elapsed)
+    print("RESULT " + json.dumps(stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--images", default=str(TEST_IMAGES_DIR))
+    parser.add_argument("--intra-op", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--inter-op", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--opencv", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--no-detect", action="store_true")
+    parser.add_argument("--json", help="Write machine-readable results here")
+    # One matrix cell, run in a subprocess
+    parser.add_argument("--child-intra-op", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-inter-op", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-opencv", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-concurrency", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_intra_op is not None:
+        run_setting(args)
+        return
+
+    results = {}
+    print(f"{'intra':>5} {'inter':>5} {'cv2':>4} {'conc':>5} {'img/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for intra, inter, opencv, concurrency in itertools.product(
+            args.intra_op, args.inter_op, args.opencv, args.concurrency):
+        command = [
+            sys.executable, "-m", __spec__.name,
+            "--model", args.model, "--images", args.images,
+            "--duration", str(args.duration),
+            "--child-intra-op", str(intra), "--child-inter-op", str(inter),
+            "--child-opencv", str(opencv), "--child-concurrency", str(concurrency),
+        ] + (["--no-detect"] if args.no_detect else [])
+        output = subprocess.run(command, capture_output=True, text=True)
+        lines = [l for l in output.stdout.splitlines() if l.startswith("RESULT ")]
+        if output.returncode != 0 or not lines:
+            print(f"intra={intra} inter={inter} cv2={opencv} conc={concurrency}: failed\n"
+                  f"{output.stderr.strip().splitlines()[-1] if output.stderr.strip() else ''}")
+            continue
+        stats = json.loads(lines[-1][len("RESULT "):])
+        results[f"intra{intra}/inter{inter}/cv{opencv}/conc{concurrency}"] = stats
+        print(f"{intra:>5} {inter:>5} {opencv:>4} {concurrency:>5} "
+              f"{stats['images_per_sec']:>9.1f} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+    if results:
+        best = max(results, key=lambda k: results[k]["images_per_sec"])
+        print(f"Highest throughput: {best} ({results[best]['images_per_sec']:.1f} img/s)")
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Throughput scaling of the prefork service: images/sec and latency for
+1..N gunicorn workers (service/gunicorn.conf.py) under a fixed client load.
+
+    python -m services.face_recognition.tests.benchmarks.bench_workers \
+        --image services/face_recognition/tests/test_images/valid.jpg \
+        [--max-workers N] [--concurrency 16] [--duration 20] [--json out.json]
+
+Each run starts a fresh gunicorn on a local port with GUNICORN_WORKERS set,
+waits for /health, then keeps --concurrency requests to /embed/raw in flight
+for --duration seconds. MODEL_PATH / MODEL_BACKEND are passed through from the
+environment, so e.g. MODEL_BACKEND=tflite compares the memory-mapped backend.
+"""
+
+import argparse
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ...config.paths import BASE_DIR
+from ...config.threading_config import available_cpus
+from ._common import summarize, print_row, write_json
+
+
+def start_service(workers, port):
+    env = dict(os.environ, GUNICORN_WORKERS=str(workers),
+               FACE_SERVICE_BIND=f"127.0.0.1:{port}")
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(BASE_DIR), env.get("PYTHONPATH")) if p)
+    return subprocess.Popen(
+        ["gunicorn", "-c", "service/gunicorn.conf.py"], cwd=BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(url, timeout=180):
+    """Wait until /health answers (workers load their model before accepting)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Service at {url} did not become ready")
+
+
+def drive_load(url, image_bytes, concurrency, duration):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        nonlocal errors
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = session.post(
+                f"{url}/embed/raw", data=image_bytes,
+                headers={"Content-Type": "application/octet-stream"}, timeout=60)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            with lock:
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return latencies, errors, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", required=True, help="JPEG containing one face")
+    parser.add_argument("--max-workers", type=int, default=available_cpus())
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=5091)
+    parser.add_argument("--json", help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+    url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    for workers in range(1, args.max_workers + 1):
+        process = start_service(workers, args.port)
+        try:
+            wait_ready(url)
+            # Let every worker finish loading and warm up before measuring
+            drive_load(url, image_bytes, args.concurrency, 2.0)
+            latencies, errors, elapsed = drive_load(
+                url, image_bytes, args.concurrency, args.duration)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        if not latencies:
+            raise SystemExit(f"No successful requests with {workers} worker(s) "
+                             f"({errors} errors); does --image contain a face?")
+        stats = summarize(latencies)
+        stats.update(workers=workers, errors=errors,
+                     images_per_sec=len(latencies) / elapsed)
+        results[f"workers{workers}"] = stats
+        print_row(f"workers={workers:<2} {stats['images_per_sec']:8.1f} img/s", stats)
+
+    base = results["workers1"]["images_per_sec"]
+    for key, stats in results.items():
+        print(f"{key}: {stats['images_per_sec'] / base:.2f}x the single-worker throughput")
+
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == "__main__":
+    main()
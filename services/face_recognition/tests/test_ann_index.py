@@ -0,0 +1,58 @@
+"""
+Tests for the IVF approximate nearest-neighbor index.
+"""
+
+import numpy as np
+import pytest
+
+from ..core.ann_index import IVFIndex
+from ..core.verification import normalize_rows
+
+
+def _vectors(n, dim=16, seed=0):
+    return normalize_rows(np.random.default_rng(seed).normal(size=(n, dim)))
+
+
+class TestIVFIndex:
+    def test_full_probe_matches_exact_search(self):
+        vectors = _vectors(500)
+        index = IVFIndex(dim=16, nlist=10)
+        index.build(np.arange(500), vectors)
+
+        query = vectors[42]
+        labels, scores = index.search(query, k=5, nprobe=10)
+
+        expected = np.argsort(-(vectors @ query))[:5]
+        assert list(labels) == list(expected)
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_partial_probe_finds_indexed_vectors(self):
+        vectors = _vectors(2000)
+        index = IVFIndex(dim=16, nprobe=4)
+        index.build(np.arange(2000), vectors)
+
+        # A vector's own cluster is the nearest centroid, so it is always probed
+        hits = [index.search(vectors[i], k=1)[0][0] == i for i in range(0, 2000, 50)]
+        assert all(hits)
+
+    def test_add_remove_and_relabel(self):
+        vectors = _vectors(300)
+        index = IVFIndex(dim=16, nlist=8)
+        index.build(np.arange(200), vectors[:200])
+
+        index.add(250, vectors[250])
+        assert index.search(vectors[250], k=1, nprobe=8)[0][0] == 250
+
+        assert index.remove(7)
+        assert not index.remove(7)
+        assert 7 not in index
+        assert 7 not in index.search(vectors[7], k=5, nprobe=8)[0]
+
+        index.relabel(250, 7)
+        assert index.search(vectors[250], k=1, nprobe=8)[0][0] == 7
+        assert len(index) == 200
+
+    def test_add_before_build_raises(self):
+        with pytest.raises(RuntimeError):
+            IVFIndex(dim=16).add(0, _vectors(1)[0])
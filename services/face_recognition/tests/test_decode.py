@@ -0,0 +1,90 @@
+"""
+Tests for reduced-resolution JPEG decoding.
+"""
+
+import cv2
+import numpy as np
+
+from ..core import pipeline as pipeline_module
+from ..core.decode import (decode_image, face_reduction, jpeg_dimensions,
+                           reduction_for, scale_box)
+from ..core.pipeline import FacePipeline
+
+
+def _encode(shape, ext='.jpg'):
+    image = np.random.default_rng(0).integers(40, 215, shape, dtype=np.uint8)
+    ok, buffer = cv2.imencode(ext, image)
+    assert ok
+    return buffer.tobytes()
+
+
+class TestReducedDecode:
+    def test_jpeg_dimensions_from_header(self):
+        assert jpeg_dimensions(_encode((1200, 1600, 3))) == (1600, 1200)
+        assert jpeg_dimensions(_encode((30, 40, 3), '.png')) is None
+        assert jpeg_dimensions(b'\xff\xd8\xff') is None
+
+    def test_reduction_keeps_detector_resolution(self):
+        assert reduction_for((4000, 3000), 300) == 8
+        assert reduction_for((1600, 1200), 300) == 4
+        assert reduction_for((640, 480), 300) == 1
+        assert reduction_for(None, 300) == 1
+
+    def test_decode_at_reduced_scale(self):
+        data = _encode((1200, 1600, 3))
+        assert decode_image(data, 4).shape == (300, 400, 3)
+        assert decode_image(data).shape == (1200, 1600, 3)
+
+    def test_box_and_face_scale(self):
+        assert scale_box((10, 20, 100, 150), 4, (600, 400)) == (40, 80, 399, 599)
+        # 480 px face: a 1/4 decode still gives the model 120 px
+        assert face_reduction((0, 0, 480, 480), 8, 112) == 4
+        assert face_reduction((0, 0, 100, 100), 8, 112) == 1
+
+
+class TestPipelineReducedDecode:
+    def test_detects_on_reduced_frame_and_reports_full_box(self, monkeypatch):
+        frames = []
+
+        def fake_detect(image, device_id=None):
+            frames.append(image.shape)
+            return (100, 50, 250, 200)  # in 1/4-scale pixels
+
+        monkeypatch.setattr(pipeline_module, 'detect_face', fake_detect)
+        faces = []
+        pipeline = FacePipeline(lambda face: faces.append(face) or np.ones(4),
+                                detect_min_side=300)
+
+        result = pipeline.run(_encode((1200, 1600, 3)))
+
+        assert result.ok
+        assert frames == [(300, 400, 3)]
+        assert result.box == (400, 200, 1000, 800)
+
+    def test_small_face_is_cropped_from_finer_decode(self, monkeypatch):
+        monkeypatch.setattr(pipeline_module, 'detect_face',
+                            lambda image, device_id=None: (100, 50, 120, 70))
+        decodes = []
+        original = pipeline_module.decode_image
+
+        def tracking_decode(data, factor=1):
+            decodes.append(factor)
+            return original(data, factor)
+
+        monkeypatch.setattr(pipeline_module, 'decode_image', tracking_decode)
+        pipeline = FacePipeline(lambda face: np.ones(4), detect_min_side=300)
+
+        result = pipeline.run(_encode((1200, 1600, 3)))
+
+        assert result.ok
+        # 80 px face at full scale: too small to reduce for the crop
+        assert decodes == [4, 1]
+
+    def test_disabled_by_default(self, monkeypatch):
+        frames = []
+        monkeypatch.setattr(pipeline_module, 'detect_face',
+                            lambda image, device_id=None: frames.append(image.shape) or (0, 0, 200, 200))
+
+        FacePipeline(lambda face: np.ones(4)).run(_encode((1200, 1600, 3)))
+
+        assert frames == [(1200, 1600, 3)]
@@ -0,0 +1,115 @@
+"""
+Tests for the batched face detector, using a stand-in for the res10 network.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from ..core.detector import FaceDetector, load_roi_hints
+
+
+class FakeNet:
+    """
+    Mimics the res10 SSD output layout: rows of
+    (image_id, class, confidence, x1, y1, x2, y2) with normalized coordinates.
+    """
+
+    def __init__(self, detections_for):
+        self.detections_for = detections_for
+        self.blob_shapes = []
+
+    def setInput(self, blob):
+        self.blob_shapes.append(blob.shape)
+        self.batch = blob.shape[0]
+
+    def forward(self):
+        rows = []
+        for image_id in range(self.batch):
+            for confidence, box in self.detections_for(len(self.blob_shapes) - 1, image_id):
+                rows.append([image_id, 1, confidence, *box])
+        return np.array(rows, dtype=np.float32).reshape(1, 1, -1, 7)
+
+
+def _frame(h=200, w=400):
+    return np.zeros((h, w, 3), dtype=np.uint8)
+
+
+class TestFaceDetector:
+    def test_picks_best_detection_per_frame_in_one_pass(self):
+        def detections(call, image_id):
+            if image_id == 0:
+                return [(0.5, (0.0, 0.0, 0.5, 0.5)), (0.9, (0.5, 0.5, 1.0, 1.0))]
+            if image_id == 1:
+                return [(0.2, (0.0, 0.0, 1.0, 1.0))]  # below threshold
+            return [(0.8, (0.25, 0.25, 0.75, 0.75))]
+
+        net = FakeNet(detections)
+        detector = FaceDetector(net, input_size=(320, 240), confidence_threshold=0.3)
+
+        boxes = detector.detect_batch([_frame(), _frame(), _frame(100, 100)])
+
+        assert len(net.blob_shapes) == 1
+        assert net.blob_shapes[0] == (3, 3, 240, 320)
+        assert boxes[0] == (200, 100, 399, 199)  # clipped to the frame
+        assert boxes[1] is None
+        assert boxes[2] == (25, 25, 75, 75)
+
+    def test_roi_hint_offsets_box_into_frame(self):
+        net = FakeNet(lambda call, image_id: [(0.9, (0.0, 0.0, 0.5, 0.5))])
+        detector = FaceDetector(net, roi_hints={'door-1': (0.5, 0.5, 1.0, 1.0)})
+
+        box = detector.detect(_frame(), device_id='door-1')
+
+        # ROI is the bottom-right 200x100 quadrant; the face is its top-left quarter
+        assert box == (200, 100, 300, 150)
+        assert len(net.blob_shapes) == 1
+        assert detector.stats()['roi_hits'] == 1
+
+    def test_roi_miss_falls_back_to_full_frame(self):
+        net = FakeNet(lambda call, image_id:
+                      [] if call == 0 else [(0.9, (0.0, 0.0, 0.5, 0.5))])
+        detector = FaceDetector(net, roi_hints={'door-1': (0.5, 0.5, 1.0, 1.0)})
+
+        box = detector.detect(_frame(), device_id='door-1')
+
+        assert box == (0, 0, 200, 100)
+        assert len(net.blob_shapes) == 2
+        assert detector.stats()['roi_fallbacks'] == 1
+
+    def test_unknown_device_searches_full_frame(self):
+        net = FakeNet(lambda call, image_id: [(0.9, (0.0, 0.0, 0.5, 0.5))])
+        detector = FaceDetector(net, roi_hints={'door-1': (0.5, 0.5, 1.0, 1.0)})
+
+        assert detector.detect(_frame(), device_id='lobby') == (0, 0, 200, 100)
+        assert detector.stats()['roi_hits'] == 0
+
+    def test_scored_detection_reports_confidence(self):
+        def detections(call, image_id):
+            return [(0.6, (0.0, 0.0, 0.5, 0.5)), (0.95, (0.5, 0.5, 1.0, 1.0))] if image_id == 0 else []
+
+        detector = FaceDetector(FakeNet(detections), confidence_threshold=0.3)
+
+        scored = detector.detect_batch_scored([_frame(), _frame()])
+
+        box, confidence = scored[0]
+        assert box == (200, 100, 399, 199)
+        assert confidence == pytest.approx(0.95)
+        assert scored[1] is None
+
+    def test_no_network(self):
+        assert FaceDetector(None).detect_batch([_frame(), _frame()]) == [None, None]
+
+
+def test_load_roi_hints_skips_invalid_entries(tmp_path):
+    path = tmp_path / 'roi.json'
+    path.write_text(json.dumps({
+        'door-1': [0.1, 0.2, 0.9, 1.0],
+        'bad-range': [0.5, 0.5, 0.4, 1.0],
+        'bad-shape': [0.1, 0.2],
+    }))
+
+    assert load_roi_hints(str(path)) == {'door-1': (0.1, 0.2, 0.9, 1.0)}
+    assert load_roi_hints(None) == {}
+    assert load_roi_hints(str(tmp_path / 'missing.json')) == {}
@@ -0,0 +1,125 @@
+"""
+Tests for batch enrollment.
+"""
+
+import io
+import tarfile
+import threading
+import time
+
+import numpy as np
+
+from ..core.pipeline import PipelineResult
+from ..service.enrollment import BatchEnroller, image_id, iter_tar
+
+
+def _run(data):
+    if data == b'bad':
+        return PipelineResult(error="Failed to decode image data", status=400)
+    return PipelineResult(embedding=np.full(4, len(data), dtype=np.float32), box=(0, 0, 10, 10))
+
+
+def _tar(members, compression=''):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w' + (':' + compression if compression else '')) as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+class TestBatchEnroller:
+    def test_yields_one_line_per_image_then_summary(self):
+        items = [("EMP001.jpg", b'a'), ("photos/EMP002.png", b'bb'), ("broken.jpg", b'bad')]
+
+        lines = list(BatchEnroller(_run, workers=2).process(items))
+
+        results = {line["id"]: line for line in lines[:-1]}
+        assert set(results) == {"EMP001", "EMP002", "broken"}
+        assert results["EMP002"]["embedding"] == [2.0] * 4
+        assert results["EMP002"]["index"] == 1
+        assert results["EMP002"]["box"] == [0, 0, 10, 10]
+        assert results["broken"]["error"] == "Failed to decode image data"
+        assert results["broken"]["status"] == 400
+        assert "embedding" not in results["broken"]
+        assert lines[-1]["summary"]["images"] == 3
+        assert lines[-1]["summary"]["enrolled"] == 2
+        assert lines[-1]["summary"]["failed"] == 1
+
+    def test_images_are_processed_concurrently(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def slow_run(data):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return _run(data)
+
+        lines = list(BatchEnroller(slow_run, workers=4).process(
+            (f"{i}.jpg", b'x') for i in range(8)))
+
+        assert peak[0] == 4
+        assert lines[-1]["summary"]["enrolled"] == 8
+
+    def test_reads_at_most_max_in_flight_ahead(self):
+        read = []
+        release = threading.Event()
+
+        def items():
+            for i in range(10):
+                read.append(i)
+                yield f"{i}.jpg", b'x'
+
+        def blocked_run(data):
+            release.wait(5)
+            return _run(data)
+
+        lines = BatchEnroller(blocked_run, workers=2, max_in_flight=3).process(items())
+        consumer = threading.Thread(target=lambda: list(lines))
+        consumer.start()
+        time.sleep(0.1)
+        assert len(read) == 3
+        release.set()
+        consumer.join(5)
+        assert len(read) == 10
+
+    def test_pipeline_exception_becomes_error_line(self):
+        def failing_run(data):
+            raise RuntimeError("model crashed")
+
+        lines = list(BatchEnroller(failing_run, workers=1).process([("a.jpg", b'x')]))
+
+        assert lines[0]["error"] == "model crashed"
+        assert lines[0]["status"] == 500
+        assert lines[-1]["summary"]["failed"] == 1
+
+    def test_truncated_stream_reports_error_in_summary(self):
+        data = _tar([(f"{i}.jpg", bytes(2048)) for i in range(4)]).getvalue()
+
+        lines = list(BatchEnroller(_run, workers=2).process(iter_tar(io.BytesIO(data[:5000]))))
+
+        summary = lines[-1]["summary"]
+        assert summary["images"] == len(lines) - 1
+        assert 0 < summary["images"] < 4
+        assert "Could not read the upload" in summary["error"]
+
+
+class TestIterTar:
+    def test_yields_images_only(self):
+        archive = _tar([("staff/EMP001.jpg", b'one'), ("staff/notes.txt", b'x'),
+                        ("EMP002.JPEG", b'two')])
+
+        assert list(iter_tar(archive)) == [("staff/EMP001.jpg", b'one'), ("EMP002.JPEG", b'two')]
+
+    def test_reads_gzipped_streams(self):
+        archive = _tar([("EMP001.png", b'png')], compression='gz')
+
+        assert list(iter_tar(archive)) == [("EMP001.png", b'png')]
+
+    def test_image_id_strips_directory_and_extension(self):
+        assert image_id("staff/EMP001.jpg") == "EMP001"
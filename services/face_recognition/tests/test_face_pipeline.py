@@ -0,0 +1,245 @@
+"""
+Tests for the single-pass face pipeline (no model or detector weights needed).
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from ..core import pipeline as pipeline_module
+from ..core.pipeline import FacePipeline, STAGES
+from ..core.quality import QualityGate
+
+
+def _jpeg(shape=(240, 320, 3)):
+    image = np.random.randint(0, 255, shape, dtype=np.uint8)
+    ok, buffer = cv2.imencode('.jpg', image)
+    assert ok
+    return buffer.tobytes()
+
+
+@pytest.fixture
+def detect_calls(monkeypatch):
+    calls = []
+
+    def fake_detect(image, device_id=None):
+        calls.append(image)
+        return (80, 60, 160, 120)
+
+    monkeypatch.setattr(pipeline_module, 'detect_face', fake_detect)
+    return calls
+
+
+class TestFacePipeline:
+    def test_detects_once_on_original_frame(self, detect_calls):
+        faces = []
+        pipeline = FacePipeline(lambda face: faces.append(face) or np.ones(4))
+
+        result = pipeline.run(_jpeg())
+
+        assert result.ok
+        assert len(detect_calls) == 1
+        # Detection sees the decoded frame, not a resized/normalized copy
+        assert detect_calls[0].shape == (240, 320, 3)
+        assert detect_calls[0].dtype == np.uint8
+        assert result.box == (80, 60, 160, 120)
+        assert faces[0].shape == (112, 112, 3)
+        assert faces[0].min() >= -1.0 and faces[0].max() <= 1.0
+
+    def test_times_every_stage(self, detect_calls):
+        pipeline = FacePipeline(lambda face: np.ones(4), quality_gate=QualityGate())
+
+        result = pipeline.run(_jpeg())
+
+        assert tuple(result.timings) == STAGES
+        assert all(ms >= 0 for ms in result.timings.values())
+        assert result.server_timing().startswith('decode;dur=')
+        assert pipeline.stats()['runs'] == 1
+
+    def test_reports_failing_stage(self, monkeypatch):
+        monkeypatch.setattr(pipeline_module, 'detect_face', lambda image, device_id=None: None)
+        pipeline = FacePipeline(lambda face: np.ones(4))
+
+        result = pipeline.run(_jpeg())
+
+        assert not result.ok
+        assert result.status == 400
+        assert result.error == "Face not detected"
+        assert 'infer' not in result.timings
+        assert pipeline.stats()['runs'] == 0
+
+    def test_undecodable_bytes(self, detect_calls):
+        result = FacePipeline(lambda face: np.ones(4)).run(b'not an image')
+
+        assert result.error == "Failed to decode image data"
+        assert detect_calls == []
+
+    def test_quality_gate_rejects_dark_frame_before_detection(self, detect_calls):
+        inferred = []
+        pipeline = FacePipeline(lambda face: inferred.append(face) or np.ones(4),
+                                quality_gate=QualityGate())
+
+        dark = np.random.randint(0, 20, (240, 320, 3), dtype=np.uint8)
+        result = pipeline.run(cv2.imencode('.jpg', dark)[1].tobytes())
+
+        assert not result.ok
+        assert result.rejected_by == 'too_dark'
+        assert result.error_body()['quality_gate'] == 'too_dark'
+        assert result.quality['brightness'] < 40
+        assert detect_calls == [] and inferred == []
+        assert pipeline.stats()['quality_rejections']['too_dark'] == 1
+
+    def test_quality_gate_rejects_small_face_before_inference(self, monkeypatch):
+        monkeypatch.setattr(pipeline_module, 'detect_face',
+                            lambda image, device_id=None: (10, 10, 30, 30))
+        inferred = []
+        pipeline = FacePipeline(lambda face: inferred.append(face) or np.ones(4),
+                                quality_gate=QualityGate(min_face_size=40))
+
+        result = pipeline.run(_jpeg())
+
+        assert result.rejected_by == 'face_too_small'
+        assert result.quality['face_size'] == 20
+        assert inferred == []
+
+
+class TestKnownFaceLocation:
+    @staticmethod
+    def _png_with_patch(box, shape=(240, 320, 3)):
+        image = np.zeros(shape, dtype=np.uint8)
+        x1, y1, x2, y2 = box
+        image[y1:y2, x1:x2] = 255
+        return cv2.imencode('.png', image)[1].tobytes()
+
+    def test_box_skips_detection_and_crops_the_box(self, detect_calls):
+        faces = []
+        pipeline = FacePipeline(lambda face: faces.append(face.copy()) or np.ones(4))
+
+        result = pipeline.run(self._png_with_patch((100, 50, 200, 150)), box=[100, 50, 200, 150])
+
+        assert result.ok and result.mode == 'box'
+        assert detect_calls == []
+        assert 'detect' not in result.timings
+        assert result.box == (100, 50, 200, 150)
+        # Only the white patch was cropped
+        assert faces[0].min() == pytest.approx((255 - 127.5) / 128)
+
+    def test_box_is_clipped_to_the_image(self, detect_calls):
+        result = FacePipeline(lambda face: np.ones(4)).run(_jpeg(), box=(250, 150, 400, 300))
+
+        assert result.ok
+        assert result.box == (250, 150, 320, 240)
+
+    def test_box_decodes_only_the_resolution_the_face_needs(self, monkeypatch, detect_calls):
+        factors = []
+        decode = pipeline_module.decode_image
+        monkeypatch.setattr(pipeline_module, 'decode_image',
+                            lambda data, factor=1: factors.append(factor) or decode(data, factor))
+        pipeline = FacePipeline(lambda face: np.ones(4), detect_min_side=300, face_size=112)
+
+        result = pipeline.run(_jpeg((1200, 1600, 3)), box=(400, 300, 1000, 900))
+
+        # A 600 px face still spans 150 px at 1/4 scale (but only 75 at 1/8)
+        assert factors == [4]
+        assert result.box == (400, 300, 1000, 900)
+
+    def test_cropped_image_goes_straight_to_preprocessing(self, detect_calls):
+        faces = []
+        pipeline = FacePipeline(lambda face: faces.append(face) or np.ones(4),
+                                quality_gate=QualityGate())
+
+        result = pipeline.run(_jpeg((150, 120, 3)), cropped=True)
+
+        assert result.ok and result.mode == 'crop'
+        assert detect_calls == []
+        assert result.box == (0, 0, 120, 150)
+        assert tuple(result.timings) == ('decode', 'quality', 'preprocess', 'infer')
+        assert faces[0].shape == (112, 112, 3)
+
+    @pytest.mark.parametrize('box, error', [
+        ([10, 10, 5, 50], "Invalid face box"),
+        ([10, 10, 50], "Invalid face box"),
+        (['a', 1, 2, 3], "Invalid face box"),
+        ([400, 300, 500, 400], "Face box lies outside the image"),
+    ])
+    def test_rejects_bad_boxes(self, box, error, detect_calls):
+        result = FacePipeline(lambda face: np.ones(4)).run(_jpeg(), box=box)
+
+        assert not result.ok
+        assert result.status == 400
+        assert result.error == error
+
+    def test_stats_are_split_by_mode(self, detect_calls):
+        pipeline = FacePipeline(lambda face: np.ones(4))
+
+        pipeline.run(_jpeg())
+        pipeline.run(_jpeg(), box=(10, 10, 100, 100))
+        pipeline.run(_jpeg(), box=(10, 10, 100, 100))
+        pipeline.run(_jpeg(), cropped=True)
+
+        stats = pipeline.stats()
+        assert stats['runs'] == 4
+        assert {mode: s['runs'] for mode, s in stats['modes'].items()} == \
+            {'detect': 1, 'box': 2, 'crop': 1, 'burst': 0}
+        assert stats['modes']['detect']['mean_stage_ms']['detect'] > 0
+        assert stats['modes']['box']['mean_stage_ms']['detect'] == 0
+        assert stats['modes']['crop']['mean_stage_ms']['crop'] == 0
+
+
+class TestBurst:
+    @staticmethod
+    def _frames():
+        image = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        blurred = cv2.GaussianBlur(image, (0, 0), 2)
+        encode = lambda frame: cv2.imencode('.png', frame)[1].tobytes()
+        return [encode(blurred), encode(image), encode(blurred)]
+
+    def test_embeds_only_the_sharpest_frame(self, detect_calls):
+        faces = []
+        pipeline = FacePipeline(lambda face: faces.append(face.copy()) or np.ones(4))
+
+        result = pipeline.run_best(self._frames())
+
+        assert result.ok and result.mode == 'burst'
+        assert result.frame == 1
+        assert len(faces) == 1
+        assert len(detect_calls) == 3
+        assert result.box == (80, 60, 160, 120)
+        scores = [s["score"] for s in result.frame_scores]
+        assert scores[1] == max(scores)
+        assert result.frame_scores[1]["sharpness"] > result.frame_scores[0]["sharpness"]
+        assert 'select' in result.timings
+        assert pipeline.stats()['modes']['burst']['runs'] == 1
+
+    def test_unusable_frames_are_skipped(self, detect_calls):
+        frames = [b'not an image'] + self._frames()[:1]
+
+        result = FacePipeline(lambda face: np.ones(4)).run_best(frames)
+
+        assert result.ok
+        assert result.frame == 1
+        assert result.frame_scores[0] is None
+
+    def test_quality_gate_drops_frames_before_detection(self, detect_calls):
+        dark = cv2.imencode('.jpg', np.zeros((240, 320, 3), dtype=np.uint8))[1].tobytes()
+        pipeline = FacePipeline(lambda face: np.ones(4), quality_gate=QualityGate(min_sharpness=0))
+
+        result = pipeline.run_best([dark, self._frames()[1]])
+
+        assert result.frame == 1
+        assert len(detect_calls) == 1
+
+    def test_fails_with_first_rejection_when_no_frame_is_usable(self, detect_calls):
+        dark = cv2.imencode('.jpg', np.zeros((240, 320, 3), dtype=np.uint8))[1].tobytes()
+        pipeline = FacePipeline(lambda face: np.ones(4), quality_gate=QualityGate())
+
+        result = pipeline.run_best([dark, dark])
+
+        assert not result.ok
+        assert result.rejected_by == 'too_dark'
+        assert detect_calls == []
+
+    def test_no_frames(self):
+        result = FacePipeline(lambda face: np.ones(4)).run_best([])
+
+        assert result.error == "No frames provided"
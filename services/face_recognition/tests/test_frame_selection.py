@@ -0,0 +1,60 @@
+"""
+Tests for burst best-frame scoring.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from ..core.frame_selection import face_patches, score_frames, sharpness
+
+
+def _textured(seed=0, shape=(120, 120, 3)):
+    return np.random.default_rng(seed).integers(0, 255, shape, dtype=np.uint8)
+
+
+class TestFrameSelection:
+    def test_sharpness_drops_with_blur(self):
+        image = _textured()
+        images = [cv2.GaussianBlur(image, (0, 0), sigma) if sigma else image
+                  for sigma in (0, 1, 3)]
+
+        values = sharpness(face_patches(images, [(0, 0, 120, 120)] * 3))
+
+        assert values[0] > values[1] > values[2]
+
+    def test_patches_are_fixed_size_grayscale(self):
+        patches = face_patches([_textured(), _textured(1, (300, 200, 3))],
+                               [(10, 10, 60, 90), (0, 0, 200, 300)], size=32)
+
+        assert patches.shape == (2, 32, 32)
+        assert patches.dtype == np.float32
+
+    def test_score_combines_normalized_features(self):
+        patches = face_patches([_textured()] * 2, [(0, 0, 120, 120)] * 2)
+
+        scores, features = score_frames(patches, face_sizes=[100, 50], confidences=[0.5, 1.0])
+
+        # Equal sharpness (0.5 each); size 0.25 vs 0.125; confidence 0.125 vs 0.25
+        assert scores == pytest.approx([0.875, 0.875])
+        assert features["face_size"].tolist() == [100, 50]
+
+    def test_weights_change_the_winner(self):
+        image = _textured()
+        patches = face_patches([image, cv2.GaussianBlur(image, (0, 0), 2)], [(0, 0, 120, 120)] * 2)
+        sizes, confidences = [60, 120], [0.9, 0.9]
+
+        default, _ = score_frames(patches, sizes, confidences)
+        size_only, _ = score_frames(patches, sizes, confidences,
+                                    weights={"sharpness": 0.0, "face_size": 1.0})
+
+        assert default.argmax() == 0
+        assert size_only.argmax() == 1
+
+    def test_flat_patches_score_zero_sharpness(self):
+        patches = np.zeros((2, 16, 16), dtype=np.float32)
+
+        scores, features = score_frames(patches, [0, 0], [0, 0])
+
+        assert features["sharpness"].tolist() == [0, 0]
+        assert scores.tolist() == [0, 0]
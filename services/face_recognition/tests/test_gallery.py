@@ -0,0 +1,127 @@
+"""
+Tests for the in-memory identification gallery.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ..core.ann_index import IVFIndex
+from ..core.gallery import FaceGallery
+
+
+def _embeddings(n, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+class TestFaceGallery:
+    def test_identify_returns_top_k_by_cosine_similarity(self):
+        gallery = FaceGallery(dim=8)
+        vectors = _embeddings(50)
+        for i, vector in enumerate(vectors):
+            gallery.add(f"emp-{i}", vector * (i + 1), name=f"Employee {i}")
+
+        matches = gallery.identify(vectors[7], k=3)
+
+        assert [m['employee_id'] for m in matches][0] == "emp-7"
+        assert matches[0]['name'] == "Employee 7"
+        assert matches[0]['similarity'] == pytest.approx(1.0, abs=1e-5)
+        similarities = [m['similarity'] for m in matches]
+        assert similarities == sorted(similarities, reverse=True)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ normalized[7]))[:3]
+        assert [m['employee_id'] for m in matches] == [f"emp-{i}" for i in expected]
+
+    def test_threshold_filters_matches(self):
+        gallery = FaceGallery(dim=2)
+        gallery.add("a", [1.0, 0.0])
+        gallery.add("b", [0.0, 1.0])
+
+        assert [m['employee_id'] for m in gallery.identify([1.0, 0.1], k=2, threshold=0.5)] == ["a"]
+
+    def test_add_replaces_and_remove_keeps_matrix_dense(self):
+        gallery = FaceGallery(dim=2)
+        gallery.add("a", [1.0, 0.0])
+        gallery.add("b", [0.0, 1.0])
+        gallery.add("c", [-1.0, 0.0])
+        gallery.add("a", [0.0, -1.0])  # re-enroll
+
+        assert len(gallery) == 3
+        assert gallery.identify([0.0, -1.0], k=1)[0]['employee_id'] == "a"
+
+        assert gallery.remove("a")
+        assert not gallery.remove("a")
+        assert len(gallery) == 2
+        assert gallery.identify([-1.0, 0.0], k=1)[0]['employee_id'] == "c"
+        assert gallery.identify([0.0, 1.0], k=1)[0]['employee_id'] == "b"
+
+    def test_grows_past_initial_capacity(self):
+        gallery = FaceGallery(dim=8)
+        vectors = _embeddings(600)
+        for i, vector in enumerate(vectors):
+            gallery.add(str(i), vector)
+
+        assert len(gallery) == 600
+        assert gallery.identify(vectors[599], k=1)[0]['employee_id'] == "599"
+
+    def test_rejects_bad_embeddings(self):
+        gallery = FaceGallery(dim=4)
+        with pytest.raises(ValueError):
+            gallery.add("a", [1.0, 0.0])
+        with pytest.raises(ValueError):
+            gallery.add("a", [0.0, 0.0, 0.0, 0.0])
+
+    def test_snapshot_is_shared_between_instances(self, tmp_path):
+        path = tmp_path / "gallery.npz"
+        worker_a = FaceGallery(dim=2, path=path)
+        worker_b = FaceGallery(dim=2, path=path)
+
+        worker_a.add("a", [1.0, 0.0], name="Alice")
+        worker_b.add("b", [0.0, 1.0])
+
+        # Each instance sees the other's changes
+        assert worker_a.identify([0.0, 1.0], k=1)[0]['employee_id'] == "b"
+        assert worker_b.identify([1.0, 0.0], k=1)[0]['name'] == "Alice"
+
+        worker_a.replace_all([("c", [1.0, 1.0], None)])
+        assert len(worker_b) == 1
+        assert FaceGallery(dim=2, path=path).identify([1.0, 1.0], k=1)[0]['employee_id'] == "c"
+
+    def test_ivf_index_tracks_adds_and_removes(self):
+        gallery = FaceGallery(dim=16, index='ivf', nprobe=64, ivf_min_size=100)
+        vectors = _embeddings(300, dim=16)
+        for i, vector in enumerate(vectors):
+            gallery.add(str(i), vector)
+        assert gallery.stats()['index']['type'] == 'ivf'
+
+        assert gallery.identify(vectors[123], k=1)[0]['employee_id'] == "123"
+        gallery.remove("0")  # moves the last row into row 0
+        assert gallery.identify(vectors[299], k=1)[0]['employee_id'] == "299"
+        assert "0" not in [m['employee_id'] for m in gallery.identify(vectors[0], k=5)]
+
+        # Shrinking below the minimum size falls back to exact search
+        gallery.replace_all([("a", vectors[0], None)])
+        assert gallery.stats()['index'] == {"type": "flat"}
+        assert gallery.identify(vectors[0], k=1)[0]['employee_id'] == "a"
+
+    def test_snapshot_reload_reuses_ivf_clusters(self, tmp_path):
+        path = tmp_path / "gallery.npz"
+        vectors = _embeddings(301, dim=16)
+        worker_a = FaceGallery(dim=16, path=path, index='ivf', nprobe=64, ivf_min_size=100)
+        worker_a.replace_all((str(i), v, None) for i, v in enumerate(vectors[:300]))
+
+        with patch.object(IVFIndex, 'build', side_effect=AssertionError("retrained")):
+            worker_b = FaceGallery(dim=16, path=path, index='ivf', nprobe=64, ivf_min_size=100)
+            assert worker_b.stats()['index']['type'] == 'ivf'
+            worker_a.add("new", vectors[300])
+            assert worker_b.identify(vectors[300], k=1)[0]['employee_id'] == "new"
+            worker_b.remove("7")
+            assert "7" not in [m['employee_id'] for m in worker_a.identify(vectors[7], k=5)]
+
+        np.testing.assert_array_equal(worker_a._ann.centroids, worker_b._ann.centroids)
+
+    def test_unknown_index_type(self):
+        with pytest.raises(ValueError):
+            FaceGallery(dim=4, index='hnsw')
@@ -0,0 +1,60 @@
+"""
+Tests for lazy, thread-safe model loading.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ..service.model_loader import ModelLoader, NOT_LOADED, READY, FAILED
+
+
+class TestModelLoader:
+    def test_loads_once_for_concurrent_callers(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'model'
+
+        loader = ModelLoader(load)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(loader.get()))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == [1]
+        assert results == ['model'] * 8
+
+    def test_not_ready_until_warmed_up(self):
+        release = threading.Event()
+        loader = ModelLoader(lambda: 'model', warmup_fn=lambda model: release.wait(5))
+        assert loader.status()['state'] == NOT_LOADED
+
+        loader.start(background=True)
+        time.sleep(0.05)
+        assert not loader.ready
+        assert loader.status()['state'] == 'warming_up'
+
+        release.set()
+        assert loader.get(timeout=5) == 'model'
+        status = loader.status()
+        assert status['state'] == READY
+        assert status['load_seconds'] is not None
+        assert status['warmup_seconds'] is not None
+
+    def test_failure_is_reported(self):
+        def load():
+            raise IOError("model file missing")
+
+        loader = ModelLoader(load)
+
+        with pytest.raises(RuntimeError, match="model file missing"):
+            loader.get()
+        assert loader.status()['state'] == FAILED
+        assert not loader.ready
@@ -116,6 +116,21 @@ class TestPreprocessing(unittest.TestCase):
             # Ensure processing time is reasonable (less than 1 second)
             self.assertLess(processing_time, 1.0)
 
+    def test_preprocess_into_buffer(self):
+        """The fused normalize matches (x - 127.5) / 128 and writes into out."""
+        face = np.random.default_rng(0).integers(0, 255, (150, 130, 3), dtype=np.uint8)
+        expected = (cv2.resize(cv2.cvtColor(face, cv2.COLOR_BGR2RGB), (112, 112))
+                    .astype(np.float32) - 127.5) / 128.0
+
+        batch = np.zeros((2, 112, 112, 3), dtype=np.float32)
+        result = preprocess_image(face, out=batch[1])
+
+        self.assertTrue(np.shares_memory(result, batch))
+        np.testing.assert_allclose(batch[1], expected, atol=1e-6)
+        self.assertFalse(batch[0].any())
+        # A buffer of the wrong shape is reported, not silently replaced
+        self.assertIsNone(preprocess_image(face, out=np.empty((2, 2), np.float32)))
+
 
 if __name__ == '__main__':
     unittest.main()
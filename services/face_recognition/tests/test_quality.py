@@ -0,0 +1,50 @@
+"""
+Tests for the image quality gate.
+"""
+
+import cv2
+import numpy as np
+
+from ..core.quality import QualityGate
+
+
+def _textured(shape=(480, 640, 3), seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(40, 215, shape, dtype=np.uint8)
+
+
+class TestQualityGate:
+    def test_sharp_textured_frame_passes(self):
+        report = QualityGate().check_frame(_textured())
+
+        assert report.passed
+        assert report.gate is None
+        assert set(report.metrics) == {"brightness", "contrast", "sharpness"}
+
+    def test_each_frame_gate(self):
+        gate = QualityGate()
+
+        assert gate.check_frame(np.full((480, 640, 3), 5, np.uint8)).gate == 'too_dark'
+        assert gate.check_frame(np.full((480, 640, 3), 250, np.uint8)).gate == 'too_bright'
+        assert gate.check_frame(np.full((480, 640, 3), 128, np.uint8)).gate == 'low_contrast'
+
+        # Smooth gradient: plenty of contrast, no detail
+        ramp = np.tile(np.linspace(30, 220, 640, dtype=np.float32), (480, 1))
+        blurred = cv2.GaussianBlur(ramp, (0, 0), 5).astype(np.uint8)
+        assert gate.check_frame(blurred).gate == 'blurry'
+
+    def test_large_frames_are_downsampled(self):
+        full = _textured((2160, 3840, 3))
+        report = QualityGate().check_frame(full)
+
+        assert report.passed
+        assert abs(report.metrics["brightness"] - full.mean()) < 2
+
+    def test_face_size(self):
+        gate = QualityGate(min_face_size=40)
+
+        assert gate.check_face((0, 0, 100, 39)).gate == 'face_too_small'
+        assert gate.check_face((0, 0, 40, 40)).passed
+        # An earlier failure is kept
+        report = gate.check_frame(np.zeros((100, 100, 3), np.uint8))
+        assert gate.check_face((0, 0, 10, 10), report).gate == 'too_dark'
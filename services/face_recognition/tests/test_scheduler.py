@@ -0,0 +1,95 @@
+"""
+Test suite for the dynamic micro-batching inference scheduler.
+"""
+
+import threading
+import time
+import numpy as np
+import pytest
+from ..service.scheduler import InferenceScheduler
+
+
+def fake_model(batch):
+    """Stand-in for the embedding model: one 4-d vector per face."""
+    return batch.reshape(len(batch), -1)[:, :4] * 2
+
+
+class TestInferenceScheduler:
+    @pytest.fixture
+    def recorded_batches(self):
+        return []
+
+    @pytest.fixture
+    def scheduler(self, recorded_batches):
+        def infer(batch):
+            recorded_batches.append(len(batch))
+            time.sleep(0.01)  # Let other requests queue up behind this batch
+            return fake_model(batch)
+
+        scheduler = InferenceScheduler(infer, max_batch_size=8, max_wait_ms=20)
+        scheduler.start()
+        yield scheduler
+        scheduler.stop(timeout=1)
+
+    def test_single_request(self, scheduler):
+        """A lone face is served after at most max_wait."""
+        face = np.full((2, 2, 1), 3.0, dtype=np.float32)
+        embedding = scheduler.embed(face, timeout=1)
+        assert np.array_equal(embedding, np.full(4, 6.0, dtype=np.float32))
+
+    def test_concurrent_requests_are_batched(self, scheduler, recorded_batches):
+        """Concurrent faces share batches and each caller gets its own result."""
+        results = {}
+
+        def worker(i):
+            face = np.full((2, 2, 1), float(i), dtype=np.float32)
+            results[i] = scheduler.embed(face, timeout=2)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for i in range(20):
+            assert np.array_equal(results[i], np.full(4, 2.0 * i))
+        assert sum(recorded_batches) == 20
+        assert max(recorded_batches) <= 8
+        assert len(recorded_batches) < 20
+
+        stats = scheduler.stats()
+        assert stats["requests"] == 20
+        assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+    def test_inference_error_propagates(self):
+        """A failing model call fails every request in the batch."""
+        def broken(batch):
+            raise RuntimeError("model exploded")
+
+        scheduler = InferenceScheduler(broken, max_batch_size=4, max_wait_ms=1)
+        scheduler.start()
+        try:
+            with pytest.raises(RuntimeError):
+                scheduler.embed(np.zeros((2, 2, 1), dtype=np.float32), timeout=1)
+        finally:
+            scheduler.stop(timeout=1)
+
+    def test_batch_tensor_is_reused(self):
+        """Batches are assembled in one preallocated tensor, not a new np.stack."""
+        seen = []
+
+        def infer(batch):
+            seen.append(batch)
+            return fake_model(batch)
+
+        scheduler = InferenceScheduler(infer, max_batch_size=4, max_wait_ms=1)
+        scheduler.start()
+        try:
+            for value in (1.0, 2.0):
+                face = np.full((2, 2, 1), value, dtype=np.float32)
+                assert np.array_equal(scheduler.embed(face, timeout=1), np.full(4, 2 * value))
+        finally:
+            scheduler.stop(timeout=1)
+
+        assert len(seen) == 2
+        assert np.shares_memory(seen[0], seen[1])
@@ -0,0 +1,133 @@
+"""
+Tests for shadow-model evaluation.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ..service.shadow import ShadowEvaluator
+
+
+class _Model:
+    """Stand-in embedding model: a fixed linear map of the flattened face."""
+
+    def __init__(self, weights, delay=0.0, release=None):
+        self.weights = weights
+        self.delay = delay
+        self.release = release
+
+    def embed_batch(self, faces):
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        return faces.reshape(len(faces), -1) @ self.weights
+
+
+def _wait_for(evaluator, completed, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        summary = evaluator.summary()
+        if summary["completed"] + summary["errors"] >= completed:
+            return summary
+        time.sleep(0.01)
+    raise AssertionError(f"Shadow evaluator did not complete {completed} samples")
+
+
+FACE_SHAPE = (4, 4, 1)
+WEIGHTS = np.random.default_rng(0).normal(size=(16, 8)).astype(np.float32)
+
+
+def _face(seed):
+    return np.random.default_rng(seed).normal(size=FACE_SHAPE).astype(np.float32)
+
+
+def _primary(face):
+    return face.reshape(-1) @ WEIGHTS
+
+
+class TestShadowEvaluator:
+    def test_records_latency_similarity_and_decisions(self):
+        stored = {"alice": _primary(_face(1))}
+        evaluator = ShadowEvaluator(
+            lambda: _Model(WEIGHTS, delay=0.002), sample_rate=1.0, threshold=0.9,
+            reference_fn=lambda employee_id, embedding: stored.get(employee_id))
+
+        face = _face(1)
+        for _ in range(3):
+            assert evaluator.submit(face, _primary(face), primary_ms=1.0, employee_id="alice")
+        summary = _wait_for(evaluator, 3)
+
+        assert summary["sampled"] == 3 and summary["completed"] == 3
+        assert summary["embedding_similarity"]["min"] == pytest.approx(1.0, abs=1e-5)
+        assert summary["latency_ms"]["primary"]["p50"] == pytest.approx(1.0)
+        assert summary["latency_ms"]["shadow"]["p50"] >= 2.0
+        assert summary["decisions"]["compared"] == 3
+        assert summary["decisions"]["both_match"] == 3
+        assert summary["decisions"]["agreement"] == 1.0
+
+    def test_disagreement_is_counted_by_side(self):
+        stored = _primary(_face(1))
+        # The shadow model maps every face to the opposite direction
+        evaluator = ShadowEvaluator(
+            lambda: _Model(-WEIGHTS), sample_rate=1.0, threshold=0.9,
+            reference_fn=lambda employee_id, embedding: stored)
+
+        face = _face(1)
+        evaluator.submit(face, _primary(face), primary_ms=1.0)
+        summary = _wait_for(evaluator, 1)
+
+        assert summary["decisions"]["primary_only"] == 1
+        assert summary["decisions"]["agreement"] == 0.0
+        assert summary["embedding_similarity"]["min"] == pytest.approx(-1.0, abs=1e-5)
+
+    def test_no_reference_skips_decision_comparison(self):
+        evaluator = ShadowEvaluator(lambda: _Model(WEIGHTS), sample_rate=1.0,
+                                    reference_fn=lambda employee_id, embedding: None)
+
+        face = _face(2)
+        evaluator.submit(face, _primary(face), primary_ms=1.0)
+        summary = _wait_for(evaluator, 1)
+
+        assert summary["completed"] == 1
+        assert summary["decisions"]["compared"] == 0
+        assert summary["decisions"]["agreement"] is None
+
+    def test_sample_rate_zero_never_queues(self):
+        evaluator = ShadowEvaluator(lambda: _Model(WEIGHTS), sample_rate=0.0)
+
+        assert not evaluator.submit(_face(0), np.ones(8), primary_ms=1.0)
+        assert evaluator.summary()["sampled"] == 0
+
+    def test_submit_copies_face_and_never_blocks(self):
+        release = threading.Event()
+        evaluator = ShadowEvaluator(lambda: _Model(WEIGHTS, release=release),
+                                    sample_rate=1.0, max_queue=2)
+        buffer = _face(3)
+        expected = _primary(buffer)
+
+        start = time.perf_counter()
+        results = [evaluator.submit(buffer, expected, primary_ms=1.0) for _ in range(10)]
+        elapsed = time.perf_counter() - start
+        buffer[...] = 0  # the caller reuses its buffer right away
+        release.set()
+        summary = _wait_for(evaluator, sum(results))
+
+        assert elapsed < 0.5
+        # The worker holds at most one sample while max_queue more wait
+        assert 2 <= sum(results) <= 3
+        assert summary["dropped"] == 10 - sum(results)
+        assert summary["embedding_similarity"]["min"] == pytest.approx(1.0, abs=1e-5)
+
+    def test_model_load_failure_counts_errors(self):
+        def fail():
+            raise RuntimeError("missing model")
+
+        evaluator = ShadowEvaluator(fail, sample_rate=1.0)
+        evaluator.submit(_face(0), np.ones(8), primary_ms=1.0)
+        summary = _wait_for(evaluator, 1)
+
+        assert summary["errors"] == 1
+        assert summary["model"]["state"] == "failed"
@@ -0,0 +1,38 @@
+"""
+Tests for the worker CPU split in config/threading_config.py.
+"""
+
+import pytest
+
+from ..config import threading_config
+
+
+@pytest.fixture
+def eight_cpus(monkeypatch):
+    monkeypatch.setattr(threading_config.os, 'sched_getaffinity',
+                        lambda pid: set(range(8)))
+    monkeypatch.setattr(threading_config, 'CPU_AFFINITY', 'auto')
+
+
+def test_workers_get_disjoint_cpu_slices(eight_cpus):
+    slices = [threading_config.worker_cpus(slot, 4) for slot in range(4)]
+
+    assert slices == [[0, 1], [2, 3], [4, 5], [6, 7]]
+
+
+def test_more_workers_than_cpus_share_round_robin(eight_cpus):
+    assert threading_config.worker_cpus(9, 12) == [1]
+
+
+def test_affinity_disabled_by_default(eight_cpus, monkeypatch):
+    monkeypatch.setattr(threading_config, 'CPU_AFFINITY', 'none')
+
+    assert threading_config.worker_cpus(0, 4) is None
+
+
+def test_cpu_share_divides_available_cpus(monkeypatch):
+    monkeypatch.setattr(threading_config, 'available_cpus', lambda: 8)
+
+    assert threading_config.cpu_share(1) == 8
+    assert threading_config.cpu_share(3) == 2
+    assert threading_config.cpu_share(16) == 1
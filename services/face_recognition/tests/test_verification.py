@@ -0,0 +1,69 @@
+"""
+Tests for pairwise and batch face verification.
+"""
+
+import numpy as np
+import pytest
+
+from ..core.verification import FaceVerifier, normalize_rows
+
+
+def _embeddings(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+class TestFaceVerifier:
+    def test_verify_faces_normalizes_inputs(self):
+        verifier = FaceVerifier(threshold=0.9)
+        embedding = _embeddings(1)[0]
+
+        is_match, similarity = verifier.verify_faces(embedding, embedding * 7.5)
+
+        assert is_match
+        assert similarity == pytest.approx(1.0, abs=1e-5)
+
+    def test_similarity_matrix_matches_pairwise_cosine(self):
+        verifier = FaceVerifier()
+        queries, references = _embeddings(4), _embeddings(6, seed=1)
+
+        matrix = verifier.similarity_matrix(queries, references)
+
+        assert matrix.shape == (4, 6)
+        for i, query in enumerate(queries):
+            for j, reference in enumerate(references):
+                expected = query @ reference / (np.linalg.norm(query) * np.linalg.norm(reference))
+                assert matrix[i, j] == pytest.approx(expected, abs=1e-5)
+
+    def test_verify_batch_reports_best_reference_per_query(self):
+        verifier = FaceVerifier(threshold=0.95)
+        references = _embeddings(10)
+        queries = np.vstack([references[3] * 2, references[8], _embeddings(1, seed=5)[0]])
+
+        result = verifier.verify_batch(queries, references)
+
+        assert result['best_index'][:2].tolist() == [3, 8]
+        assert result['best_similarity'][:2] == pytest.approx([1.0, 1.0], abs=1e-5)
+        assert result['is_match'].tolist() == [True, True, False]
+        assert result['similarities'].shape == (3, 10)
+
+    def test_prenormalized_references_are_used_as_given(self):
+        verifier = FaceVerifier()
+        references = normalize_rows(_embeddings(5))
+        queries = normalize_rows(_embeddings(2, seed=3))
+
+        matrix = verifier.similarity_matrix(queries, references, normalized=True)
+
+        np.testing.assert_allclose(matrix, queries @ references.T, atol=1e-6)
+
+    def test_zero_embedding_has_zero_similarity(self):
+        matrix = FaceVerifier().similarity_matrix(np.zeros(16), _embeddings(3))
+
+        np.testing.assert_array_equal(matrix, np.zeros((1, 3)))
+
+    def test_mismatched_dimensions_raise(self):
+        with pytest.raises(ValueError):
+            FaceVerifier().verify_batch(_embeddings(2, dim=8), _embeddings(2, dim=16))
+
+    def test_empty_references_raise(self):
+        with pytest.raises(ValueError):
+            FaceVerifier().verify_batch(_embeddings(2), np.empty((0, 16)))
@@ -0,0 +1,6 @@
+"""
+Offline tooling for the face recognition models (export, evaluation).
+
+Run from the repository root, e.g.:
+    python -m services.face_recognition.tools.export_model --format tflite
+"""
@@ -0,0 +1,131 @@
+"""
+Accuracy-vs-latency report for an exported model against the float Keras model.
+
+For every image in TEST_IMAGES_DIR the face is extracted once and embedded by
+both models. The report gives:
+- cosine similarity between the float and candidate embedding of each image
+- verification agreement: over all image pairs, how often the candidate makes
+  the same match / no-match decision as the float model at VERIFICATION_THRESHOLD
+- per-image latency of both models (batch of one)
+
+    python -m services.face_recognition.tools.compare_backends \
+        --candidate services/face_recognition/core/models/ghostfacenets_int8.tflite
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+
+from ..config.model_config import VERIFICATION_THRESHOLD
+from ..config.paths import MODEL_PATH, TEST_IMAGES_DIR
+from ..core.embedding import FaceEmbedding
+from ..core.preprocessing import preprocess_image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def load_faces(image_dir, extractor: FaceEmbedding, detect: bool = True):
+    """Preprocessed faces (N, H, W, C) and their file names."""
+    names, faces = [], []
+    for name in sorted(os.listdir(image_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(image_dir, name), cv2.IMREAD_COLOR)
+        if image is None:
+            continue
+        face = extractor.extract_face(image) if detect else preprocess_image(image)
+        if face is None:
+            logger.warning(f"Skipping {name}: no face extracted")
+            continue
+        names.append(name)
+        faces.append(face)
+    return names, np.stack(faces) if faces else np.empty((0,))
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _latency_ms(embedder: FaceEmbedding, faces: np.ndarray, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        for face in faces:
+            start = time.perf_counter()
+            embedder.embed_batch(face[np.newaxis])
+            samples.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(samples))
+
+
+def compare(reference: FaceEmbedding, candidate: FaceEmbedding, faces: np.ndarray,
+            threshold: float = VERIFICATION_THRESHOLD, repeats: int = 5) -> dict:
+    """Compare candidate embeddings with the reference model on the same faces."""
+    ref = _normalize(reference.embed_batch(faces).astype(np.float32))
+    cand = _normalize(candidate.embed_batch(faces).astype(np.float32))
+
+    per_image_cosine = np.sum(ref * cand, axis=1)
+
+    # Match decisions over all distinct pairs
+    upper = np.triu_indices(len(faces), k=1)
+    ref_decisions = (ref @ ref.T)[upper] >= threshold
+    cand_decisions = (cand @ cand.T)[upper] >= threshold
+    agreement = float(np.mean(ref_decisions == cand_decisions)) if len(ref_decisions) else 1.0
+
+    return {
+        "images": int(len(faces)),
+        "cosine_mean": float(per_image_cosine.mean()),
+        "cosine_min": float(per_image_cosine.min()),
+        "pairs": int(len(ref_decisions)),
+        "threshold": threshold,
+        "verification_agreement": agreement,
+        "reference_latency_ms": _latency_ms(reference, faces, repeats),
+        "candidate_latency_ms": _latency_ms(candidate, faces, repeats),
+        "per_image_cosine": per_image_cosine.round(6).tolist(),
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reference", default=str(MODEL_PATH),
+                        help="Float Keras model")
+    parser.add_argument("--candidate", required=True,
+                        help="Exported model (.tflite / .onnx)")
+    parser.add_argument("--images", default=str(TEST_IMAGES_DIR))
+    parser.add_argument("--threshold", type=float, default=VERIFICATION_THRESHOLD)
+    parser.add_argument("--no-detect", action="store_true",
+                        help="Embed whole images instead of detected faces")
+    parser.add_argument("--json", help="Write the report as JSON here")
+    args = parser.parse_args()
+
+    reference = FaceEmbedding(args.reference)
+    candidate = FaceEmbedding(args.candidate)
+    names, faces = load_faces(args.images, reference, detect=not args.no_detect)
+    if not names:
+        parser.error(f"No usable face images in {args.images}")
+
+    report = compare(reference, candidate, faces, threshold=args.threshold)
+    report["files"] = names
+    report["candidate"] = args.candidate
+
+    print(f"Images: {report['images']}   pairs: {report['pairs']}")
+    print(f"Embedding cosine (float vs candidate): mean={report['cosine_mean']:.4f} "
+          f"min={report['cosine_min']:.4f}")
+    print(f"Verification agreement @ {args.threshold}: {report['verification_agreement'] * 100:.1f}%")
+    print(f"Latency per image: float={report['reference_latency_ms']:.2f} ms  "
+          f"candidate={report['candidate_latency_ms']:.2f} ms  "
+          f"({report['reference_latency_ms'] / report['candidate_latency_ms']:.2f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Export the GhostFaceNets Keras model for CPU inference.
+
+- TFLite: dynamic-range quantization (int8 weights, float activations)
+  through the TFLite converter; runs on the TensorFlow already installed.
+- ONNX: tf2onnx conversion followed by ONNX Runtime dynamic int8
+  quantization (optional dependencies: tf2onnx, onnxruntime).
+
+    python -m services.face_recognition.tools.export_model --format tflite onnx
+    python -m services.face_recognition.tools.export_model --format tflite --no-quantize
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+
+import tensorflow as tf
+
+from ..config.paths import MODEL_PATH, TFLITE_MODEL_PATH, ONNX_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def export_tflite(keras_model_path: str, output_path: str, quantize: bool = True) -> str:
+    """
+    Convert the Keras model to TFLite.
+
+    Args:
+        keras_model_path: Path to the .h5 model
+        output_path: Where to write the .tflite file
+        quantize: Apply dynamic-range int8 weight quantization
+
+    Returns:
+        The output path.
+    """
+    model = tf.keras.models.load_model(keras_model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    tflite_model = converter.convert()
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+    logger.info(
+        f"Wrote TFLite model ({'int8 dynamic' if quantize else 'float32'}) to {output_path} "
+        f"({len(tflite_model) / 1e6:.1f} MB)")
+    return str(output_path)
+
+
+def export_onnx(keras_model_path: str, output_path: str, quantize: bool = True, opset: int = 13) -> str:
+    """
+    Convert the Keras model to ONNX, optionally with dynamic int8 quantization.
+
+    Args:
+        keras_model_path: Path to the .h5 model
+        output_path: Where to write the .onnx file
+        quantize: Apply ONNX Runtime dynamic int8 quantization
+        opset: ONNX opset version
+
+    Returns:
+        The output path.
+    """
+    try:
+        import tf2onnx
+    except ImportError as e:
+        raise ImportError(
+            "ONNX export requires tf2onnx (pip install tf2onnx onnxruntime).") from e
+
+    model = tf.keras.models.load_model(keras_model_path)
+    input_signature = [tf.TensorSpec(
+        (None,) + tuple(model.input_shape[1:]), tf.float32, name="input")]
+
+    float_path = output_path
+    if quantize:
+        float_path = os.path.join(tempfile.mkdtemp(), "float.onnx")
+    tf2onnx.convert.from_keras(model, input_signature=input_signature,
+                               opset=opset, output_path=float_path)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(float_path, output_path, weight_type=QuantType.QInt8)
+    logger.info(
+        f"Wrote ONNX model ({'int8 dynamic' if quantize else 'float32'}) to {output_path} "
+        f"({os.path.getsize(output_path) / 1e6:.1f} MB)")
+    return str(output_path)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=str(MODEL_PATH),
+                        help="Keras model to export")
+    parser.add_argument("--format", nargs="+", choices=["tflite", "onnx"],
+                        default=["tflite"])
+    parser.add_argument("--tflite-out", default=str(TFLITE_MODEL_PATH))
+    parser.add_argument("--onnx-out", default=str(ONNX_MODEL_PATH))
+    parser.add_argument("--no-quantize", action="store_true",
+                        help="Export float32 instead of int8 dynamic")
+    args = parser.parse_args()
+
+    quantize = not args.no_quantize
+    if "tflite" in args.format:
+        export_tflite(args.model, args.tflite_out, quantize=quantize)
+    if "onnx" in args.format:
+        export_onnx(args.model, args.onnx_out, quantize=quantize)
+
+
+if __name__ == "__main__":
+    main()